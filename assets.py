@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Assets — post-render stage: minify generated pages / JSON and precompress them
+  .html   whitespace runs → one char, comments out, <style> + style="" minified
+          (<script>, <pre>, <textarea>, quoted attribute values and CSS strings stay byte-for-byte)
+  .json   re-encoded compact (same values, same key order) — except shards.py shards,
+          whose name is the hash of their bytes: those are only precompressed
+  + .gz (level 9, mtime 0) and .br (quality 11, if `brotli` is installed) next to each file
+Incremental: .assets-manifest.json keeps the hash of every processed file, so a
+file whose content didn't change since the last run is only hashed. Fingerprinted
+names for the data come from shards.py; pages keep their URLs.
+
+    stage = AssetStage(OUT_DIR)
+    for r in stage.process(paths): print(r)
+    stage.save()
+"""
+
+import re
+import sys
+import gzip
+import json
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+from shards import is_shard, COMPRESSED
+from templates import atomic_write_text
+
+MANIFEST_NAME = ".assets-manifest.json"
+SIBLINGS = COMPRESSED          # .gz / .br — shards.py מוחק אותם יחד עם shard ישן
+
+# ─── minify ───────────────────────────────────────────────────────────────────
+_RAW = re.compile(r"(<(script|style|pre|textarea)\b[^>]*>.*?</\2\s*>)", re.S | re.I)
+_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.S)
+_WS = re.compile(r"\s+")
+_WS_RUN = re.compile(r"[ \t]{2,}|\t")
+# רווח ליד תגיות שלא מוצגות בכלל (head, מבנה טבלה) — בטוח להסיר; ליד inline הוא נראה
+_BLOCK = r"(?:!DOCTYPE|html|head|body|meta|link|title|script|style|table|thead|tbody|tr|td|th|br)"
+_WS_BEFORE = re.compile(rf"\s+(</?{_BLOCK}\b)", re.I)
+_WS_AFTER = re.compile(rf"(<{_BLOCK}\b[^>]*>|</{_BLOCK}>)\s+", re.I)
+# תגית פתיחה שלמה (גם כשערך מצוטט מכיל '>') וערך מצוטט בתוכה
+_TAG = re.compile(r"""<[A-Za-z][^"'>]*(?:(?:"[^"]*"|'[^']*')[^"'>]*)*>""")
+_ATTR_VALUE = re.compile(r"""([^\s"'>/=]+)(\s*=\s*)("[^"]*"|'[^']*')""")
+_HELD = re.compile(r"\0(\d+)\0")
+
+_DECL = re.compile(r"\s*:\s*")
+# הערה או מחרוזת מצוטטת (עם escapes) — סריקה אחת, כך ש-'/*' בתוך מחרוזת אינו הערה
+_CSS_SKIP = re.compile(r"""/\*.*?\*/|"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'""", re.S)
+_DECL_BLOCK = re.compile(r"\{([^{}]*)\}")
+
+@lru_cache(maxsize=4096)   # אותו style="" חוזר בכל שורה בטבלה
+def minify_css(css: str, inline: bool = False) -> str:
+    """Comments out, whitespace collapsed — quoted strings (content:'a ; b') held as \0n\0."""
+    strings = []
+    def hold(m):
+        if m.group(0).startswith("/*"):
+            return ""
+        strings.append(m.group(0))
+        return f"\0{len(strings) - 1}\0"
+    if "\0" not in css:   # כמו ב-_hold_values: NUL לא חוקי, לא מסתכנים בהתנגשות
+        css = _CSS_SKIP.sub(hold, css)
+    css = _WS.sub(" ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    # ':' רק בתוך הצהרות — בסלקטור 'div :hover' הרווח הוא descendant
+    if inline:
+        css = _DECL.sub(":", css).strip().rstrip(";")
+    else:
+        css = _DECL_BLOCK.sub(lambda m: "{" + _DECL.sub(":", m.group(1)) + "}", css)
+        css = css.replace(";}", "}").strip()
+    return _HELD.sub(lambda m: strings[int(m.group(1))], css) if strings else css
+
+def _edge(ws: str) -> str:
+    """Whitespace at a text part's edge (next to <script>/<pre>…) collapses but stays."""
+    return ("\n" if "\n" in ws else " ") if ws else ""
+
+def _hold_values(part: str):
+    """
+    Quoted attribute values → \0n\0 placeholders (no whitespace), so the text rules
+    below never touch them — title="a  b" keeps both spaces. style="" is minified here.
+    → (part, values)
+    """
+    values = []
+    if "\0" in part:   # NUL אינו חוקי ב-HTML — לא מסתכנים בהתנגשות עם ה-placeholder
+        return part, values
+    def value(m):
+        name, eq, v = m.groups()
+        if name.lower() == "style":
+            v = f"{v[0]}{minify_css(v[1:-1], inline=True)}{v[0]}"
+        values.append(v)
+        return f"{name}{eq}\0{len(values) - 1}\0"
+    return _TAG.sub(lambda m: _ATTR_VALUE.sub(value, m.group(0)), part), values
+
+def _text(part: str) -> str:
+    part, values = _hold_values(part)
+    part = _COMMENT.sub("", part)
+    # ריצה עם שורה חדשה → "\n" (הזחה ושורות ריקות), אחרת → " "
+    lines = (line.strip() for line in part.split("\n"))
+    body = _WS_RUN.sub(" ", "\n".join(line for line in lines if line))
+    head, tail = part[:len(part) - len(part.lstrip())], part[len(part.rstrip()):]
+    part = _edge(head) + body + (_edge(tail) if body else "")
+    part = _WS_BEFORE.sub(r"\1", part)
+    part = _WS_AFTER.sub(r"\1", part)
+    return _HELD.sub(lambda m: values[int(m.group(1))], part) if values else part
+
+def minify_html(html: str) -> str:
+    parts = _RAW.split(html)   # text, block, tag name, text, block, tag name, …
+    out = [_text(parts[0])]
+    for i in range(1, len(parts), 3):
+        block, tag, text = parts[i:i + 3]
+        if tag.lower() == "style":
+            head, _, body = block.partition(">")
+            body, _, tail = body.rpartition("</")
+            block = f"{head}>{minify_css(body)}</{tail}"
+        out += [block, _text(text)]
+    return "".join(out).strip() + "\n"
+
+def minify_json(text: str) -> str:
+    return json.dumps(json.loads(text), ensure_ascii=False, separators=(",", ":")) + "\n"
+
+MINIFIERS = {".html": minify_html, ".json": minify_json}
+
+# ─── precompress ──────────────────────────────────────────────────────────────
+def gzip_bytes(data: bytes) -> bytes:
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def _brotli():
+    try:
+        import brotli
+        return lambda data: brotli.compress(data, quality=11)
+    except ImportError:
+        return None
+
+# ─── stage ────────────────────────────────────────────────────────────────────
+class AssetStage:
+    """{rel path: sha256 of the optimized file}, persisted next to the pages."""
+
+    def __init__(self, root, name: str = MANIFEST_NAME, compress: bool = True):
+        self.root = Path(root)
+        self.path = self.root / name
+        self.compress = compress
+        self._br = _brotli() if compress else None
+        self.results = []
+        self.skipped = 0
+        try:
+            self.hashes = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception:
+            self.hashes = {}
+        self._dirty = False
+
+    def _siblings_ok(self, path: Path) -> bool:
+        if not self.compress:
+            return True
+        return path.with_name(path.name + ".gz").exists() and (
+            self._br is None or path.with_name(path.name + ".br").exists())
+
+    def process(self, paths) -> list:
+        """Optimize every path whose content changed; → [(rel, before, after, gz, br)] bytes."""
+        done = []
+        for path in map(Path, paths):
+            if not path.exists() or path.suffix not in MINIFIERS:
+                continue
+            rel = path.relative_to(self.root).as_posix()
+            raw = path.read_bytes()
+            if self.hashes.get(rel) == hashlib.sha256(raw).hexdigest() and self._siblings_ok(path):
+                self.skipped += 1
+                continue
+            if is_shard(path):
+                data = raw   # השם הוא hash של הבייטים — מכווצים בלבד, לא נוגעים בתוכן
+            else:
+                try:
+                    text = MINIFIERS[path.suffix](raw.decode("utf-8"))
+                except ValueError as e:
+                    print(f"  ⚠️  {rel}: {e} — left as is")
+                    text = raw.decode("utf-8", errors="replace")
+                data = text.encode("utf-8")
+                if data != raw:
+                    atomic_write_text(path, text)
+            gz = br = None
+            if self.compress:
+                gz = gzip_bytes(data)
+                path.with_name(path.name + ".gz").write_bytes(gz)
+                if self._br is not None:
+                    br = self._br(data)
+                    path.with_name(path.name + ".br").write_bytes(br)
+            self.hashes[rel] = hashlib.sha256(data).hexdigest()
+            self._dirty = True
+            done.append((rel, len(raw), len(data), gz and len(gz), br and len(br)))
+        self.results += done
+        return done
+
+    def prune(self):
+        """Forget files that are gone (pruned shards, renamed pages) and delete their siblings."""
+        for rel in [r for r in self.hashes if not (self.root / r).exists()]:
+            for ext in SIBLINGS:
+                (self.root / (rel + ext)).unlink(missing_ok=True)
+            del self.hashes[rel]
+            self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        self.path.write_text(json.dumps(self.hashes, indent=1, sort_keys=True) + "\n",
+                             encoding="utf-8")
+        self._dirty = False
+
+    def summary(self) -> str:
+        before = sum(r[1] for r in self.results)
+        after = sum(r[4] or r[3] or r[2] for r in self.results)
+        total = len(self.results) + self.skipped
+        if not self.results:
+            return f"assets 0/{total} changed"
+        return (f"assets {len(self.results)}/{total} changed · {before/1024:.1f}KB → "
+                f"{after/1024:.1f}KB over the wire ({1 - after/before:.0%} saved)")
+
+def format_row(rel, before, after, gz, br) -> str:
+    wire = f"  gz {gz/1024:>6.1f}KB" if gz else ""
+    wire += f"  br {br/1024:>6.1f}KB" if br else ""
+    return f"  ✓ {rel:<44} {before/1024:>7.1f}KB → {after/1024:>6.1f}KB{wire}"
+
+
+if __name__ == "__main__":
+    # python assets.py file… — optimize in place relative to the current directory
+    stage = AssetStage(Path.cwd())
+    if stage._br is None:
+        print("  ⓘ brotli not installed — .gz only")
+    for row in stage.process(Path(p).resolve() for p in sys.argv[1:]):
+        print(format_row(*row))
+    stage.save()
+    print(f"  {stage.summary()}")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+History store benchmark — thousands of symbols × years of daily closes
+  build    append N symbols × Y years into a fresh store (one append per symbol)
+  windows  7D / 1M / 3M / YTD / 1Y slices for every symbol (zero-copy memoryviews)
+  daily    one more bar per symbol (the append-only daily update)
+  torn     an append cut mid-item (3 stray bytes in .c, an extra bar in .d) must
+           still read, and the next append must land on whole bars (exit 1 if not)
+RSS נמדד מ-/proc/self/statm — צריך להישאר שטוח: הסגירות יושבות ב-page cache, לא ב-heap.
+
+usage: python benchmarks/bench_history.py [symbols] [years]
+"""
+
+import sys
+import time
+import random
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from history_store import HistoryStore
+
+N_SYMBOLS = 3_000
+N_YEARS = 5
+SPANS = ("7D", "1M", "3M", "YTD", "1Y")
+
+def rss_mb():
+    try:
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+        return pages * 4096 / 1e6
+    except OSError:
+        return float("nan")
+
+def weekdays(end, n):
+    out, d = [], end
+    while len(out) < n:
+        if d.weekday() < 5:
+            out.append(d.isoformat())
+        d -= timedelta(days=1)
+    return out[::-1]
+
+def torn_check(tmp, today) -> bool:
+    """Interrupted append → the symbol stays readable and writable."""
+    store = HistoryStore(Path(tmp) / "torn")
+    days = weekdays(today - timedelta(days=1), 10)
+    store.append("AAA", [(d, 10.0 + i) for i, d in enumerate(days[:-1])])
+    dp, cp = store._paths("AAA")
+    with open(cp, "ab") as f:
+        f.write(b"\x01\x02\x03")                # closes: חצי bar
+    with open(dp, "ab") as f:
+        f.write(dp.read_bytes()[-4:])            # dates: bar שה-close שלו לא נכתב
+    store = HistoryStore(store.root)
+    ok = len(store.series("AAA")) == 9
+    ok &= store.append("AAA", [(days[-1], 20.0), (today.isoformat(), 21.0)]) == 2
+    s = store.series("AAA")
+    ok &= len(s) == 11 and list(s.closes[-2:]) == [20.0, 21.0]
+    ok &= cp.stat().st_size == 11 * 8 and dp.stat().st_size == 11 * 4
+    return ok
+
+def main(n, years):
+    rng = random.Random(3)
+    today = date.today()
+    days = weekdays(today - timedelta(days=1), 252 * years)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(tmp)
+        r0 = rss_mb()
+
+        t = time.perf_counter()
+        for i in range(n):
+            p, rows = rng.uniform(5, 500), []
+            for d in days:
+                p *= 1 + rng.gauss(0, .015)
+                rows.append((d, p))
+            store.append(f"S{i}.TA", rows)
+        build_s = time.perf_counter() - t
+        st = store.stats()
+        print(f"📦 {n:,} symbols × {len(days):,} bars = {st['bars']:,} bars · "
+              f"{st['bytes']/1e6:.0f}MB on disk · build {build_s:.1f}s")
+
+        store = HistoryStore(tmp)   # מצב קר: אין mmaps פתוחים
+        r1 = rss_mb()
+        print(f"{'span':<6} {'ms (all symbols)':>17} {'closes':>12} {'RSS MB':>8}")
+        print("-" * 46)
+        for span in SPANS:
+            t = time.perf_counter()
+            total = 0
+            for i in range(n):
+                w = store.window(f"S{i}.TA", span, today)
+                total += len(w)
+                _ = w[-1]   # נוגע בדף האחרון
+            ms = (time.perf_counter() - t) * 1000
+            print(f"{span:<6} {ms:>17.1f} {total:>12,} {rss_mb():>8.1f}")
+
+        t = time.perf_counter()
+        bars = sum(store.append(f"S{i}.TA", [(today.isoformat(), 100.0)]) for i in range(n))
+        print(f"daily append: +{bars:,} bars in {(time.perf_counter() - t)*1000:.0f}ms")
+        print(f"RSS: start {r0:.1f}MB · after build {r1:.1f}MB · end {rss_mb():.1f}MB "
+              f"(data {st['bytes']/1e6:.0f}MB)")
+
+        ok = torn_check(tmp, today)
+        print("  ✓ torn append: readable, next append on whole bars" if ok else
+              "  ✗ torn append: symbol unreadable or misaligned after an interrupted write")
+        return 0 if ok else 1
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    sys.exit(main(*(args + [N_SYMBOLS, N_YEARS][len(args):])))
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Lag store benchmark — append + percentile queries vs stored history
+  json   הדרך הישנה: קריאת כל ה-log, append, חיתוך, כתיבה מחדש (pretty-printed)
+  store  LagStore.record — רק השורות של השעה הנוכחית
+ממלא שבוע שלם של ריצות (כל 5 דקות) ומודד append ו-p50/p95/p99 לשעה/יום/שבוע.
+
+usage: python benchmarks/bench_lag_store.py [runs_per_hour]
+"""
+
+import sys
+import json
+import time
+import random
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lag_store import LagStore
+
+SYMBOLS = ["QQQ", "GLD", "ESLT.TA", "PHOE.TA", "HARL.TA", "NXSN.TA",
+           "ARYT.TA", "BIG.TA", "FTAL.TA", "AZRG.TA", "SAE.TA"]
+
+def run_results(rng):
+    return [{"symbol": s, "elapsed_ms": round(rng.lognormvariate(6, .6), 1),
+             "status": "ok" if rng.random() > .02 else "error"} for s in SYMBOLS]
+
+def legacy_append(path, entry, keep):
+    history = json.loads(path.read_text()) if path.exists() else []
+    history.append(entry)
+    history = history[-keep:]
+    path.write_text(json.dumps(history, indent=2, ensure_ascii=False))
+
+def main(per_hour):
+    rng = random.Random(5)
+    now = time.time()
+    runs = 24 * 7 * per_hour
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LagStore(Path(tmp) / "lag.hdr")
+        t = time.perf_counter()
+        store.record(run_results(rng), ts=now - 7 * 86400 + 3600)
+        first_ms = (time.perf_counter() - t) * 1000
+        for i in range(runs):
+            store.record(run_results(rng), ts=now - 7 * 86400 + 3600 + i * 3600 / per_hour)
+        t = time.perf_counter()
+        for _ in range(100):
+            store.record(run_results(rng), ts=now)
+        full_ms = (time.perf_counter() - t) * 10
+
+        legacy = Path(tmp) / "lag.json"
+        times = {}
+        for keep in (50, runs):   # 50 = התקרה הישנה; runs = לשמור שבוע שלם
+            legacy.write_text(json.dumps([{"results": run_results(rng)} for _ in range(keep)],
+                                         indent=2, ensure_ascii=False))
+            t = time.perf_counter()
+            for _ in range(20):
+                legacy_append(legacy, {"results": run_results(rng)}, keep)
+            times[keep] = (time.perf_counter() - t) * 50
+
+        print(f"📦 {runs + 101:,} runs × {len(SYMBOLS)} symbols · store {store.path.stat().st_size/1e6:.1f}MB (sparse)")
+        print(f"append  store: empty {first_ms:.2f}ms · full week {full_ms:.2f}ms")
+        print(f"append  json:  50 runs {times[50]:.2f}ms · {runs:,} runs {times[runs]:.1f}ms")
+        for w in ("1h", "1d", "1w"):
+            t = time.perf_counter()
+            s = store.query(w, now=now).summary()
+            ms = (time.perf_counter() - t) * 1000
+            print(f"query {w}: {ms:6.1f}ms  n={s['count']:>6,}  p50={s['p50_ms']} p95={s['p95_ms']} p99={s['p99_ms']}")
+        store.close()
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 12)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Publish benchmark — git add/commit/push on the build path vs the Publisher
+against a local bare repo (stand-in for GitHub), no network
+  legacy     git add -A → commit → push סינכרוני בכל build (generate_all הישן)
+  publisher  Publisher.submit — החזרה מיידית; burst של builds → commit + push אחד
+  critical   זמן שה-build מחכה (legacy: כל ה-git; publisher: hashing + enqueue)
+  total      עד שה-remote מעודכן (publisher: כולל debounce + flush)
+תרחישים: burst של builds שכל אחד משנה דפים, builds בלי שינוי, ו-remote שנופל
+באמצע (push נכשל ומצליח אחרי backoff).
+בדיקות (exit 1 אם אחת נכשלת): ה-remote מגיע ל-HEAD המקומי עם commit אחד ל-burst,
+בלי שינוי → אפס קריאות git, אחרי outage ה-push מצליח, commit שלא נדחף נדחף
+ע"י ה-Publisher הבא (restart), ו-commit שנכשל לא משאיר קבצים staged.
+
+usage: python benchmarks/bench_publish.py [--builds 10] [--files 30] [--changed 6]
+"""
+
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from publisher import Publisher
+
+def git(repo, *args):
+    return subprocess.run(["git", "-C", str(repo), *args], capture_output=True, text=True)
+
+def setup(tmp, files):
+    remote, work = Path(tmp) / "remote.git", Path(tmp) / "work"
+    subprocess.run(["git", "init", "-q", "--bare", str(remote)], check=True)
+    subprocess.run(["git", "init", "-q", str(work)], check=True)
+    git(work, "config", "user.email", "bench@localhost")
+    git(work, "config", "user.name", "bench")
+    git(work, "remote", "add", "origin", str(remote))
+    pages = [work / f"page{i}.html" for i in range(files)]
+    for p in pages:
+        p.write_text(f"<html>{p.name} v0</html>\n" * 200)
+    git(work, "add", "-A")
+    git(work, "commit", "-q", "-m", "init")
+    git(work, "push", "-q", "origin", "HEAD")
+    return work, remote, pages
+
+def build(pages, b, changed):
+    """One build: rewrite `changed` pages with new content (prices moved)."""
+    for p in pages[:changed]:
+        p.write_text(f"<html>{p.name} v{b}</html>\n" * 200)
+
+def legacy(work, msg):
+    for cmd in [("add", "-A"), ("commit", "-m", msg), ("push",)]:
+        r = git(work, *cmd)
+        if "nothing to commit" in (r.stdout + r.stderr):
+            break
+
+def remote_commits(remote):
+    return int(git(remote, "rev-list", "--count", "HEAD").stdout.strip() or 0)
+
+def run_legacy(args, changed):
+    with tempfile.TemporaryDirectory() as tmp:
+        work, remote, pages = setup(tmp, args.files)
+        git(work, "push", "-q", "-u", "origin", "HEAD")
+        base = remote_commits(remote)
+        crit = 0.0
+        t0 = time.perf_counter()
+        for b in range(1, args.builds + 1):
+            build(pages, b, changed)
+            t = time.perf_counter()
+            legacy(work, f"v{b}")
+            crit += time.perf_counter() - t
+        return crit * 1000, (time.perf_counter() - t0) * 1000, remote_commits(remote) - base
+
+def synced(work, remote) -> bool:
+    return git(work, "rev-parse", "HEAD").stdout == git(remote, "rev-parse", "HEAD").stdout
+
+def count_git(pub) -> list:
+    """Wrap pub._git; → a list that collects every git command it runs."""
+    calls, inner = [], pub._git
+    def _git(*args):
+        calls.append(args[0])
+        return inner(*args)
+    pub._git = _git
+    return calls
+
+def run_publisher(args, changed, debounce=0.2, outage=None):
+    with tempfile.TemporaryDirectory() as tmp:
+        work, remote, pages = setup(tmp, args.files)
+        base = remote_commits(remote)
+        pub = Publisher(work, state=Path(tmp) / "state.json", debounce=debounce, backoff=.1)
+        pub.submit(pages, "init")   # hashes של ה-commit הראשון
+        pub.flush()
+        calls = count_git(pub)
+        if outage:
+            shutil.move(remote, remote.with_suffix(".down"))
+            threading.Timer(outage, shutil.move, (remote.with_suffix(".down"), remote)).start()
+        crit = 0.0
+        t0 = time.perf_counter()
+        for b in range(1, args.builds + 1):
+            build(pages, b, changed)
+            t = time.perf_counter()
+            pub.submit(pages, f"v{b}")
+            crit += time.perf_counter() - t
+        pub.close()
+        total = (time.perf_counter() - t0) * 1000
+        if outage:
+            time.sleep(max(0, outage - total / 1000) + .05)
+        return crit * 1000, total, remote_commits(remote) - base, dict(
+            pub.stats, git_calls=len(calls), synced=synced(work, remote))
+
+def run_restart(args):
+    """Push fails, the process ends; the next Publisher (same state file) pushes the commit."""
+    with tempfile.TemporaryDirectory() as tmp:
+        work, remote, pages = setup(tmp, args.files)
+        state = Path(tmp) / "state.json"
+        pub = Publisher(work, state=state, debounce=0, retries=0)
+        pub.submit(pages, "init")
+        pub.flush()
+        shutil.move(remote, remote.with_suffix(".down"))
+        build(pages, 1, args.changed)
+        pub.submit(pages, "v1")
+        left = not pub.close()
+        shutil.move(remote.with_suffix(".down"), remote)
+        pub = Publisher(work, state=state, debounce=0)
+        pub.submit(pages, "v1 again")   # אין שינוי — רק ה-push שנשאר
+        return left and pub.close() and synced(work, remote)
+
+def run_commit_failure(args):
+    """A pre-commit hook rejects the commit → the batch is unstaged and retried after the fix."""
+    with tempfile.TemporaryDirectory() as tmp:
+        work, remote, pages = setup(tmp, args.files)
+        pub = Publisher(work, state=Path(tmp) / "state.json", debounce=0)
+        pub.submit(pages, "init")
+        pub.flush()
+        hook = work / ".git" / "hooks" / "pre-commit"
+        hook.write_text("#!/bin/sh\nexit 1\n")
+        hook.chmod(0o755)
+        build(pages, 1, args.changed)
+        pub.submit(pages, "v1")
+        pub.flush()
+        clean = not git(work, "diff", "--cached", "--name-only").stdout.strip()
+        hook.unlink()
+        retried = pub.submit(pages, "v1 retry") == args.changed
+        return clean and retried and pub.close() and synced(work, remote)
+
+def main(args) -> int:
+    failures = []
+    def check(ok, what):
+        if not ok:
+            failures.append(what)
+    print(f"🧪 {args.builds} builds × {args.files} files, {args.changed} changed per build "
+          f"(local bare remote)")
+    print(f"{'scenario':<22} {'critical ms':>12} {'total ms':>10} {'commits':>8} {'retries':>8}")
+    print("-" * 64)
+    for label, changed in (("changes", args.changed), ("no changes", 0)):
+        crit, total, commits = run_legacy(args, changed)
+        print(f"{'legacy · ' + label:<22} {crit:>12.1f} {total:>10.1f} {commits:>8} {'—':>8}")
+        crit, total, commits, st = run_publisher(args, changed)
+        print(f"{'publisher · ' + label:<22} {crit:>12.1f} {total:>10.1f} {commits:>8} "
+              f"{st['push_retries']:>8}")
+        check(st["synced"], f"{label}: remote behind local HEAD")
+        if changed:
+            check(commits == 1, f"changes: {commits} commits in the remote for one burst (want 1)")
+        else:
+            check(commits == 0 and st["git_calls"] == 0,
+                  f"no changes: {commits} commits, {st['git_calls']} git calls (want 0, 0)")
+    crit, total, commits, st = run_publisher(args, args.changed, outage=.3)
+    print(f"{'publisher · outage':<22} {crit:>12.1f} {total:>10.1f} {commits:>8} "
+          f"{st['push_retries']:>8}")
+    check(st["synced"] and commits == 1 and st["push_retries"] >= 1,
+          f"outage: synced={st['synced']} commits={commits} retries={st['push_retries']}")
+    check(run_restart(args), "restart: a commit left unpushed was not pushed by the next Publisher")
+    check(run_commit_failure(args), "commit failure: batch left staged or never retried")
+    for f in failures:
+        print(f"  ✗ {f}")
+    print("  ✓ all checks passed" if not failures else f"  ✗ {len(failures)} check(s) failed")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--builds", type=int, default=10)
+    ap.add_argument("--files", type=int, default=30)
+    ap.add_argument("--changed", type=int, default=6)
+    sys.exit(main(ap.parse_args()))
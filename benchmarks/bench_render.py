@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Render benchmark — template layer at 10 / 1,000 / 50,000 holdings
+מודד זמן render ו-peak memory (tracemalloc) לכל generator:
+  detail        generate_portfolio_detail.generate_detail_page → str
+  detail-stream generate_portfolio_detail.write_detail_page → קובץ, בלי str מלא
+  deep          generate_all.build_deep → str
+  dashboard     generate_dashboard.generate_html (N כרטיסי תיקים)
+
+usage: python benchmarks/bench_render.py [10 1000 50000]
+"""
+
+import sys
+import time
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from synth import import_generate_all
+
+SIZES = [10, 1_000, 50_000]
+
+# ─── Synthetic inputs ─────────────────────────────────────────────────────────
+def detail_data(n):
+    sectors = ["בנקאות", "ביטוח", "ביטחון", "אנרגיה", "טכנולוגיה", "נדל\"ן"]
+    return {
+        "net_value": 100.0 * n * n,
+        "performance_pct": 1.5,
+        "holdings": [{
+            "symbol": f"TLV:S{i}", "name": f"Stock {i}", "sector": sectors[i % len(sectors)],
+            "quantity": 10 + i, "price": 12.5 + i % 97, "value": 100.0 * (i + 1),
+            "return_pct": (i % 21) - 10,
+        } for i in range(n)],
+    }
+
+def deep_inputs(n):
+    from market_data import make_snapshot
+    raw = {"name": "SOLID", "cash": 5000, "positions": [{
+        "symbol": f"TLV:S{i}", "shares": 10 + i % 50, "buyPrice": 20.0 + i % 37,
+        "costBasis": (10 + i % 50) * (20.0 + i % 37),
+    } for i in range(n)]}
+    perf = {"totalValue": 101_000.0, "fees": 50.0, "tax": 0.0}
+    prices = {p["symbol"]: p["buyPrice"] * 1.02 for p in raw["positions"]}
+    return raw, perf, make_snapshot(prices, {})
+
+def dashboard_data(n):
+    return {
+        "portfolios": [{
+            "name": f"P{i}", "nickname": f"#{i}", "totalValue": 100_000.0 + i,
+            "netPnL": i - n / 2, "netReturnPct": 0.1, "positionsCount": 8,
+            "fees": 10.0, "tax": 5.0,
+        } for i in range(n)],
+        "total": {"totalValue": 100_000.0 * n, "netPnL": 0.0, "netReturnPct": 0.0,
+                  "fees": 10.0 * n, "tax": 5.0 * n, "grossReturnPct": 0.0},
+        "pricesCount": n,
+    }
+
+# ─── Harness ──────────────────────────────────────────────────────────────────
+def measure(fn):
+    """(seconds, peak_bytes) — timing and memory in separate passes."""
+    t = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+def cases(n, tmp):
+    import generate_portfolio_detail as gpd
+    import generate_dashboard as gd
+    ga = import_generate_all()
+    dd = detail_data(n)
+    raw, perf, snap = deep_inputs(n)
+    dash = dashboard_data(n)
+    return {
+        "detail":        lambda: gpd.generate_detail_page("SOLID", dd, {}),
+        "detail-stream": lambda: gpd.write_detail_page(Path(tmp) / "d.html", "SOLID", dd, {}),
+        "deep":          lambda: ga.build_deep(raw, perf, snap),
+        "dashboard":     lambda: gd.generate_html(dash),
+    }
+
+def main(sizes):
+    print(f"{'case':<14} {'n':>7} {'ms':>10} {'peak MB':>9}")
+    print("-" * 43)
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            for name, fn in cases(n, tmp).items():
+                sec, peak = measure(fn)
+                print(f"{name:<14} {n:>7,} {sec*1000:>10.1f} {peak/1e6:>9.2f}")
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or SIZES)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Scale benchmark — build time and index weight at 5 / 50 / 500 portfolios
+  cold   בנייה ראשונה: index.html + deep pages (auto: כרטיסים מלאים + עמודים חסרים)
+  warm   ריצה חוזרת כשכל התיקים השתנו — index + כרטיסים מלאים + עד DEEP_BUDGET עמודים ישנים
+  index  גודל index.html (טעינה ראשונה) ו-shard ה-portfolios-index (נטען עצלנית בגלילה)
+נבנה לתיקייה זמנית עם נתונים סינתטיים (benchmarks/synth.py), בלי רשת ובלי git.
+
+usage: python benchmarks/bench_scale.py [5 50 500] [--positions 8]
+"""
+
+import sys
+import time
+import tempfile
+import argparse
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from synth import generate, import_generate_all, install
+
+def build(ga, synth, snapshot, out):
+    from build_manifest import BuildManifest
+    ga.OUT_DIR, ga.DATA_DIR = out, out / ga.DATA_DIR.name
+    raw_by = {r["name"]: r for r in synth.raw["portfolios"]}
+    manifest = BuildManifest(out)
+    t = time.perf_counter()
+    tasks = ga.plan_pages(synth.data, raw_by, snapshot, manifest)
+    for page, h, _ in ga.render_pages(tasks, snapshot):
+        manifest.record(page, h)
+    ga.write_summary(synth.data["portfolios"])
+    manifest.save()
+    return (time.perf_counter() - t) * 1000, len(tasks)
+
+def main(sizes, positions):
+    ga = import_generate_all()
+    print(f"{'portfolios':>10} {'cold ms':>9} {'pages':>6} {'warm ms':>9} {'pages':>6} "
+          f"{'index KB':>9} {'summary KB':>11}")
+    print("-" * 66)
+    for n in sizes:
+        synth = generate(n, positions, days=7)
+        snapshot = install(synth, ga)
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp)
+            cold, cold_pages = build(ga, synth, snapshot, out)
+            # מחיר חדש לכל נכס → כל התיקים השתנו
+            for p in synth.data["portfolios"]:
+                p["totalValue"] += 1
+            warm, warm_pages = build(ga, synth, snapshot, out)
+            idx = (out / "index.html").stat().st_size / 1024
+            summary = sum(f.stat().st_size for f in (out / "data" / "shards").glob("*.json")) / 1024
+            print(f"{n:>10,} {cold:>9.0f} {cold_pages:>6} {warm:>9.0f} {warm_pages:>6} "
+                  f"{idx:>9.1f} {summary:>11.1f}")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("sizes", nargs="*", type=int, default=[5, 50, 500])
+    ap.add_argument("--positions", type=int, default=8)
+    args = ap.parse_args()
+    main(args.sizes, args.positions)
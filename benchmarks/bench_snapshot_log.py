@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Snapshot log benchmark — 14-day chart read vs history size
+  glob   הדרך הישנה: glob + sort של כל ה-*.txt, קריאת 14 אחרונים
+  log    SnapshotLog.last_days(14) — seek באינדקס, קריאת 14 שורות בלבד
+
+usage: python benchmarks/bench_snapshot_log.py [100 1000 10000]
+"""
+
+import sys
+import time
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from snapshot_log import SnapshotLog, import_txt
+
+SIZES = [100, 1_000, 10_000]
+
+def legacy_chart(d):
+    labels, values = [], []
+    for f in sorted(Path(d).glob("*.txt"))[-14:]:
+        for line in f.read_text().split("\n"):
+            if "Total gross:" in line and "₪" in line:
+                labels.append(f.stem[:10])
+                values.append(round(float(line.split("₪")[1].replace(",", "").strip())))
+                break
+    return labels, values
+
+def make_history(d, n):
+    start = date.today() - timedelta(days=n)
+    for i in range(n):
+        day = start + timedelta(days=i)
+        (Path(d) / f"{day}-snapshot.txt").write_text(
+            f"BankOS {day} 18:00  (snapshot abc @ {day}T18:00:00)\n"
+            f"Total gross: ₪{500_000 + i:,.2f}\nTotal net:   ₪{499_000 + i:,.2f}\n", encoding="utf-8")
+
+def timed(fn, reps=20):
+    t = time.perf_counter()
+    for _ in range(reps):
+        out = fn()
+    return (time.perf_counter() - t) / reps * 1000, out
+
+def main(sizes):
+    print(f"{'days':>7} {'glob ms':>9} {'log ms':>8} {'speedup':>8}")
+    print("-" * 35)
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as d:
+            make_history(d, n)
+            log = SnapshotLog(d)
+            import_txt(log, d)
+            g_ms, (labels, values) = timed(lambda: legacy_chart(d))
+            l_ms, rows = timed(lambda: log.last_days(14))
+            assert labels == [r["date"] for r in rows]
+            assert values == [round(r["total_gross"]) for r in rows]
+            print(f"{n:>7,} {g_ms:>9.2f} {l_ms:>8.3f} {g_ms / l_ms:>7.0f}x")
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or SIZES)
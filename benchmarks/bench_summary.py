@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Portfolio summary benchmark — v_portfolio_summary before/after triggers
+  before  LEFT JOIN positions × transactions + GROUP BY (הגרסה הישנה)
+  after   lookup ב-portfolio_summary שמתוחזק ע"י triggers
+בודק גם נכונות: הטוטלים מול SUM נפרד לכל טבלה (בלי fan-out).
+
+usage: python benchmarks/bench_summary.py [n_transactions]
+"""
+
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SCHEMA = ROOT / "data" / "investos" / ".schema.sql"
+
+N_TXNS = 100_000
+PORTFOLIOS = ["solid", "aggressive", "super_agg", "speculative", "creative"]
+POSITIONS_PER = 12
+
+LEGACY_VIEW = """
+SELECT
+    p.id, p.initial_capital,
+    COALESCE(SUM(pos.quantity * pos.current_price), p.initial_capital) AS gross_value,
+    COALESCE(SUM(t.fee), 0) AS total_fees,
+    COALESCE(SUM(t.tax), 0) AS total_tax
+FROM portfolios p
+LEFT JOIN positions pos ON pos.portfolio_id = p.id
+LEFT JOIN transactions t ON t.portfolio_id = p.id
+GROUP BY p.id ORDER BY p.id"""
+
+TRUE_TOTALS = """
+SELECT p.id, p.initial_capital,
+    COALESCE((SELECT SUM(quantity * current_price) FROM positions WHERE portfolio_id = p.id), p.initial_capital),
+    COALESCE((SELECT SUM(fee) FROM transactions WHERE portfolio_id = p.id), 0),
+    COALESCE((SELECT SUM(tax) FROM transactions WHERE portfolio_id = p.id), 0)
+FROM portfolios p ORDER BY p.id"""
+
+NEW_VIEW = "SELECT id, initial_capital, gross_value, total_fees, total_tax FROM v_portfolio_summary ORDER BY id"
+
+def populate(db, n_txns, rng):
+    with db:
+        db.executemany("INSERT INTO portfolios (id, name) VALUES (?,?)", [(p, p) for p in PORTFOLIOS])
+        db.executemany(
+            "INSERT INTO positions (portfolio_id, ticker, quantity, avg_cost, current_price) VALUES (?,?,?,?,?)",
+            [(p, f"T{i}", rng.randint(1, 500), 10.0, round(rng.uniform(5, 200), 2))
+             for p in PORTFOLIOS for i in range(POSITIONS_PER)])
+    rows = []
+    for _ in range(n_txns):
+        q, px = rng.randint(1, 100), round(rng.uniform(5, 200), 2)
+        fee, tax = round(rng.uniform(0, 15), 2), round(rng.uniform(0, 30), 2)
+        rows.append((rng.choice(PORTFOLIOS), f"T{rng.randrange(POSITIONS_PER)}", "buy",
+                     q, px, q * px, fee, tax, q * px - fee - tax))
+    t = time.perf_counter()
+    with db:
+        db.executemany("""
+            INSERT INTO transactions (portfolio_id, ticker, action, quantity, price, gross_amount, fee, tax, net_amount)
+            VALUES (?,?,?,?,?,?,?,?,?)""", rows)
+    insert_s = time.perf_counter() - t
+    # קצת churn: עדכוני מחירים ומחיקות, שה-triggers צריכים לעקוב אחריהם
+    with db:
+        for _ in range(1_000):
+            db.execute("UPDATE positions SET current_price=? WHERE portfolio_id=? AND ticker=?",
+                       (round(rng.uniform(5, 200), 2), rng.choice(PORTFOLIOS), f"T{rng.randrange(POSITIONS_PER)}"))
+        db.execute("DELETE FROM transactions WHERE id % 97 = 0")
+        db.execute("UPDATE transactions SET fee = fee + 1 WHERE id % 89 = 0")
+    return insert_s
+
+def timed(db, sql, reps):
+    t = time.perf_counter()
+    for _ in range(reps):
+        rows = db.execute(sql).fetchall()
+    return (time.perf_counter() - t) / reps * 1000, rows
+
+def close(a, b):
+    return all(x == y if isinstance(x, str) else abs(x - y) < 1e-6 * max(1.0, abs(y))
+               for ra, rb in zip(a, b) for x, y in zip(ra, rb))
+
+def main(n_txns):
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = sqlite3.connect(str(Path(tmp) / "bench.db"))
+        db.executescript(SCHEMA.read_text(encoding="utf-8"))
+        insert_s = populate(db, n_txns, rng)
+
+        legacy_ms, legacy = timed(db, LEGACY_VIEW, 3)
+        true_ms, truth = timed(db, TRUE_TOTALS, 3)
+        new_ms, new = timed(db, NEW_VIEW, 200)
+
+        print(f"📊 {len(PORTFOLIOS)} portfolios × {POSITIONS_PER} positions, {n_txns:,} transactions "
+              f"(insert with triggers: {insert_s*1000:.0f}ms)")
+        print(f"{'query':<26} {'ms':>10}")
+        print("-" * 37)
+        print(f"{'legacy JOIN view':<26} {legacy_ms:>10.2f}")
+        print(f"{'per-table subqueries':<26} {true_ms:>10.2f}")
+        print(f"{'trigger summary view':<26} {new_ms:>10.3f}")
+        print(f"⚡ speedup vs legacy: {legacy_ms / new_ms:,.0f}x")
+
+        ok = close(new, truth)
+        print(f"{'✅' if ok else '❌'} summary totals match per-table SUMs")
+        print(f"{'⚠️' if not close(legacy, truth) else '✅'} legacy view fan-out: "
+              f"fees {legacy[0][3]:,.0f} vs true {truth[0][3]:,.0f} ({legacy[0][0]})")
+        db.close()
+        return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else N_TXNS))
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Tracing overhead — cost per span, disabled vs enabled
+  bare      לולאה בלי span (בסיס)
+  disabled  span() כבוי — בדיקת flag והחזרת ה-no-op המשותף
+  enabled   span() פעיל — perf_counter + process_time + getallocatedblocks + event
+
+enabled נמדד על n/100 spans — כמות של stages, לא של לולאה פנימית.
+
+usage: python benchmarks/bench_tracing.py [n]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import tracing
+from tracing import span
+
+def timed(fn, n):
+    t = time.perf_counter_ns()
+    fn(n)
+    return (time.perf_counter_ns() - t) / n
+
+def bare(n):
+    for i in range(n):
+        pass
+
+def spans(n):
+    for i in range(n):
+        with span("x", i=i):
+            pass
+
+def main(n):
+    tracing.enable(False)
+    base = timed(bare, n)
+    off = timed(spans, n)
+    tracing.enable(True)
+    on = timed(spans, max(1, n // 100))
+    evts = len(tracing.drain())
+    tracing.enable(False)
+    print(f"{n:,} spans (enabled: {evts:,})")
+    print(f"  bare      {base:7.1f} ns/iter")
+    print(f"  disabled  {off:7.1f} ns/iter  (+{off - base:.1f} ns)")
+    print(f"  enabled   {on:7.1f} ns/iter  (+{on - base:.1f} ns)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Valuation benchmark — scalar loops vs valuation at 10k positions × 250 days,
+on the inputs the call sites pass (history as tuples from the MarketSnapshot)
+  sparkline 7d  generate_all.sparkline — value_series(days=7), הלולאה הסקלרית
+  sparkline Nd  סדרה ארוכה — value_series(days=N), מטריצה ב-numpy מ-NP_MIN_DAYS
+  deep          build_deep — valuate(days=0): שווי / רווח / נטו / % נטו / שבוע לכל נכס
+הגרסאות ה-legacy הן העתק של הקוד הישן מ-generate_all, ומושוות לתוצאה (זהות ב-bit).
+כל case מודד legacy ו-kernel לסירוגין, כדי שסחיפה במהירות המכונה תפגע בשניהם.
+
+usage: python benchmarks/bench_valuation.py [positions] [days]
+"""
+
+import sys
+import time
+import random
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import valuation
+from valuation import valuate, value_series
+
+N_POSITIONS = 10_000
+N_DAYS = 250
+SKIP = ("BONDS:", "LEVERAGE:", "CRYPTO:", "TLV:DEFSMALL", "TLV:REIT", "TLV:POLI-PR")
+
+# ─── Legacy (generate_all before the kernel) ──────────────────────────────────
+def legacy_sparkline(positions, hist, days):
+    tots = [0.0] * days
+    for pos in positions:
+        sym = pos["symbol"]
+        if any(sym.startswith(s) for s in SKIP): continue
+        sh = pos.get("shares", 0)
+        if not sh: continue
+        h = hist.get(sym, [])
+        if not h:
+            v = pos.get("buyPrice", 0) * sh
+            for d in range(days): tots[d] += v
+        else:
+            hh = h[-days:] if len(h) >= days else [h[0]] * (days - len(h)) + list(h)
+            for d, price in enumerate(hh): tots[d] += price * sh
+    return tots
+
+def legacy_deep(positions, prices, hist):
+    rows = []
+    for pos in positions:
+        sym = pos["symbol"]
+        if any(sym.startswith(s) for s in SKIP): continue
+        sh = pos.get("shares", 0)
+        if not sh: continue
+        bp = pos.get("buyPrice", 0)
+        cp = prices.get(sym, bp)
+        val = sh * cp
+        g = (cp - bp) * sh
+        nv = g - val * 0.001 - max(0, g) * 0.25
+        npct = (nv / (bp * sh) * 100) if bp * sh > 0 else 0
+        h = hist.get(sym, ())
+        wkp = round((h[-1] / h[0] - 1) * 100, 2) if len(h) >= 2 and h[0] > 0 else None
+        rows.append((val, nv, npct, wkp))
+    return rows
+
+# ─── Synthetic book ───────────────────────────────────────────────────────────
+def book(n, days, seed=7):
+    rng = random.Random(seed)
+    positions, hist, prices = [], {}, {}
+    for i in range(n):
+        sym = f"BONDS:{i}" if i % 50 == 0 else f"TLV:S{i}"
+        bp = rng.uniform(5, 500)
+        positions.append({"symbol": sym, "shares": rng.randint(0, 400), "buyPrice": bp})
+        prices[sym] = bp * rng.uniform(.8, 1.3)
+        k = 0 if i % 97 == 0 else days - rng.randrange(0, 30)   # חלק בלי היסטוריה / קצרה
+        p, h = bp, []
+        for _ in range(k):
+            p *= 1 + rng.gauss(0, .015)
+            h.append(p)
+        hist[sym] = h
+    return positions, hist, prices
+
+def timed(*fns, reps=7):
+    """min ms of each fn, runs interleaved; → ([ms, …], [output, …])"""
+    best, outs = [float("inf")] * len(fns), [None] * len(fns)
+    for _ in range(reps):
+        for i, fn in enumerate(fns):
+            t = time.perf_counter()
+            outs[i] = fn()
+            best[i] = min(best[i], time.perf_counter() - t)
+    return [b * 1000 for b in best], outs
+
+def main(n, days):
+    positions, hist, prices = book(n, days)
+    hist = {s: tuple(h) for s, h in hist.items()}   # כמו snapshot.history
+    price = lambda s, d: prices.get(s, d)
+
+    print(f"📊 {n:,} positions × {days} days  (numpy: {'yes' if valuation._np() else 'no'}, "
+          f"matrix from {valuation.NP_MIN_DAYS} days)")
+    print(f"{'case':<22} {'legacy ms':>10} {'kernel ms':>10} {'speedup':>8}")
+    print("-" * 53)
+
+    ok = True
+    for span in sorted({7, days}):
+        (l_ms, k_ms), (legacy, series) = timed(
+            lambda: legacy_sparkline(positions, hist, span),
+            lambda: value_series(positions, closes=hist.get, days=span, skip=SKIP))
+        ok &= legacy == series
+        print(f"{f'sparkline {span}d':<22} {l_ms:>10.1f} {k_ms:>10.1f} {l_ms / k_ms:>7.1f}x")
+
+    (l_ms, k_ms), (legacy, v) = timed(
+        lambda: legacy_deep(positions, prices, hist),
+        lambda: valuate(positions, price=price, closes=hist.get, days=0, skip=SKIP))
+    ok &= legacy == list(zip(v.value, v.net, v.net_pct, v.week_pct))
+    print(f"{'deep (P&L + week)':<22} {l_ms:>10.1f} {k_ms:>10.1f} {l_ms / k_ms:>7.1f}x")
+
+    print(f"{'✅' if ok else '❌'} kernel output identical to the scalar loops")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    sys.exit(main(*(args + [N_POSITIONS, N_DAYS][len(args):])))
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite — hot paths on synthetic data, gated against a stored baseline
+  sparkline     generate_all.sparkline לכל תיק
+  build_index   generate_all.build_index
+  build_deep    generate_all.build_deep לכל תיק
+  detail        generate_portfolio_detail.generate_detail_page לכל תיק
+  dashboard     generate_dashboard.generate_html (גרף 14 יום מ-snapshot log זמני)
+  lag_stats     lag_monitor.summarize + LagStore.record/report על store זמני
+  minify        assets.minify_html על index + deep pages, ו-gzip של התוצאה
+
+כל case רץ offline (snapshot סינתטי) --repeat פעמים. משווים את ה-min — הריצה
+שהרעש פגע בה הכי פחות; ה-spread (median מול min) נשמר עם ה-baseline כמדד לרעש.
+regression: min עכשיו > min של ה-baseline × (1 + --threshold + spread), וגם
+יותר מ---min-ms. case שנראה איטי נמדד שוב (פי 2 ריצות) לפני שמכריזים — רק
+האטה שחוזרת → exit 1.
+המכונה עצמה משנה מהירות בין ריצות (±40% על VM משותף) — workload קבוע
+(calibration) נמדד לפני ואחרי, וכל הזמנים מנורמלים ביחס אליו מול ה-baseline.
+baseline נרשם עם --update (או אוטומטית כשאין קובץ); הוא תלוי מכונה, וגודל
+הנתונים / seed חייבים להתאים לו.
+
+usage: python benchmarks/suite.py [--update] [--threshold 0.25] [--repeat 15] [-p 5 -n 40 -d 90]
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from synth import generate, import_generate_all, install
+
+BASELINE = Path(__file__).parent / "baseline.json"
+
+def cases(synth, tmp):
+    ga = import_generate_all()
+    import generate_dashboard as gd
+    import generate_portfolio_detail as gpd
+    import lag_monitor
+    import assets
+    from lag_store import LagStore
+    from snapshot_log import SnapshotLog
+
+    snapshot = install(synth, ga)
+    raws = synth.raw["portfolios"]
+    perf = synth.data["portfolios"]
+    raw_by = {r["name"]: r for r in raws}
+
+    log = SnapshotLog(Path(tmp) / "daily")
+    for rec in synth.log:
+        log.append(rec)
+    gd.SnapshotLog = lambda: log   # הגרף קורא מה-log הסינתטי, לא מ-investment-learning
+
+    def lag_stats():
+        lag_monitor.summarize(synth.lag)
+        store = LagStore(Path(tmp) / "lag.hdr")
+        store.record(synth.lag)
+        store.report()
+        store.close()
+
+    pages = [ga.build_index(perf, synth.data["total"], snapshot, raw_by)]
+    pages += [ga.build_deep(r, p, snapshot) for r, p in zip(raws, perf)]
+
+    def minify():
+        for html in pages:
+            assets.gzip_bytes(assets.minify_html(html).encode("utf-8"))
+
+    return {
+        "sparkline":   lambda: [ga.sparkline(r, snapshot.history) for r in raws],
+        "build_index": lambda: ga.build_index(perf, synth.data["total"], snapshot, raw_by),
+        "build_deep":  lambda: [ga.build_deep(r, p, snapshot) for r, p in zip(raws, perf)],
+        "detail":      lambda: [gpd.generate_detail_page(n, d, synth.data)
+                                for n, d in synth.detail.items()],
+        "dashboard":   lambda: gd.generate_html(synth.data),
+        "lag_stats":   lag_stats,
+        "minify":      minify,
+    }
+
+def measure(fn, repeat) -> dict:
+    """
+    {"min", "median", "spread"} over `repeat` runs, after one warm-up (imports,
+    compile_once caches). spread = (median − min) / min — how noisy this case is here.
+    """
+    fn()
+    runs = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - t) * 1000)
+    runs.sort()
+    lo, mid = runs[0], runs[len(runs) // 2]
+    return {"min": round(lo, 3), "median": round(mid, 3),
+            "spread": round((mid - lo) / lo, 3) if lo else 0.0}
+
+def run(size, repeat, only=None):
+    synth = generate(**size)
+    with tempfile.TemporaryDirectory() as tmp:
+        return {name: measure(fn, repeat)
+                for name, fn in cases(synth, tmp).items() if not only or name in only}
+
+def _reference():
+    """Fixed CPU work — interpreter loop + json — the yardstick for this machine's speed right now."""
+    s = 0
+    for i in range(200_000):
+        s += i * i % 7
+    return json.dumps(list(range(20_000)))
+
+def calibrate(repeat) -> float:
+    return measure(_reference, repeat)["min"]
+
+def _stats(v) -> dict:
+    """A baseline entry — older baselines stored one median per case."""
+    return v if isinstance(v, dict) else {"min": v, "median": v, "spread": 0.0}
+
+def machine():
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count()}
+
+def compare(results, base, threshold, min_ms, speed=1.0):
+    """
+    → [(name, now, before, ratio, allowed, regressed)] on the min of each case —
+    before=None for a case the baseline lacks. allowed = 1 + threshold + the larger
+    spread of the two runs, so a noisy case needs a bigger slowdown to fail.
+    speed: calibration now / at baseline — divided out of both the ratio and the
+    --min-ms delta, so neither fires just because the runner is slower.
+    """
+    rows = []
+    for name, now in results.items():
+        if name not in base:
+            rows.append((name, now["min"], None, None, None, False))
+            continue
+        before = _stats(base[name])
+        allowed = 1 + threshold + max(before["spread"], now["spread"])
+        scaled = now["min"] / speed   # בזמן של מכונת ה-baseline
+        ratio = scaled / before["min"] if before["min"] else float("inf")
+        regressed = ratio > allowed and scaled - before["min"] > min_ms
+        rows.append((name, now["min"], before["min"], ratio, allowed, regressed))
+    return rows
+
+def confirm(results, rows, size, repeat):
+    """Measure the cases that look regressed again (2× the runs); keep the lower min."""
+    suspects = [r[0] for r in rows if r[5]]
+    if not suspects:
+        return results
+    print(f"  ↻ re-measuring {', '.join(suspects)}")
+    again = run(size, repeat * 2, suspects)
+    return {name: (again[name] if name in again and again[name]["min"] < st["min"] else st)
+            for name, st in results.items()}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="BankOS benchmark suite + regression gate")
+    parser.add_argument("-p", "--portfolios", type=int, default=5)
+    parser.add_argument("-n", "--positions", type=int, default=40)
+    parser.add_argument("-d", "--days", type=int, default=90, help="history days")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown of the min vs baseline (0.25 = 25%%), plus the case's spread")
+    parser.add_argument("--min-ms", type=float, default=0.05,
+                        help="ignore slowdowns smaller than this (timer noise)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--update", action="store_true", help="record results as the new baseline")
+    parser.add_argument("--only", nargs="+", metavar="CASE")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    size = {"portfolios": args.portfolios, "positions": args.positions,
+            "days": args.days, "seed": args.seed}
+    print(f"🧪 {args.portfolios} portfolios × {args.positions} positions × {args.days} days "
+          f"(seed {args.seed}, min of {args.repeat})")
+    cal = calibrate(args.repeat)
+    results = run(size, args.repeat, args.only)
+    cal = min(cal, calibrate(args.repeat))
+
+    stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else None
+    if args.update or stored is None:
+        keep = stored["cases"] if stored and stored.get("size") == size and args.only else {}
+        if keep:   # ה-cases הישנים נמדדו במהירות אחרת — מתרגמים לכיול של עכשיו
+            f = cal / stored.get("calibration", cal)
+            keep = {k: dict(_stats(v), min=round(_stats(v)["min"] * f, 3)) for k, v in keep.items()}
+        args.baseline.write_text(json.dumps({"size": size, "machine": machine(), "calibration": cal,
+                                             "cases": {**keep, **results}}, indent=2) + "\n")
+        for name, st in results.items():
+            print(f"  {name:<12} {st['min']:>9.3f}ms  (median {st['median']:.3f}, spread {st['spread']:.0%})")
+        print(f"📁 baseline → {args.baseline}")
+        return 0
+
+    if stored.get("size") != size:
+        print(f"❌ baseline recorded at {stored.get('size')} — rerun with those sizes or --update")
+        return 2
+    if stored.get("machine") != machine():
+        print(f"⚠️  baseline from another machine ({stored['machine'].get('platform')}) — timings may not compare")
+
+    speed = cal / stored["calibration"] if stored.get("calibration") else 1.0
+    print(f"  machine speed: calibration {cal:.2f}ms vs {stored.get('calibration', cal):.2f}ms at baseline"
+          f" → timings ÷ {speed:.2f}")
+    rows = compare(results, stored["cases"], args.threshold, args.min_ms, speed)
+    results = confirm(results, rows, size, args.repeat)
+    rows = compare(results, stored["cases"], args.threshold, args.min_ms, speed)
+    print(f"{'case':<12} {'now ms':>10} {'base ms':>10} {'ratio':>7} {'allowed':>8}")
+    print("-" * 51)
+    for name, now, before, ratio, allowed, regressed in rows:
+        if before is None:
+            print(f"{name:<12} {now:>10.3f} {'—':>10} {'new':>7}")
+            continue
+        flag = "  ❌ REGRESSION" if regressed else ""
+        print(f"{name:<12} {now:>10.3f} {before:>10.3f} {ratio:>6.2f}x {allowed:>7.2f}x{flag}")
+    bad = [r[0] for r in rows if r[5]]
+    if bad:
+        print(f"\n❌ {len(bad)} regressed beyond {args.threshold:.0%}: {', '.join(bad)}")
+        return 1
+    print(f"\n✅ no regressions (threshold {args.threshold:.0%})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Synthetic portfolios — seeded input for the benchmarks, no network, no tracker
+  raw        portfolios-5way.json shape (name / cash / positions[symbol, shares, buyPrice, costBasis])
+  data       tracker_unified.get_portfolio_data() shape (totals per portfolio + total)
+  prices     {tracker_symbol: price}     history {yahoo_symbol: [closes]} (days long)
+  detail     generate_portfolio_detail input per portfolio (holdings with value / return)
+  log        daily snapshot-log records, one per history day
+  lag        lag_monitor results for every symbol
+אותו seed → אותם מספרים בדיוק, כך שהשוואה ל-baseline משווה קוד ולא נתונים.
+
+usage: python benchmarks/synth.py out.json [-p portfolios] [-n positions] [-d days] [--seed N]
+"""
+
+import sys
+import json
+import random
+import argparse
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+NAMES = ["SOLID", "AGGRESSIVE", "SUPER-AGGRESSIVE", "SPECULATIVE", "CREATIVE"]
+SECTORS = ["בנקאות", "ביטוח", "ביטחון", "אנרגיה", "טכנולוגיה", "נדל\"ן", "קמעונאות", "תיירות"]
+BASE = 100_000
+
+@dataclass
+class Synth:
+    raw: dict
+    data: dict
+    prices: dict
+    history: dict
+    symbol_map: dict
+    detail: dict
+    log: list
+    lag: list
+
+def _walk(rng, last, days):
+    """Closes oldest→newest ending at `last` (random walk backwards, ~1.5% daily vol)."""
+    out = [last]
+    for _ in range(days - 1):
+        out.append(round(out[-1] / (1 + rng.gauss(0, .015)), 2))
+    return out[::-1]
+
+def generate(portfolios: int = 5, positions: int = 8, days: int = 30, seed: int = 0) -> Synth:
+    rng = random.Random(seed)
+    names = [NAMES[i] if i < len(NAMES) else f"SYNTH-{i}" for i in range(portfolios)]
+    raw_pf, perf, detail = [], [], {}
+    prices, history, symbol_map = {}, {}, {}
+    for pi, name in enumerate(names):
+        cash = round(rng.uniform(0, .1) * BASE, 2)
+        budget = (BASE - cash) / positions
+        pos, holdings, value = [], [], cash
+        for j in range(positions):
+            sym = f"TLV:S{pi}X{j}"
+            ysym = f"S{pi}X{j}.TA"
+            buy = round(rng.uniform(5, 500), 2)
+            shares = max(1, int(budget / buy))
+            cur = round(buy * (1 + rng.gauss(.01, .08)), 2)
+            pos.append({"symbol": sym, "shares": shares, "buyPrice": buy,
+                        "costBasis": round(shares * buy, 2), "thesis": f"synthetic {sym}"})
+            prices[sym] = cur
+            symbol_map[sym] = ysym
+            history[ysym] = _walk(rng, cur, days)
+            value += shares * cur
+            holdings.append({"symbol": sym, "name": f"Stock {pi}/{j}",
+                             "sector": SECTORS[rng.randrange(len(SECTORS))],
+                             "quantity": shares, "price": cur, "value": round(shares * cur, 2),
+                             "return_pct": round((cur / buy - 1) * 100, 2)})
+        fees = round(value * .002, 2)
+        tax = round(max(0.0, value - BASE) * .25, 2)
+        pnl = value - BASE - fees - tax
+        raw_pf.append({"name": name, "cash": cash, "initialCapital": BASE, "positions": pos})
+        perf.append({"name": name, "nickname": f"#{pi + 1}", "totalValue": round(value, 2),
+                     "netPnL": round(pnl, 2), "netReturnPct": round(pnl / BASE * 100, 2),
+                     "positionsCount": positions, "fees": fees, "tax": tax})
+        detail[name] = {"net_value": round(value - fees - tax, 2),
+                        "performance_pct": round(pnl / BASE * 100, 2), "holdings": holdings}
+
+    gross = sum(p["totalValue"] for p in perf)
+    cap = BASE * portfolios
+    total = {"totalValue": round(gross, 2), "netPnL": round(sum(p["netPnL"] for p in perf), 2),
+             "netReturnPct": round(sum(p["netPnL"] for p in perf) / cap * 100, 2),
+             "grossReturnPct": round((gross - cap) / cap * 100, 2),
+             "fees": round(sum(p["fees"] for p in perf), 2), "tax": round(sum(p["tax"] for p in perf), 2)}
+
+    start = date(2026, 1, 1)
+    log = [{"date": (start + timedelta(days=i)).isoformat(),
+            "total_gross": round(gross * (1 + rng.gauss(0, .01)), 2)} for i in range(days)]
+    lag = [{"symbol": y, "elapsed_ms": round(rng.lognormvariate(6, .6), 1),
+            "status": "ok" if rng.random() > .02 else "error",
+            "cached": rng.random() < .1} for y in history]
+    return Synth(raw={"portfolios": raw_pf}, data={"portfolios": perf, "total": total,
+                                                   "pricesCount": len(prices)},
+                 prices=prices, history=history, symbol_map=symbol_map,
+                 detail=detail, log=log, lag=lag)
+
+def import_generate_all():
+    """generate_all imports tracker_unified only for live data — the benchmarks never get there."""
+    import generate_all
+    return generate_all
+
+def install(synth: Synth, ga):
+    """Make generate_all know the synthetic symbols (names beyond the five come from the registry); → MarketSnapshot."""
+    from market_data import make_snapshot
+    ga.SYMBOL_MAP.update(synth.symbol_map)
+    return make_snapshot(synth.prices, synth.history, source="synthetic",
+                         taken_at="2026-01-01T18:00:00")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="write a synthetic portfolios-5way.json")
+    parser.add_argument("out", type=Path)
+    parser.add_argument("-p", "--portfolios", type=int, default=5)
+    parser.add_argument("-n", "--positions", type=int, default=8)
+    parser.add_argument("-d", "--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    s = generate(args.portfolios, args.positions, args.days, args.seed)
+    args.out.write_text(json.dumps(s.raw, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"✅ {args.out}: {args.portfolios} portfolios × {args.positions} positions · {len(s.history)} symbols")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Build Manifest — content hashes of every page's inputs
+generate_all skips a page when the hash of its inputs (data rows, prices,
+history slice, template version) matches the last build, so unchanged pages
+stay byte-identical and produce no git diff.
+"""
+
+import json
+import hashlib
+from pathlib import Path
+
+MANIFEST_NAME = ".build-manifest.json"
+
+def digest(obj) -> str:
+    """Stable sha256 of any JSON-encodable structure."""
+    blob = json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str,
+                      separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+def file_digest(path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+class BuildManifest:
+    """{page: inputs_hash}, persisted next to the generated pages."""
+
+    def __init__(self, out_dir, name: str = MANIFEST_NAME):
+        self.path = Path(out_dir) / name
+        self.hashes = {}
+        self.rebuilt = []
+        self.skipped = []
+        if self.path.exists():
+            try:
+                self.hashes = json.loads(self.path.read_text(encoding="utf-8"))
+            except Exception:
+                self.hashes = {}
+
+    def is_fresh(self, page: str, inputs_hash: str) -> bool:
+        """True if page exists on disk and was built from the same inputs."""
+        return (self.hashes.get(page) == inputs_hash
+                and (self.path.parent / page).exists())
+
+    def check(self, page: str, inputs, force: bool = False):
+        """Returns the inputs hash if the page must be rebuilt, None to skip."""
+        h = digest(inputs)
+        if not force and self.is_fresh(page, h):
+            self.skipped.append(page)
+            return None
+        return h
+
+    def record(self, page: str, inputs_hash: str):
+        self.hashes[page] = inputs_hash
+        self.rebuilt.append(page)
+
+    def save(self):
+        if not self.rebuilt:
+            return
+        self.path.write_text(json.dumps(self.hashes, indent=1, sort_keys=True) + "\n",
+                             encoding="utf-8")
+
+    def summary(self) -> str:
+        total = len(self.rebuilt) + len(self.skipped)
+        return f"rebuilt {len(self.rebuilt)}/{total} pages"
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Cassette — record every upstream market-data response (with its latency) and replay it
+  quote          lag_monitor.fetch_quote            {symbol} → last price
+  history        market_data Yahoo provider         [symbols, period, interval] → {sym: closes}
+  history_dated  (history store sync)               → {sym: [(date, close)]}
+  earnings       earnings_alert.fetch_earnings_date {symbol} → next report datetime | None
+
+One JSON line per call: {"k": kind, "a": args, "ms": latency, "v": value} — or
+"e": [type, message] for an exception, which replay raises again. The same call recorded twice replays in
+order (then the last one repeats), so a flaky symbol stays flaky.
+
+    BANKOS_CASSETTE=run.jsonl BANKOS_CASSETTE_MODE=record|replay
+    BANKOS_REPLAY_SPEED=1     real time (recorded latency)
+                        10    10× faster
+                        0     no waits — pure pipeline cost
+
+  python cassette.py record run.jsonl -- python lag_monitor.py --workers 8
+  python cassette.py replay run.jsonl --speed 0 -- python lag_monitor.py --workers 8
+  python cassette.py info   run.jsonl
+record / replay start the command with a fresh market cache, history store,
+earnings calendar and lag store (temp dir), so both runs make the same upstream
+calls and replayed latencies stay out of the real lag log.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+import statistics
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+
+class CassetteMiss(KeyError):
+    """Replay asked for a call the cassette never recorded."""
+
+class ReplayedError(RuntimeError):
+    """An exception recorded upstream, raised again on replay (same message)."""
+
+# ─── codecs: JSON ↔ what the callers expect ───────────────────────────────────
+def _dec_dated(v):   # JSON מחזיר list — ה-store מצפה ל-(date, close)
+    return {s: [(d, c) for d, c in rows] for s, rows in v.items()}
+
+def _enc_dt(v):
+    return v.isoformat() if v is not None else None
+
+def _dec_dt(v):
+    return datetime.fromisoformat(v) if v is not None else None
+
+CODECS = {"history_dated": (None, _dec_dated), "earnings": (_enc_dt, _dec_dt)}
+
+# ─── cassette ─────────────────────────────────────────────────────────────────
+class Cassette:
+    def __init__(self, path, mode: str = "replay", speed: float = 1.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"cassette mode {mode!r} — record | replay")
+        self.path = Path(path)
+        self.mode = mode
+        self.speed = speed
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self._tapes = defaultdict(list)   # (kind, args) → [entry, ...]
+        self._pos = Counter()
+        if mode == "replay":
+            for entry in load(self.path):
+                self._tapes[(entry["k"], _key(entry["a"]))].append(entry)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fp = open(self.path, "a", encoding="utf-8")
+
+    def call(self, kind: str, args, fn):
+        """fn() through the cassette: recorded (record) or answered from the tape (replay)."""
+        self.calls[kind] += 1
+        enc, dec = CODECS.get(kind, (None, None))
+        if self.mode == "replay":
+            return self._replay(kind, args, dec)
+        t = time.perf_counter()
+        entry = {"k": kind, "a": args}
+        try:
+            value = fn()
+            entry["v"] = enc(value) if enc else value
+            return value
+        except Exception as e:
+            entry["e"] = [type(e).__name__, str(e)]
+            raise
+        finally:
+            entry["ms"] = round((time.perf_counter() - t) * 1000, 1)
+            line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str)
+            with self._lock:
+                self._fp.write(line + "\n")
+                self._fp.flush()
+
+    def _replay(self, kind, args, dec):
+        key = (kind, _key(args))
+        with self._lock:
+            tape = self._tapes.get(key)
+            if not tape:
+                raise CassetteMiss(f"{kind} {args} not in {self.path.name}")
+            i = self._pos[key]
+            self._pos[key] = i + 1
+        entry = tape[min(i, len(tape) - 1)]
+        if self.speed:
+            time.sleep(entry["ms"] / 1000 / self.speed)
+        if "e" in entry:
+            raise ReplayedError(entry["e"][1])
+        return dec(entry["v"]) if dec else entry["v"]
+
+    def close(self):
+        if self.mode == "record":
+            self._fp.close()
+
+def _key(args) -> str:
+    return json.dumps(args, sort_keys=True, separators=(",", ":"), default=str)
+
+def load(path) -> list:
+    with open(path, encoding="utf-8") as fp:
+        return [json.loads(line) for line in fp if line.strip()]
+
+_active = None
+_active_lock = threading.Lock()
+
+def active():
+    """The process cassette from BANKOS_CASSETTE (None when unset)."""
+    global _active
+    path = os.environ.get("BANKOS_CASSETTE")
+    if not path:
+        return None
+    with _active_lock:
+        if _active is None:
+            _active = Cassette(path, os.environ.get("BANKOS_CASSETTE_MODE", "replay"),
+                               float(os.environ.get("BANKOS_REPLAY_SPEED", "1")))
+    return _active
+
+def call(kind: str, args, fn):
+    """fn() — or through the active cassette, if there is one."""
+    c = active()
+    return c.call(kind, args, fn) if c is not None else fn()
+
+class CassetteProvider:
+    """History provider (fetch / fetch_dated) whose chunks go through the cassette."""
+
+    def __init__(self, inner, cassette):
+        self.inner, self.cassette = inner, cassette
+
+    def fetch(self, symbols, period="7d", interval="1d") -> dict:
+        symbols = sorted(symbols)
+        return self.cassette.call("history", [symbols, period, interval],
+                                  lambda: self.inner.fetch(symbols, period=period, interval=interval))
+
+    def fetch_dated(self, symbols, period="7d", interval="1d") -> dict:
+        symbols = sorted(symbols)
+        return self.cassette.call("history_dated", [symbols, period, interval],
+                                  lambda: self.inner.fetch_dated(symbols, period=period, interval=interval))
+
+# ─── CLI ──────────────────────────────────────────────────────────────────────
+def info(path):
+    entries = load(path)
+    by_kind = defaultdict(list)
+    for e in entries:
+        by_kind[e["k"]].append(e)
+    print(f"📼 {path} · {len(entries)} calls · {sum(e['ms'] for e in entries) / 1000:.1f}s recorded latency")
+    for kind, es in sorted(by_kind.items()):
+        ms = sorted(e["ms"] for e in es)
+        p95 = ms[min(len(ms) - 1, int(len(ms) * .95))]
+        errors = sum(1 for e in es if "e" in e)
+        print(f"  {kind:<14} {len(es):>5} calls  p50 {statistics.median(ms):>8.1f}ms  "
+              f"p95 {p95:>8.1f}ms  errors {errors}")
+
+def run(mode, path, cmd, speed=1.0, keep_state=False) -> int:
+    env = dict(os.environ, BANKOS_CASSETTE=str(Path(path).resolve()),
+               BANKOS_CASSETTE_MODE=mode, BANKOS_REPLAY_SPEED=str(speed))
+    if mode == "record" and Path(path).exists():
+        Path(path).unlink()   # הקלטה חדשה — לא מוסיפים לישנה
+    with tempfile.TemporaryDirectory(prefix="bankos-cassette-") as tmp:
+        if not keep_state:   # מצב קר זהה בהקלטה ובהשמעה → אותן קריאות upstream
+            env.update(BANKOS_CACHE=f"{tmp}/cache.sqlite", BANKOS_HISTORY_DIR=f"{tmp}/history",
+                       BANKOS_EARNINGS_CALENDAR=f"{tmp}/earnings.json",
+                       BANKOS_LAG_STORE=f"{tmp}/lag.hdr")   # latency של השמעה לא נכנס ללוג האמיתי
+        t = time.perf_counter()
+        rc = subprocess.run(cmd, env=env).returncode
+    print(f"📼 {mode} {path} · {(time.perf_counter() - t):.2f}s · exit {rc}"
+          + (f" · speed {speed:g}" if mode == "replay" else ""))
+    return rc
+
+def parse_args(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    cmd = []
+    if "--" in argv:
+        i = argv.index("--")
+        argv, cmd = argv[:i], argv[i + 1:]
+    parser = argparse.ArgumentParser(description="record / replay upstream market data")
+    parser.add_argument("mode", choices=["record", "replay", "info"])
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="replay: 1 = recorded latency, N = N× faster, 0 = no waits")
+    parser.add_argument("--keep-state", action="store_true",
+                        help="use the normal cache / history store instead of a fresh temp one")
+    args = parser.parse_args(argv)
+    args.cmd = cmd
+    if args.mode != "info" and not cmd:
+        parser.error("command required after --")
+    return args
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.mode == "info":
+        info(args.path)
+    else:
+        sys.exit(run(args.mode, args.path, args.cmd, args.speed, args.keep_state))
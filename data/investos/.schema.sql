@@ -28,6 +28,7 @@ CREATE TABLE IF NOT EXISTS positions (
     quantity        REAL DEFAULT 0,
     avg_cost        REAL DEFAULT 0,   -- עלות ממוצעת ליחידה
     current_price   REAL,
+    daily_change_pct REAL DEFAULT 0,
     updated_at      TEXT DEFAULT (datetime('now')),
     UNIQUE(portfolio_id, ticker)
 );
@@ -72,7 +73,8 @@ CREATE TABLE IF NOT EXISTS insights (
     text        TEXT NOT NULL,
     action_taken TEXT,
     confidence  REAL,
-    created_at  TEXT DEFAULT (datetime('now'))
+    created_at  TEXT DEFAULT (datetime('now')),
+    ord         INTEGER  -- סדר ב-insights.json (0 = latest); NULL = נכתב ישירות ע"י סוכן → ראשון
 );
 
 -- אסטרטגיות ו-Backtest
@@ -87,21 +89,172 @@ CREATE TABLE IF NOT EXISTS strategies (
     backtest_max_drawdown REAL,
     approved_by     TEXT,
     notes           TEXT,
-    created_at      TEXT DEFAULT (datetime('now'))
+    created_at      TEXT DEFAULT (datetime('now')),
+    ord             INTEGER  -- סדר ב-strategies.json; NULL = חדש → בסוף
+);
+
+-- מטא-דאטה של ה-payloads (pilot_day, usdils, updated_at...)
+CREATE TABLE IF NOT EXISTS meta (
+    key     TEXT PRIMARY KEY,
+    value   TEXT
+);
+
+-- סיכום לכל תיק — מתוחזק ע"י triggers, כך ש-v_portfolio_summary הוא lookup
+-- במקום JOIN של positions × transactions (שהכפיל עמלות/מס במספר הפוזיציות)
+CREATE TABLE IF NOT EXISTS portfolio_summary (
+    portfolio_id    TEXT PRIMARY KEY REFERENCES portfolios(id) ON DELETE CASCADE,
+    gross_value     REAL NOT NULL DEFAULT 0,   -- SUM(quantity × current_price)
+    priced_count    INTEGER NOT NULL DEFAULT 0, -- פוזיציות עם מחיר; 0 → initial_capital
+    total_fees      REAL NOT NULL DEFAULT 0,
+    total_tax       REAL NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO portfolio_summary (portfolio_id, gross_value, priced_count, total_fees, total_tax)
+SELECT p.id,
+    COALESCE((SELECT SUM(quantity * current_price) FROM positions WHERE portfolio_id = p.id), 0),
+    (SELECT COUNT(quantity * current_price) FROM positions WHERE portfolio_id = p.id),
+    COALESCE((SELECT SUM(fee) FROM transactions WHERE portfolio_id = p.id), 0),
+    COALESCE((SELECT SUM(tax) FROM transactions WHERE portfolio_id = p.id), 0)
+FROM portfolios p;
+
+CREATE TRIGGER IF NOT EXISTS trg_summary_portfolio_ins AFTER INSERT ON portfolios
+BEGIN
+    INSERT OR IGNORE INTO portfolio_summary (portfolio_id) VALUES (NEW.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_summary_position_ins AFTER INSERT ON positions
+BEGIN
+    UPDATE portfolio_summary SET
+        gross_value  = gross_value + COALESCE(NEW.quantity * NEW.current_price, 0),
+        priced_count = priced_count + (NEW.quantity * NEW.current_price IS NOT NULL)
+    WHERE portfolio_id = NEW.portfolio_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_summary_position_del AFTER DELETE ON positions
+BEGIN
+    UPDATE portfolio_summary SET
+        gross_value  = gross_value - COALESCE(OLD.quantity * OLD.current_price, 0),
+        priced_count = priced_count - (OLD.quantity * OLD.current_price IS NOT NULL)
+    WHERE portfolio_id = OLD.portfolio_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_summary_position_upd
+AFTER UPDATE OF portfolio_id, quantity, current_price ON positions
+BEGIN
+    UPDATE portfolio_summary SET
+        gross_value  = gross_value - COALESCE(OLD.quantity * OLD.current_price, 0),
+        priced_count = priced_count - (OLD.quantity * OLD.current_price IS NOT NULL)
+    WHERE portfolio_id = OLD.portfolio_id;
+    UPDATE portfolio_summary SET
+        gross_value  = gross_value + COALESCE(NEW.quantity * NEW.current_price, 0),
+        priced_count = priced_count + (NEW.quantity * NEW.current_price IS NOT NULL)
+    WHERE portfolio_id = NEW.portfolio_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_summary_txn_ins AFTER INSERT ON transactions
+BEGIN
+    UPDATE portfolio_summary SET
+        total_fees = total_fees + COALESCE(NEW.fee, 0),
+        total_tax  = total_tax + COALESCE(NEW.tax, 0)
+    WHERE portfolio_id = NEW.portfolio_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_summary_txn_del AFTER DELETE ON transactions
+BEGIN
+    UPDATE portfolio_summary SET
+        total_fees = total_fees - COALESCE(OLD.fee, 0),
+        total_tax  = total_tax - COALESCE(OLD.tax, 0)
+    WHERE portfolio_id = OLD.portfolio_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_summary_txn_upd
+AFTER UPDATE OF portfolio_id, fee, tax ON transactions
+BEGIN
+    UPDATE portfolio_summary SET
+        total_fees = total_fees - COALESCE(OLD.fee, 0),
+        total_tax  = total_tax - COALESCE(OLD.tax, 0)
+    WHERE portfolio_id = OLD.portfolio_id;
+    UPDATE portfolio_summary SET
+        total_fees = total_fees + COALESCE(NEW.fee, 0),
+        total_tax  = total_tax + COALESCE(NEW.tax, 0)
+    WHERE portfolio_id = NEW.portfolio_id;
+END;
+
+-- portfolios.json כפי שנקלט, לכל תיק — ה-export מחזיר אותו כמו שהוא (gross, sectors,
+-- allocation_pct, ערכים ו-P&L של המקור) עד שמשהו בתיק משתנה; אז ה-triggers מוחקים
+-- את השורה וה-export מחשב את התיק מחדש מה-DB. אותו דבר ל-pnl.json כולו
+-- (meta 'pnl_source'), שתלוי רק ב-daily_snapshots וב-portfolios
+CREATE TABLE IF NOT EXISTS portfolio_source (
+    portfolio_id    TEXT PRIMARY KEY REFERENCES portfolios(id) ON DELETE CASCADE,
+    payload         TEXT NOT NULL   -- JSON של האובייקט מ-portfolios.json
 );
 
+CREATE TRIGGER IF NOT EXISTS trg_source_portfolio_upd AFTER UPDATE ON portfolios
+BEGIN
+    DELETE FROM portfolio_source WHERE portfolio_id = OLD.id;
+    DELETE FROM meta WHERE key = 'pnl_source';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_source_position_ins AFTER INSERT ON positions
+BEGIN
+    DELETE FROM portfolio_source WHERE portfolio_id = NEW.portfolio_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_source_position_upd AFTER UPDATE ON positions
+BEGIN
+    DELETE FROM portfolio_source WHERE portfolio_id IN (OLD.portfolio_id, NEW.portfolio_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_source_position_del AFTER DELETE ON positions
+BEGIN
+    DELETE FROM portfolio_source WHERE portfolio_id = OLD.portfolio_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_source_snapshot_ins AFTER INSERT ON daily_snapshots
+BEGIN
+    DELETE FROM portfolio_source WHERE portfolio_id = NEW.portfolio_id;
+    DELETE FROM meta WHERE key = 'pnl_source';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_source_snapshot_upd AFTER UPDATE ON daily_snapshots
+BEGIN
+    DELETE FROM portfolio_source WHERE portfolio_id IN (OLD.portfolio_id, NEW.portfolio_id);
+    DELETE FROM meta WHERE key = 'pnl_source';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_source_snapshot_del AFTER DELETE ON daily_snapshots
+BEGIN
+    DELETE FROM portfolio_source WHERE portfolio_id = OLD.portfolio_id;
+    DELETE FROM meta WHERE key = 'pnl_source';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_source_txn_ins AFTER INSERT ON transactions
+BEGIN
+    DELETE FROM portfolio_source WHERE portfolio_id = NEW.portfolio_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_source_txn_upd AFTER UPDATE ON transactions
+BEGIN
+    DELETE FROM portfolio_source WHERE portfolio_id IN (OLD.portfolio_id, NEW.portfolio_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_source_txn_del AFTER DELETE ON transactions
+BEGIN
+    DELETE FROM portfolio_source WHERE portfolio_id = OLD.portfolio_id;
+END;
+
 -- Views שימושיים ל-Ledger
-CREATE VIEW IF NOT EXISTS v_portfolio_summary AS
+-- DROP+CREATE: DB קיים מחזיק עדיין את גרסת ה-JOIN הישנה
+DROP VIEW IF EXISTS v_portfolio_summary;
+CREATE VIEW v_portfolio_summary AS
 SELECT
     p.id, p.name, p.emoji, p.strategy,
     p.initial_capital,
-    COALESCE(SUM(pos.quantity * pos.current_price), p.initial_capital) AS gross_value,
-    COALESCE(SUM(t.fee), 0) AS total_fees,
-    COALESCE(SUM(t.tax), 0) AS total_tax
+    CASE WHEN s.priced_count > 0 THEN s.gross_value ELSE p.initial_capital END AS gross_value,
+    s.total_fees,
+    s.total_tax
 FROM portfolios p
-LEFT JOIN positions pos ON pos.portfolio_id = p.id
-LEFT JOIN transactions t ON t.portfolio_id = p.id
-GROUP BY p.id;
+JOIN portfolio_summary s ON s.portfolio_id = p.id;
 
 CREATE VIEW IF NOT EXISTS v_ledger_report AS
 SELECT
@@ -11,6 +11,9 @@ import sys
 from datetime import datetime, timedelta
 import pytz
 
+import cassette
+from earnings_calendar import EarningsCalendar
+
 # ── הגדרות ──────────────────────────────────────────────
 PORTFOLIO_FILE = os.path.join(os.path.dirname(__file__),
                               '../investment-learning/portfolios-5way.json')
@@ -70,35 +73,20 @@ def load_portfolios():
             stocks[sym]['portfolios'].append(p['name'])
     return stocks
 
-def get_earnings_date(yahoo_symbol):
-    """מחזיר תאריך הדו"ח הבא, או None אם לא ידוע"""
-    import signal
+def fetch_earnings_date(yahoo_symbol):
+    """שואל את Yahoo — מחזיר תאריך או None (אין דו"ח עתידי); זורק חריגה בכישלון"""
+    return cassette.call("earnings", yahoo_symbol, lambda: _yahoo_earnings_date(yahoo_symbol))
 
-    def handler(signum, frame):
-        raise TimeoutError()
+def _yahoo_earnings_date(yahoo_symbol):
+    import yfinance as yf
 
-    try:
-        import yfinance as yf
-        from datetime import datetime
-        import pytz
-
-        signal.signal(signal.SIGALRM, handler)
-        signal.alarm(8)  # timeout של 8 שניות לכל מניה
-
-        ticker = yf.Ticker(yahoo_symbol)
-        ed = ticker.earnings_dates
-        signal.alarm(0)
-
-        if ed is None or len(ed) == 0:
-            return None
-        today = datetime.now(pytz.utc)
-        future = ed[ed.index > today]
-        if len(future) == 0:
-            return None
-        return future.index[-1]
-    except (Exception, TimeoutError):
-        signal.alarm(0)
+    ed = yf.Ticker(yahoo_symbol).earnings_dates
+    if ed is None or len(ed) == 0:
         return None
+    future = ed[ed.index > datetime.now(pytz.utc)]
+    if len(future) == 0:
+        return None
+    return future.index[-1].to_pydatetime()
 
 def days_until(dt):
     """כמה ימים עד תאריך נתון (מהיום)"""
@@ -162,13 +150,21 @@ def main():
     stocks = load_portfolios()
     print(f"📋 {len(stocks)} מניות בתיקים")
 
+    # רענון מקבילי רק של symbols שהרשומה שלהם ישנה או בחלון ההתרעה
+    calendar = EarningsCalendar()
+    yahoo_of = {sym: SYMBOL_MAP.get(sym, sym.split(':')[-1]) for sym in stocks}
+    stale = calendar.stale(sorted(set(yahoo_of.values())), ALERT_DAYS_AHEAD)
+    result = calendar.refresh(stale, fetch_earnings_date)
+    print(f"🔄 רוענו {len(result['refreshed'])}/{len(set(yahoo_of.values()))} "
+          f"({len(result['failed'])} נכשלו) ב-{result['elapsed_ms']:.0f}ms")
+
     upcoming = []
 
     for sym, info in stocks.items():
-        yahoo_sym = SYMBOL_MAP.get(sym, sym.split(':')[-1])
+        yahoo_sym = yahoo_of[sym]
         print(f"  בודק {yahoo_sym}...", end=' ', flush=True)
 
-        earnings_dt = get_earnings_date(yahoo_sym)
+        earnings_dt = calendar.get(yahoo_sym)
         if earnings_dt is None:
             print("אין תאריך")
             continue
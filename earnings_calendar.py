@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Earnings Calendar — persistent store for earnings_alert
+שומר את תאריך הדו"ח הבא לכל symbol, ומרענן רק את מה שצריך:
+  • רשומה ישנה (נבדקה לפני יותר מ-REFRESH_DAYS)
+  • תאריך שנופל בחלון ההתרעה (עלול לזוז ברגע האחרון) או שכבר עבר
+הרענון רץ במקביל ב-threads daemon, עם timeout לכל symbol בלי signal.alarm —
+קריאת yfinance תקועה לא מעכבת את סיום התהליך (ה-job של 08:30).
+"""
+
+import os
+import json
+import time
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+
+CALENDAR_FILE = Path(os.environ.get("BANKOS_EARNINGS_CALENDAR",
+                                    "/tmp/bankos_earnings_calendar.json"))
+REFRESH_DAYS  = 3     # אחרי כמה ימים רשומה נחשבת ישנה
+FETCH_TIMEOUT = 8.0   # שניות לכל symbol מרגע שהתחיל (כמו ה-alarm הישן)
+WORKERS       = 16
+
+class EarningsCalendar:
+    """{yahoo_symbol: {"date": iso|None, "checked_at": iso}} on disk."""
+
+    def __init__(self, path=CALENDAR_FILE):
+        self.path = Path(path)
+        self.entries = {}
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except Exception:
+                self.entries = {}
+
+    def get(self, symbol):
+        """תאריך הדו"ח הבא (datetime) או None"""
+        e = self.entries.get(symbol)
+        if not e or not e.get("date"):
+            return None
+        return datetime.fromisoformat(e["date"])
+
+    def needs_refresh(self, symbol, days_ahead, now=None):
+        now = now or datetime.now().astimezone()
+        e = self.entries.get(symbol)
+        if e is None:
+            return True
+        checked = datetime.fromisoformat(e["checked_at"])
+        if now - checked > timedelta(days=REFRESH_DAYS):
+            return True
+        if e.get("date"):
+            d = datetime.fromisoformat(e["date"])
+            # בחלון ההתרעה (או שכבר עבר) — מאמתים כל בוקר
+            if d - now <= timedelta(days=days_ahead + 1):
+                return True
+        return False
+
+    def stale(self, symbols, days_ahead):
+        now = datetime.now().astimezone()
+        return [s for s in symbols if self.needs_refresh(s, days_ahead, now)]
+
+    def refresh(self, symbols, fetch, timeout=FETCH_TIMEOUT, workers=WORKERS):
+        """
+        fetch(symbol) → datetime | None, זורק חריגה בכישלון.
+        `workers` threads daemon מרוקנים תור; symbol שלא חזר תוך timeout מרגע
+        שהתחיל נכשל ושומר את הערך הקודם, וה-thread התקוע מוחלף בחדש. אף
+        thread לא נשאר שצריך לחכות לו — הריצה חסומה ב-timeout × מספר הסבבים.
+        מחזיר {"refreshed": [...], "failed": [...], "elapsed_ms": ...}
+        """
+        start = time.perf_counter()
+        refreshed, failed = [], []
+        if symbols:
+            results = _fetch_all(symbols, fetch, timeout, workers)
+            checked_at = datetime.now().astimezone().isoformat()
+            for sym in symbols:
+                ok, dt = results[sym]
+                if not ok:
+                    failed.append(sym)
+                    continue
+                self.entries[sym] = {
+                    "date": dt.isoformat() if dt is not None else None,
+                    "checked_at": checked_at,
+                }
+                refreshed.append(sym)
+            self.save()
+        return {
+            "refreshed": sorted(refreshed),
+            "failed": sorted(failed),
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
+    def save(self):
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.entries, indent=1, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.path)
+
+def _fetch_all(symbols, fetch, timeout, workers) -> dict:
+    """{symbol: (ok, result)} — daemon workers, deadline per symbol from its own start."""
+    queue = deque(symbols)
+    started, results = {}, {}     # symbol → perf_counter בתחילת ה-fetch / (ok, תוצאה)
+    cond = threading.Condition()
+
+    def worker():
+        while True:
+            with cond:
+                if not queue:
+                    return
+                sym = queue.popleft()
+                started[sym] = time.perf_counter()
+            try:
+                r = (True, fetch(sym))
+            except Exception:
+                r = (False, None)
+            with cond:
+                if sym in results:    # נחתך ב-timeout — כבר יש thread שמחליף אותי
+                    return
+                started.pop(sym)
+                results[sym] = r
+                cond.notify_all()
+
+    def spawn():
+        threading.Thread(target=worker, name="earnings", daemon=True).start()
+
+    with cond:
+        for _ in range(min(workers, len(symbols))):
+            spawn()
+        while len(results) < len(symbols):
+            wait_s = None
+            now = time.perf_counter()
+            for sym in [s for s, t in started.items() if now - t >= timeout]:
+                del started[sym]
+                results[sym] = (False, None)
+                spawn()   # ה-thread של sym תקוע — אחר לוקח את המשך התור
+            if started:
+                wait_s = max(0.0, min(started.values()) + timeout - now)
+            if len(results) < len(symbols):
+                cond.wait(wait_s)
+    return results
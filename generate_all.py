@@ -8,26 +8,44 @@ Design System: Glassmorphism + Apple HIG + Google Stitch
   7. Net-Only Principle  8. Floating Pill Nav
 """
 
-import json, sys, subprocess
+import time
+_T_IMPORT = time.perf_counter()   # --import-time: כמה עולה ה-import של המודול הזה
+
+import os, json, sys, argparse, hashlib
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, date
 
-sys.path.insert(0, str(Path(__file__).parent.parent / "investment-learning" / "scripts"))
-from tracker_unified import get_portfolio_data, fetch_all_prices, SYMBOL_MAP
+from market_data import fetch_history_batch, make_snapshot, snapshot_from_json
+from market_cache import get_cache
+from history_store import HistoryStore
+from build_manifest import BuildManifest
+from snapshot_log import SnapshotLog
+from templates import HtmlWriter, compile_once, atomic_write_text
+from valuation import valuate, value_series, net_withdrawal
+from portfolio_registry import get_registry
+from shards import ShardSet
+from assets import AssetStage, format_row, SIBLINGS, MANIFEST_NAME as ASSETS_MANIFEST
+from publisher import Publisher
+import tracing
+from tracing import span
 
 OUT_DIR   = Path(__file__).parent
+TRACKER_DIR = Path(__file__).parent.parent / "investment-learning" / "scripts"
+LAST_BUILD  = Path(os.environ.get("BANKOS_LAST_BUILD", "/tmp/bankos_last_build.json"))  # --from-cache
 RAW_JSON  = Path(__file__).parent.parent / "investment-learning" / "portfolios-5way.json"
 DAILY_DIR = Path(__file__).parent.parent / "investment-learning" / "daily"
-DAILY_DIR.mkdir(exist_ok=True)
 EXPERIMENT_END = date(2026, 3, 19)
+HISTORY_SPAN = "7D"   # חלון הסגירות שנכנס ל-snapshot (sparkline / שינוי שבועי)
+BUILD_META = OUT_DIR / "build-meta.json"   # volatile fields (updated time) — outside the pages
+# any edit to this file invalidates every page's inputs hash
+TEMPLATE_VERSION = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:12]
 
-PORTFOLIO_META = {
-    "SOLID":            {"slug":"turtle", "emoji":"🐢","heb":"שמרני"},
-    "AGGRESSIVE":       {"slug":"lion",   "emoji":"🦁","heb":"אגרסיבי"},
-    "SUPER-AGGRESSIVE": {"slug":"rocket", "emoji":"🚀","heb":"סופר-אגרסיבי"},
-    "SPECULATIVE":      {"slug":"target", "emoji":"🎯","heb":"ספקולטיבי"},
-    "CREATIVE":         {"slug":"canvas", "emoji":"🎨","heb":"קריאטיבי"},
-}
+PORTFOLIO_META = get_registry()    # slug / emoji / heb — data/portfolios-registry.json
+PAGE_SIZE    = 20   # כרטיסים מלאים ב-index.html; השאר נטענים עצלנית מה-shard של SUMMARY
+DEEP_BUDGET  = 40   # deep pages ישנים (מעבר ל-PAGE_SIZE) שנבנים מחדש בכל build — השאר בבא
+DATA_DIR     = OUT_DIR / "data"      # shards/ + manifest.json (shards.py)
+SUMMARY      = "portfolios-index"    # shard: שורה קומפקטית לכל תיק
 
 SECTORS = {
     "TLV:POLI":"בנקאות","TLV:LUMI":"בנקאות","TLV:HAPO":"בנקאות","TLV:MZTF":"בנקאות","TLV:IGLD":"בנקאות",
@@ -80,6 +98,7 @@ def get_thesis(sym: str, pos: dict) -> str:
     return THESIS_HEB.get(sym) or pos.get("thesis") or "—"
 
 # ─── SVG Icons ────────────────────────────────────────────────────────────────
+@compile_once
 def svg(name, cls="w-4 h-4 inline-block"):
     d = {
         "percent":    "M9 9h.01M15 15h.01M9 6a3 3 0 1 0 0 6 3 3 0 0 0 0-6zm10 6a3 3 0 1 0 0 6 3 3 0 0 0 0-6zm-12.5 6l10-10",
@@ -94,52 +113,70 @@ def svg(name, cls="w-4 h-4 inline-block"):
     return f'<svg class="{cls}" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" viewBox="0 0 24 24"><path d="{d.get(name,"")}"/></svg>'
 
 # ─── Finance ──────────────────────────────────────────────────────────────────
-def net_withdrawal(gross: float, cost_basis: float) -> float:
-    """After 0.1% sell fee + 25% CGT on gains only."""
-    gain = gross - cost_basis
-    return gross - gross * 0.001 - max(0.0, gain) * 0.25
-
 def days_left():
     return max(0, (EXPERIMENT_END - date.today()).days)
 
-def week_chg(hist):
-    if len(hist) >= 2 and hist[0] > 0:
-        return round((hist[-1]/hist[0]-1)*100, 2)
-    return None
+# ─── Tracker (lazy) ───────────────────────────────────────────────────────────
+SYMBOL_MAP = {}   # tracker symbol → yahoo symbol — מה-tracker, או מה-LAST_BUILD ב---from-cache
+_tracker = None
+
+def tracker():
+    """
+    tracker_unified, imported on first use — it pulls in yfinance / pandas, so a
+    --from-cache render never pays for it. Fills SYMBOL_MAP.
+    """
+    global _tracker
+    if _tracker is None:
+        with span("import tracker"):
+            if str(TRACKER_DIR) not in sys.path:
+                sys.path.insert(0, str(TRACKER_DIR))
+            import tracker_unified
+        SYMBOL_MAP.update(tracker_unified.SYMBOL_MAP)
+        _tracker = tracker_unified
+    return _tracker
+
+def save_last_build(data, raw, snapshot):
+    """Inputs of this build (tracker data, portfolios-5way, snapshot, symbol map) for --from-cache."""
+    try:
+        atomic_write_text(LAST_BUILD, json.dumps({
+            "data": data, "raw": raw, "snapshot": snapshot.to_json(), "symbol_map": SYMBOL_MAP,
+        }, ensure_ascii=False, separators=(",", ":")))
+    except OSError as e:
+        print(f"  ⚠️  {LAST_BUILD}: {e}")
+
+def load_last_build():
+    """→ (data, raw, snapshot) of the last build, with SYMBOL_MAP restored — no tracker, no network."""
+    d = json.loads(LAST_BUILD.read_text(encoding="utf-8"))
+    SYMBOL_MAP.update(d["symbol_map"])
+    return d["data"], d["raw"], snapshot_from_json(d["snapshot"])
 
 # ─── History ──────────────────────────────────────────────────────────────────
-def fetch_history():
+_history_store = None
+
+def fetch_history(provider=None, span=HISTORY_SPAN):
+    """
+    {yahoo_symbol: closes} for every SYMBOL_MAP value, from the local history
+    store — the network is asked only for days the store doesn't have yet.
+    """
+    global _history_store
+    tracker()
+    syms = [v for v in SYMBOL_MAP.values() if v]
     try:
-        import yfinance as yf
-        out = {}
-        for sym in set(v for v in SYMBOL_MAP.values() if v):
-            try:
-                h = yf.Ticker(sym).history(period="7d",interval="1d")
-                if h.empty: out[sym]=[]; continue
-                p=[round(float(v),4) for v in h["Close"].tolist()]
-                if sym.endswith(".TA") and p and p[0]>500: p=[round(x/100,4) for x in p]
-                out[sym]=p
-            except: out[sym]=[]
-        return out
-    except: return {}
+        if _history_store is None:   # נשאר פתוח (mmaps חמים) בין סבבים של ה-daemon
+            _history_store = HistoryStore()
+        store = _history_store
+        store.sync(syms, provider=provider)
+        return {s: store.window(s, span) for s in syms}
+    except Exception as e:
+        print(f"  ⚠️  history store: {type(e).__name__}: {e} — batch download instead")
+        try: return fetch_history_batch(syms, provider=provider, cache=get_cache())
+        except: return {}
 
 def sparkline(raw_p, hist, days=7):
-    tots=[0.0]*days
-    for pos in raw_p["positions"]:
-        sym=pos["symbol"]
-        if any(sym.startswith(s) for s in SKIP): continue
-        sh=pos.get("shares",0)
-        if not sh: continue
-        y=SYMBOL_MAP.get(sym)
-        h=hist.get(y,[]) if y else []
-        if not h:
-            v=pos.get("buyPrice",0)*sh
-            for d in range(days): tots[d]+=v
-        else:
-            hh=h[-days:] if len(h)>=days else [h[0]]*(days-len(h))+h
-            for d,price in enumerate(hh): tots[d]+=price*sh
-    c=raw_p.get("cash",0)
-    return [round(v+c) for v in tots]
+    series = value_series(raw_p["positions"], days=days, skip=SKIP,
+                          closes=lambda sym: hist.get(SYMBOL_MAP.get(sym), ()))
+    c = raw_p.get("cash",0)
+    return [round(x+c) for x in series]
 
 # ─── Shared CSS (implements all 7 principles) ─────────────────────────────────
 SHARED_CSS = """
@@ -199,8 +236,8 @@ SHARED_CSS = """
   .scroll-x::-webkit-scrollbar{display:none}
 """
 
-def doc_head(title):
-    return f"""<!DOCTYPE html>
+# <head> chrome is constant except for the title — built once at import
+_HEAD_PRE = """<!DOCTYPE html>
 <html lang="he" dir="rtl">
 <head>
 <meta charset="UTF-8">
@@ -208,13 +245,21 @@ def doc_head(title):
 <meta name="apple-mobile-web-app-capable" content="yes">
 <meta name="apple-mobile-web-app-status-bar-style" content="black-translucent">
 <meta name="theme-color" content="#080d1a">
-<title>{title}</title>
+<title>"""
+_HEAD_POST = f"""</title>
 <script src="https://cdn.tailwindcss.com"></script>
 <script src="https://cdn.jsdelivr.net/npm/chart.js@4/dist/chart.umd.min.js"></script>
 <link href="https://fonts.googleapis.com/css2?family=Assistant:wght@300;400;600;700;800&display=swap" rel="stylesheet">
 <style>{SHARED_CSS}</style>
 </head>"""
 
+def doc_head(title):
+    return _HEAD_PRE + title + _HEAD_POST
+
+# "עודכן" comes from build-meta.json so a skipped page stays byte-identical
+UPDATED_STAMP = """<div class="l3" style="text-align:center;margin-top:1rem">עודכן <span id="updated">—</span></div>
+<script>fetch('build-meta.json',{cache:'no-store'}).then(r=>r.json()).then(m=>{document.getElementById('updated').textContent=m.updated}).catch(()=>{})</script>"""
+
 # ─── INDEX PAGE ───────────────────────────────────────────────────────────────
 def _make_mini_bars(raw_p):
     """Template-exact h-1.5 allocation bars (investment-dashboard.html DNA)."""
@@ -260,7 +305,7 @@ def _make_mini_bars(raw_p):
 def _make_asset_table(portfolios, raw_by_name):
     """Asset analysis table — top holdings across all portfolios (template section 3)."""
     # Collect top holding from each portfolio
-    rows_html = ""
+    rows = []
     shown = set()
     for pf in portfolios:
         raw = raw_by_name[pf["name"]]
@@ -276,14 +321,14 @@ def _make_asset_table(portfolios, raw_by_name):
             base_100k = 100000
             pct_of_port = round(cost / base_100k * 100) if base_100k else 0
             val_net = round(cost * 0.999)  # rough net (no gain = Day 0)
-            rows_html += f"""
+            rows.append(f"""
               <tr>
                 <td style="padding:.55rem 0;font-weight:700;color:#e2e8f0">{name_short}
                   <span style="font-size:.55rem;color:#475569;margin-right:.3rem">{m['emoji']}</span>
                 </td>
                 <td style="padding:.55rem 0;color:#94a3b8" dir="ltr">₪{val_net:,}</td>
                 <td style="padding:.55rem 0;color:#64748b;font-style:italic">{pct_of_port}%</td>
-              </tr>"""
+              </tr>""")
             if len(shown) >= 8: break
         if len(shown) >= 8: break
 
@@ -302,19 +347,61 @@ def _make_asset_table(portfolios, raw_by_name):
           </tr>
         </thead>
         <tbody style="divide-y:rgba(255,255,255,.05)">
-          {rows_html}
+          {''.join(rows)}
         </tbody>
       </table>
     </div>
   </section>"""
 
 
-def build_index(portfolios, total, history, raw_by_name):
-    now  = datetime.now()
-    ts   = now.strftime("%d/%m/%Y %H:%M")
+def rank_of(portfolios) -> dict:
+    ranked = sorted(portfolios, key=lambda p: p["totalValue"], reverse=True)
+    return {p["name"]: i+1 for i,p in enumerate(ranked)}
+
+def _make_lazy_grid(shown, more):
+    """
+    Portfolios past the first PAGE_SIZE: compact cards rendered in the browser from
+    the portfolios-index shard (via data/manifest.json), 40 at a time as the
+    sentinel scrolls into view.
+    """
+    if more <= 0:
+        return ""
+    return f"""
+  <div id="more" style="display:flex;flex-direction:column;gap:.5rem;margin-top:.75rem"></div>
+  <div id="more-sentinel" class="l3" style="text-align:center;padding:1rem">עוד {more} תיקים…</div>
+  <script>
+  (()=>{{
+    let rows=null,i={shown},busy=false;
+    const box=document.getElementById('more'),s=document.getElementById('more-sentinel');
+    const esc=v=>String(v).replace(/[&<>"']/g,c=>({{'&':'&amp;','<':'&lt;','>':'&gt;','"':'&quot;',"'":'&#39;'}})[c]);
+    const card=p=>`<a href="${{encodeURIComponent(p.slug)}}.html" class="glass tappable no-underline ${{p.pct>=0?'pos-border':'neg-border'}}"
+      style="display:flex;justify-content:space-between;align-items:center;padding:.8rem 1rem;border-radius:1rem">
+      <span style="display:flex;align-items:center;gap:.6rem"><span style="font-size:1.2rem">${{esc(p.emoji)}}</span>
+        <span><span style="font-weight:700;color:#fff;font-size:.85rem">${{esc(p.name)}}</span><br>
+        <span class="l3">${{esc(p.heb)}} · #${{esc(p.rank)}}</span></span></span>
+      <span style="text-align:left"><span dir="ltr" style="font-weight:700;color:#fff">₪${{Math.round(p.net).toLocaleString()}}</span><br>
+        <span dir="ltr" class="${{p.pct>=0?'pos':'neg'}}" style="font-size:.7rem">${{p.pct>=0?'▲':'▼'}} ${{Math.abs(p.pct).toFixed(2)}}%</span></span></a>`;
+    const more=()=>{{
+      if(busy) return; busy=true;
+      (rows?Promise.resolve(rows):fetch('{DATA_DIR.name}/manifest.json',{{cache:'no-cache'}}).then(r=>r.json())
+        .then(m=>fetch('{DATA_DIR.name}/'+m.shards['{SUMMARY}'])).then(r=>r.json()).then(ix=>rows=ix.portfolios))
+        .then(r=>{{box.insertAdjacentHTML('beforeend',r.slice(i,i+40).map(card).join(''));i+=40;busy=false;if(i>=r.length)s.remove();}})
+        .catch(()=>{{busy=false}});
+    }};
+    new IntersectionObserver(e=>{{if(e[0].isIntersecting)more()}},{{rootMargin:'400px'}}).observe(s);
+  }})();
+  </script>"""
+
+def build_index(portfolios, total, snapshot, raw_by_name, rank=None, more=0):
+    """
+    Hero totals (all portfolios) + full cards for `portfolios` (the first PAGE_SIZE).
+    rank: {name: rank} across every portfolio — default: ranked among `portfolios`.
+    more: portfolios beyond these — loaded lazily as compact cards.
+    """
     dl   = days_left()
+    rank = rank or rank_of(portfolios)
 
-    base  = 500_000
+    base  = 100_000 * len(rank)
     gross = total["totalValue"]
     nw    = net_withdrawal(gross, base)
     gain  = gross - base
@@ -323,11 +410,7 @@ def build_index(portfolios, total, history, raw_by_name):
     vcls  = "pos" if gain>=0 else "neg"
     bcls  = "pos-border" if gain>=0 else "neg-border"
 
-    # Rank
-    ranked = sorted(portfolios, key=lambda p: p["totalValue"], reverse=True)
-    rank   = {p["name"]: i+1 for i,p in enumerate(ranked)}
-
-    cards = ""
+    cards = HtmlWriter()
     for i, p in enumerate(portfolios):
         m     = PORTFOLIO_META[p["name"]]
         raw   = raw_by_name[p["name"]]
@@ -341,11 +424,11 @@ def build_index(portfolios, total, history, raw_by_name):
         pbg   = "pos-bg" if pgain>=0 else "neg-bg"
         sc    = "#34d399" if pgain>=0 else "#fb7185"
         sid   = f"s{i}"
-        sp    = sparkline(raw, history)
+        sp    = sparkline(raw, snapshot.history)
         rk    = rank[p["name"]]
         medal = ("🥇" if rk==1 else "🥈" if rk==2 else "🥉" if rk==3 else f"#{rk}")
 
-        cards += f"""
+        cards.write(f"""
 <a href="{m['slug']}.html" class="glass rounded-3xl tappable rise block no-underline {pb}" style="padding:1.4rem">
   <div class="flex justify-between items-start mb-4">
     <div class="flex items-center gap-3">
@@ -379,7 +462,7 @@ def build_index(portfolios, total, history, raw_by_name):
       {pglyph} {abs(ppct):.2f}% מ-Day 0
     </span>
   </div>
-</a>"""
+</a>""")
 
     # Rule of 5: exactly 5 critical numbers on index
     # 1. Total net withdrawal  2. Total gross  3. Gain amount  4. Gain %  5. Days left
@@ -419,15 +502,15 @@ def build_index(portfolios, total, history, raw_by_name):
         &nbsp;&nbsp;
         {svg('trend-up','w-3 h-3 inline-block align-middle mr-1')} מס ₪{total['tax']:,.0f}
         &nbsp;&nbsp;
-        {svg('wallet','w-3 h-3 inline-block align-middle mr-1')} בסיס ₪500K
+        {svg('wallet','w-3 h-3 inline-block align-middle mr-1')} בסיס ₪{base//1000:,}K
       </div>
     </div>
   </div>
 
   <!-- Portfolio cards -->
   <div style="display:flex;flex-direction:column;gap:.75rem">
-    {cards}
-  </div>
+    {cards.getvalue()}
+  </div>{_make_lazy_grid(len(portfolios), more)}
 
   <!-- Asset Analysis Table (template reference DNA) -->
   {_make_asset_table(portfolios, raw_by_name)}
@@ -441,7 +524,7 @@ def build_index(portfolios, total, history, raw_by_name):
     </div>
   </div>
 
-  <div class="l3" style="text-align:center;margin-top:1rem">עודכן {ts}</div>
+  {UPDATED_STAMP}
 </div>
 
 <!-- Bottom nav — floating pill (inspired by reference design) -->
@@ -470,12 +553,10 @@ def build_index(portfolios, total, history, raw_by_name):
 
 
 # ─── DEEP-DIVE PAGE ───────────────────────────────────────────────────────────
-def build_deep(raw_p, perf, history):
+def build_deep(raw_p, perf, snapshot):
     name  = raw_p["name"]
     m     = PORTFOLIO_META[name]
-    now   = datetime.now().strftime("%d/%m/%Y %H:%M")
     dl    = days_left()
-    prices= fetch_all_prices()
     cash  = raw_p.get("cash", 0)
 
     pg    = perf["totalValue"]
@@ -488,7 +569,7 @@ def build_deep(raw_p, perf, history):
     vbg   = "pos-bg" if pgain>=0 else "neg-bg"
 
     # Holdings as mobile cards (Principle 6 — no wide table on mobile)
-    cards_html = ""
+    cards = HtmlWriter()
     pie_l, pie_v, pie_c = [], [], []
     sec_totals = {}
     PAL = ["#6366f1","#8b5cf6","#ec4899","#f43f5e","#f59e0b",
@@ -498,22 +579,17 @@ def build_deep(raw_p, perf, history):
     worst = ("", 999.0)
     idx   = 0
 
-    for pos in raw_p["positions"]:
-        sym = pos["symbol"]
-        if any(sym.startswith(s) for s in SKIP): continue
-        sh  = pos.get("shares", 0)
-        if not sh: continue
-
-        bp  = pos.get("buyPrice", 0)
-        cp  = prices.get(sym, bp)
-        val = sh * cp
-        g   = (cp - bp) * sh
-        nv  = g - val*0.001 - max(0,g)*0.25
-        npct= (nv/(bp*sh)*100) if bp*sh>0 else 0
-
-        yh   = SYMBOL_MAP.get(sym)
-        hist = history.get(yh,[]) if yh else []
-        wkp  = week_chg(hist)
+    v = valuate(raw_p["positions"], price=snapshot.price, days=0, skip=SKIP,
+                closes=lambda sym: snapshot.closes(SYMBOL_MAP[sym]) if SYMBOL_MAP.get(sym) else ())
+
+    for i, pos in enumerate(v.positions):
+        sym  = pos["symbol"]
+        sh   = pos.get("shares", 0)
+        cp   = v.price[i]
+        val  = v.value[i]
+        nv   = v.net[i]
+        npct = v.net_pct[i]
+        wkp  = v.week_pct[i]
         wks  = f"{wkp:+.1f}%" if wkp is not None else "—"
         wvc  = "pos" if (wkp or 0)>=0 else "neg"
         nvc  = "pos" if npct>=0 else "neg"
@@ -539,7 +615,7 @@ def build_deep(raw_p, perf, history):
         border_l  = "#334155" if is_day0 else ("#34d399" if npct >= 0 else "#fb7185")
 
         # FIX: RTL+numbers — wrap all numeric values in dir=ltr spans
-        cards_html += f"""
+        cards.write(f"""
 <div class="tappable" onclick="var t=document.getElementById('{tid}');t.classList.toggle('open')"
   style="background:rgba(255,255,255,.03);border:1px solid rgba(255,255,255,.07);
          border-right:3px solid {border_l};border-radius:1rem;
@@ -587,7 +663,7 @@ def build_deep(raw_p, perf, history):
     <div style="font-size:.68rem;color:#6366f1;font-weight:700;letter-spacing:.05em;margin-bottom:.3rem">📌 למה נבחר</div>
     <div style="font-size:.82rem;color:#94a3b8;line-height:1.7">{thesis}</div>
   </div>
-</div>"""
+</div>""")
 
         c = PAL[idx%len(PAL)]
         pie_l.append(short); pie_v.append(round(val)); pie_c.append(c)
@@ -605,11 +681,11 @@ def build_deep(raw_p, perf, history):
     def _css_bar_chart(title, labels, values, colors):
         """Pure CSS horizontal bar chart — RTL-safe, no canvas."""
         total = sum(values) or 1
-        rows = ""
+        rows = []
         for i, (lbl, val, col) in enumerate(zip(labels, values, colors)):
             pct = round(val / total * 100)
             bar_w = max(2, pct)
-            rows += (
+            rows.append(
                 f'<div style="display:flex;align-items:center;gap:.6rem;margin-bottom:.45rem">'
                 f'<div style="width:3.5rem;font-size:.72rem;color:#94a3b8;text-align:right;flex-shrink:0">{lbl}</div>'
                 f'<div style="flex:1;height:8px;background:rgba(255,255,255,.06);border-radius:4px;overflow:hidden">'
@@ -618,6 +694,7 @@ def build_deep(raw_p, perf, history):
                 f'<div style="width:2.5rem;font-size:.68rem;color:#475569;text-align:left;flex-shrink:0">{pct}%</div>'
                 f'</div>'
             )
+        rows = "".join(rows)
         return (f'<div class="glass-deep" style="padding:1.1rem 1.2rem;border-radius:1rem;margin-bottom:.7rem">'
                 f'<div style="font-size:.7rem;font-weight:600;color:#64748b;letter-spacing:.04em;margin-bottom:.9rem">{title}</div>'
                 f'{rows}</div>')
@@ -709,9 +786,9 @@ def build_deep(raw_p, perf, history):
   <div class="l3" style="margin-bottom:.7rem;font-style:normal;font-weight:600;color:#64748b;padding-right:.2rem">
     {svg('info','w-3 h-3 inline-block align-middle mr-1')}אחזקות · לחץ להרחבה
   </div>
-  {cards_html}
+  {cards.getvalue()}
 
-  <div class="l3" style="text-align:center;margin-top:1rem">עודכן {now}</div>
+  {UPDATED_STAMP}
 </div>
 
 <!-- FIX #5: no bottom nav on detail pages — back button is already at top -->
@@ -806,52 +883,376 @@ renderChart('c2',{json.dumps(sl,ensure_ascii=False)},{json.dumps(sv)},{json.dump
 
 
 # ─── Main ─────────────────────────────────────────────────────────────────────
-def main():
+def _history_slice(raw_portfolios, snapshot, days=None):
+    """The part of the snapshot's history a page actually reads — its own symbols only."""
+    out = {}
+    for raw in raw_portfolios:
+        for pos in raw.get("positions", []):
+            y = SYMBOL_MAP.get(pos.get("symbol"))
+            if y:
+                h = snapshot.closes(y)
+                out[y] = h[-days:] if days else h
+    return out
+
+def fetch_snapshot():
+    """One price + history fetch per run — every page renders from this object."""
+    with span("prices"):
+        prices = tracker().fetch_all_prices()
+    with span("history"):
+        history = fetch_history()
+    return make_snapshot(prices, history, source="tracker_unified")
+
+def portfolio_data(snapshot) -> dict:
+    """
+    tracker.get_portfolio_data() — the tracker's own P&L (SKIP, fees, CGT) — with its
+    price fetch answered from snapshot.quotes, so the totals use the same prices
+    every holding row renders with and the run fetches prices once.
+    """
+    t = tracker()
+    fetch = t.fetch_all_prices
+    t.fetch_all_prices = snapshot.prices   # get_portfolio_data קורא ל-fetch_all_prices של המודול
+    try:
+        return t.get_portfolio_data()
+    finally:
+        t.fetch_all_prices = fetch
+
+# ─── Rendering (serial or process pool) ───────────────────────────────────────
+_worker_snapshot = None
+
+def _init_worker(snapshot):
+    global _worker_snapshot
+    _worker_snapshot = snapshot
+
+def _render_task(task, collect=True):
+    """
+    (page, hash, kind, args) → render + atomic write → (page, hash, ms, trace events).
+    collect: hand this process's trace events back (pool workers only).
+    """
+    page, h, kind, args = task
+    t = time.perf_counter()
+    with span(f"build {page}"):
+        if kind == "index":
+            portfolios, total, raw_by, rank, more = args
+            html = build_index(portfolios, total, _worker_snapshot, raw_by, rank, more)
+        else:
+            raw, perf = args
+            html = build_deep(raw, perf, _worker_snapshot)
+    with span(f"write {page}", bytes=len(html)):
+        atomic_write_text(OUT_DIR / page, html)
+    ms = (time.perf_counter() - t) * 1000
+    return page, h, ms, tracing.drain() if collect else []
+
+def render_pages(tasks, snapshot, jobs=1):
+    """
+    Yields (page, hash, ms) in task order. jobs>1 spreads pages across a
+    process pool; the snapshot is shipped once per worker, and output is
+    byte-identical to the serial path (same builders, same inputs).
+    """
+    if jobs <= 1 or len(tasks) <= 1:
+        _init_worker(snapshot)
+        for task in tasks:
+            yield _render_task(task, collect=False)[:3]
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks)),
+                             initializer=_init_worker, initargs=(snapshot,)) as pool:
+        for page, h, ms, events in pool.map(_render_task, tasks):
+            tracing.merge(events)
+            yield page, h, ms
+
+def plan_pages(data, raw_by, snapshot, manifest, force=False, deep="auto"):
+    """
+    Render tasks for every page whose inputs hash changed since the last build.
+    index.html always (full cards for the first PAGE_SIZE); deep pages per `deep`:
+      "auto"  every page is checked; portfolios with a full card on the index and
+              pages not built yet always, other stale pages up to DEEP_BUDGET per
+              build (the rest stay stale in the manifest → picked up next build)
+      "all"   every portfolio
+      {slug}  just those (on demand)
+    """
+    dl = days_left()
+    portfolios = data["portfolios"]
+    rank  = rank_of(portfolios)
+    first = portfolios[:PAGE_SIZE]
+    more  = len(portfolios) - len(first)
+    raws  = {p["name"]: raw_by[p["name"]] for p in first}
+    tasks = []
+    h = manifest.check("index.html", {
+        "template": TEMPLATE_VERSION, "days_left": dl,
+        "portfolios": first, "total": data["total"], "more": more,
+        "rank": {name: rank[name] for name in raws},
+        "raw": raws, "history": _history_slice(raws.values(), snapshot, 7),
+    }, force=force)
+    if h:
+        tasks.append(("index.html", h, "index", (first, data["total"], raws, rank, more)))
+    else:
+        print("  · index.html (unchanged)")
+
+    eager = {PORTFOLIO_META[p["name"]]["slug"] for p in first}
+    deferred, budget = 0, DEEP_BUDGET
+    for p in portfolios:
+        m    = PORTFOLIO_META[p["name"]]
+        raw  = raw_by[p["name"]]
+        page = f"{m['slug']}.html"
+        if deep != "auto" and not (deep == "all" or m["slug"] in deep):
+            continue
+        h = manifest.check(page, {
+            "template": TEMPLATE_VERSION, "days_left": dl, "perf": p, "raw": raw,
+            "history": _history_slice([raw], snapshot),
+            "prices": {pos["symbol"]: snapshot.price(pos["symbol"]) for pos in raw["positions"]},
+        }, force=force)
+        if not h:
+            print(f"  · {page} (unchanged)")
+            continue
+        if deep == "auto" and m["slug"] not in eager and (OUT_DIR / page).exists():
+            if budget <= 0:   # ישן אבל קיים — ה-hash לא נרשם, אז ה-build הבא ימשיך מכאן
+                deferred += 1
+                continue
+            budget -= 1
+        tasks.append((page, h, "deep", (raw, p)))
+    if deferred:
+        print(f"  · {deferred} stale deep pages deferred to the next build (--deep all now)")
+    if deep not in ("auto", "all"):
+        for slug in deep - {PORTFOLIO_META[p["name"]]["slug"] for p in portfolios}:
+            print(f"  ✗ --deep {slug}: no such portfolio")
+    return tasks
+
+def write_summary(portfolios):
+    """portfolios-index shard — one compact row per portfolio (the index's lazy grid)."""
+    rank = rank_of(portfolios)
+    rows = []
+    for p in portfolios:
+        m, g = PORTFOLIO_META[p["name"]], p["totalValue"]
+        rows.append({"name": p["name"], "slug": m["slug"], "emoji": m["emoji"], "heb": m["heb"],
+                     "gross": round(g, 2), "net": round(net_withdrawal(g, 100_000), 2),
+                     "pct": round((g - 100_000) / 100_000 * 100, 2),
+                     "rank": rank[p["name"]]})
+    text = json.dumps({"portfolios": rows}, ensure_ascii=False, separators=(",", ":")) + "\n"
+    shards = ShardSet(DATA_DIR)
+    shards.put(SUMMARY, text)
+    shards.publish()
+
+def optimize_assets(pages):
+    """Minify + precompress what the builds produce: pages, data shards, InvestOS JSON (assets.py)."""
+    investos = DATA_DIR / "investos"
+    paths = [OUT_DIR / p for p in sorted(pages)]
+    paths += sorted(DATA_DIR.glob("shards/*.json"))
+    paths += sorted(investos.glob("*.json")) + sorted(investos.glob("shards/*.json"))
+    stage = AssetStage(OUT_DIR)
+    for row in stage.process(paths):
+        print(format_row(*row))
+    stage.prune()
+    stage.save()
+    print(f"  {stage.summary()}")
+
+def artifacts(manifest):
+    """Everything a build writes and publishes — the publisher commits whichever of these changed."""
+    investos = DATA_DIR / "investos"
+    files = [OUT_DIR / p for p in manifest.hashes]
+    files += [BUILD_META, manifest.path, OUT_DIR / ASSETS_MANIFEST]
+    files += sorted(DATA_DIR.glob("shards/*.json")) + [DATA_DIR / "manifest.json"]
+    files += sorted(investos.glob("*.json")) + sorted(investos.glob("shards/*.json"))
+    return files + [f.with_name(f.name + ext) for f in files for ext in SIBLINGS]
+
+_raw = (None, None)   # (mtime, parsed) — portfolios-5way.json נקרא מחדש רק כשהשתנה
+
+def load_raw() -> dict:
+    global _raw
+    mtime = RAW_JSON.stat().st_mtime_ns
+    if _raw[0] != mtime:
+        _raw = (mtime, json.loads(RAW_JSON.read_text(encoding="utf-8")))
+    return _raw[1]
+
+@contextmanager
+def _stage(timings, name, **args):
+    """span + wall ms into timings[name] — the daemon reports these per cycle."""
+    t = time.perf_counter()
+    with span(name, **args):
+        yield
+    timings[name] = round((time.perf_counter() - t) * 1000, 1)
+
+def run_cycle(publisher, force=False, jobs=1, deep="auto", assets=True, previous=None,
+              from_cache=False):
+    """
+    One refresh: data → snapshot → changed pages → assets → snapshot log → publish.
+    publisher: queues the changed artifacts (main closes it; the daemon keeps it across cycles);
+               None → nothing is committed or pushed (--from-cache without --publish).
+    previous: snapshot id of the last cycle — an unchanged snapshot adds no log record.
+    from_cache: render from LAST_BUILD — no tracker import, no network, no new log record.
+    → {"snapshot", "rebuilt", "pages", "published", "stages": {stage: ms}}
+    """
+    timings = {}
+    if from_cache:
+        with _stage(timings, "cache"):
+            data, raw, snapshot = load_last_build()
+        print(f"  from cache · snapshot {snapshot.snapshot_id} @ {snapshot.taken_at}")
+    else:
+        with _stage(timings, "data"):
+            raw       = load_raw()
+        with _stage(timings, "snapshot"):
+            snapshot  = fetch_snapshot()
+        data = portfolio_data(snapshot)   # סכומים מאותם מחירים כמו כל שורה בעמודים
+        save_last_build(data, raw, snapshot)
+        cs = get_cache().stats()
+        print(f"  prices={data['pricesCount']}  history={sum(1 for h in snapshot.history.values() if h)}"
+              f"  cache={cs['hits']}/{cs['hits']+cs['misses']} hits")
+    raw_by    = {p["name"]: p for p in raw["portfolios"]}
+    now       = datetime.fromisoformat(snapshot.taken_at) if from_cache else datetime.now()
+
+    manifest = BuildManifest(OUT_DIR)
+    with _stage(timings, "manifest"):
+        tasks = plan_pages(data, raw_by, snapshot, manifest, force=force, deep=deep)
+
+    with _stage(timings, "render", jobs=jobs, pages=len(tasks)):
+        for page, h, ms in render_pages(tasks, snapshot, jobs=jobs):
+            manifest.record(page, h)
+            print(f"  ✓ {page:<16} {ms:>7.1f}ms")
+        write_summary(data["portfolios"])
+    if tasks:
+        print(f"  render {timings['render']:.0f}ms wall · jobs={jobs}")
+
+    manifest.save()
+    if manifest.rebuilt:
+        BUILD_META.write_text(json.dumps({
+            "updated": now.strftime("%d/%m/%Y %H:%M"),
+            "snapshot": snapshot.snapshot_id, "taken_at": snapshot.taken_at,
+        }) + "\n", encoding="utf-8")
+    print(f"  {manifest.summary()}")
+    if assets:
+        with _stage(timings, "assets"):
+            optimize_assets(manifest.hashes)
+
+    # Snapshot — רק לתצפית חדשה (לא ב---from-cache)
+    if not from_cache:
+        with _stage(timings, "snapshot-log"):
+            DAILY_DIR.mkdir(exist_ok=True)
+            base = 100_000 * len(data["portfolios"])   # כמו ה-hero ב-build_index
+            snap = DAILY_DIR / f"{now.strftime('%Y-%m-%d')}-snapshot.txt"
+            lines = [f"BankOS {now.strftime('%Y-%m-%d %H:%M')}  (snapshot {snapshot.snapshot_id} @ {snapshot.taken_at})",
+                     f"Total gross: ₪{data['total']['totalValue']:,.2f}",
+                     f"Total net:   ₪{net_withdrawal(data['total']['totalValue'], base):,.2f}", ""]
+            for p in data["portfolios"]:
+                nw = net_withdrawal(p["totalValue"], 100_000)
+                lines.append(f"  {p['name']:20s}  gross ₪{p['totalValue']:>10,.2f}  net ₪{nw:>10,.2f}  {p['netReturnPct']:+.2f}%")
+            snap.write_text("\n".join(lines), encoding="utf-8")
+            try:
+                if snapshot.snapshot_id != previous:
+                    SnapshotLog(DAILY_DIR).append({
+                        "date": now.strftime("%Y-%m-%d"), "ts": now.isoformat(timespec="seconds"),
+                        "snapshot": snapshot.snapshot_id,
+                        "total_gross": round(data["total"]["totalValue"], 2),
+                        "total_net": round(net_withdrawal(data["total"]["totalValue"], base), 2),
+                        "portfolios": {p["name"]: {
+                            "gross": round(p["totalValue"], 2),
+                            "net": round(net_withdrawal(p["totalValue"], 100_000), 2),
+                            "return_pct": round(p["netReturnPct"], 2)} for p in data["portfolios"]},
+                    })
+            except Exception as e:
+                print(f"  ✗ snapshot log: {e}")
+
+    # Publish — רק מה שהשתנה; commit + push ב-thread נפרד
+    n = 0
+    if publisher is None:
+        print("  ↳ not publishing (--from-cache; add --publish to commit + push)")
+    else:
+        with _stage(timings, "publish"):
+            n = publisher.submit(artifacts(manifest), f"v4 {now.strftime('%Y-%m-%d %H:%M')}")
+        print(f"  ⇡ {n} changed files → publishing" if n else "  ↳ nothing changed")
+    return {"snapshot": snapshot.snapshot_id, "rebuilt": len(manifest.rebuilt),
+            "pages": len(manifest.rebuilt) + len(manifest.skipped), "published": n,
+            "stages": timings}
+
+def _process_age_ms():
+    """ms since this process started (Linux /proc) — None elsewhere."""
+    try:
+        start = int(Path("/proc/self/stat").read_text().rsplit(")", 1)[1].split()[19])
+        uptime = float(Path("/proc/uptime").read_text().split()[0])
+        return (uptime - start / os.sysconf("SC_CLK_TCK")) * 1000
+    except Exception:
+        return None
+
+def startup_report(label):
+    age = _process_age_ms()
+    heavy = [m for m in ("yfinance", "pandas", "numpy", "requests", "tracker_unified") if m in sys.modules]
+    print(f"  ⏱  {label}: process {f'{age:.0f}ms' if age is not None else '?'}"
+          f" · import generate_all {IMPORT_MS:.0f}ms · loaded: {', '.join(heavy) or 'no heavy modules'}")
+
+def main(force=False, jobs=1, trace=False, deep="auto", assets=True, from_cache=False,
+         import_time=False, publish=None):
+    """publish: None → publish live builds only; --from-cache renders locally unless publish=True."""
+    if import_time:
+        startup_report("ready")
     print(f"\n{'─'*52}")
     print(f"  BankOS v4 (Senior FinTech)  ·  {datetime.now().strftime('%H:%M')}")
     print(f"{'─'*52}")
-
-    data      = get_portfolio_data()
-    raw_data  = json.loads(RAW_JSON.read_text(encoding="utf-8"))
-    raw_by    = {p["name"]: p for p in raw_data["portfolios"]}
-    history   = fetch_history()
-    now       = datetime.now()
-
-    print(f"  prices={data['pricesCount']}  history={sum(1 for h in history.values() if h)}")
-
-    (OUT_DIR / "index.html").write_text(
-        build_index(data["portfolios"], data["total"], history, raw_by), encoding="utf-8")
-    print("  ✓ index.html")
-
-    for p in data["portfolios"]:
-        m = PORTFOLIO_META[p["name"]]
-        html = build_deep(raw_by[p["name"]], p, history)
-        (OUT_DIR / f"{m['slug']}.html").write_text(html, encoding="utf-8")
-        print(f"  ✓ {m['slug']}.html")
-
-    # Snapshot
-    snap = DAILY_DIR / f"{now.strftime('%Y-%m-%d')}-snapshot.txt"
-    lines = [f"BankOS {now.strftime('%Y-%m-%d %H:%M')}",
-             f"Total gross: ₪{data['total']['totalValue']:,.2f}",
-             f"Total net:   ₪{net_withdrawal(data['total']['totalValue'],500_000):,.2f}", ""]
-    for p in data["portfolios"]:
-        nw = net_withdrawal(p["totalValue"], 100_000)
-        lines.append(f"  {p['name']:20s}  gross ₪{p['totalValue']:>10,.2f}  net ₪{nw:>10,.2f}  {p['netReturnPct']:+.2f}%")
-    snap.write_text("\n".join(lines), encoding="utf-8")
-
-    # Push
-    for cmd in [
-        ["git","-C",str(OUT_DIR),"add","-A"],
-        ["git","-C",str(OUT_DIR),"commit","-m",f"v4 {now.strftime('%Y-%m-%d %H:%M')}"],
-        ["git","-C",str(OUT_DIR),"push"],
-    ]:
-        r = subprocess.run(cmd, capture_output=True, text=True)
-        if "nothing to commit" in (r.stdout+r.stderr): print("  ↳ nothing changed"); break
-    else:
-        print(f"  {'✓ pushed' if r.returncode==0 else '✗ '+r.stderr[:60]}")
+    if trace:
+        tracing.enable()
+    if from_cache and not LAST_BUILD.exists():
+        print(f"  ✗ no cached build at {LAST_BUILD} — run once without --from-cache")
+        sys.exit(1)
+
+    if publish is None:
+        publish = not from_cache
+    publisher = Publisher(OUT_DIR, debounce=0) if publish else None
+    run_cycle(publisher, force=force, jobs=jobs, deep=deep, assets=assets, from_cache=from_cache)
+    if publisher is not None:
+        publisher.close()
+    if import_time:
+        startup_report("done")
+
+    if tracing.enabled():
+        path = tracing.write(name="generate_all")
+        print(f"  {tracing.summary()}")
+        print(f"  🧭 {path}")
 
     print(f"\n  https://noamm-opencalw.github.io/investment-dashboard/")
     print(f"{'─'*52}\n")
 
+def _deep_arg(v):
+    return v if v in ("auto", "all") else {s.strip() for s in v.split(",") if s.strip()}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="BankOS dashboard generator")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild every page even if its inputs are unchanged")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                        help="render pages across N worker processes")
+    parser.add_argument("--trace", action="store_true",
+                        help="record spans and write a Chrome trace (also BANKOS_TRACE=1)")
+    parser.add_argument("--deep", type=_deep_arg, default="auto", metavar="auto|all|SLUG,…",
+                        help="which deep pages to build: those with a full index card + new ones (auto), "
+                             "every portfolio (all), or the given slugs on demand")
+    parser.add_argument("--from-cache", action="store_true",
+                        help=f"re-render from the last build's data + snapshot ({LAST_BUILD}) — "
+                             "no tracker import, no network, nothing published (see --publish)")
+    parser.add_argument("--publish", action="store_true", default=None,
+                        help="commit + push a --from-cache build too")
+    parser.add_argument("--import-time", action="store_true",
+                        help="report process startup / import cost and which heavy modules got loaded")
+    parser.add_argument("--no-assets", dest="assets", action="store_false",
+                        help="skip minify + .gz/.br precompression (readable pages for debugging)")
+    daemon = parser.add_argument_group("daemon (refresh_daemon.py)")
+    daemon.add_argument("--daemon", action="store_true",
+                        help="stay up for the trading day and refresh every --interval from a warm process")
+    daemon.add_argument("--interval", type=float, default=3600, metavar="SEC")
+    daemon.add_argument("--stay", action="store_true",
+                        help="sleep until the next session instead of exiting outside market hours")
+    daemon.add_argument("--ignore-hours", action="store_true",
+                        help="refresh around the clock (testing)")
+    daemon.add_argument("--cycles", type=int, default=None, metavar="N", help="stop after N cycles")
+    return parser.parse_args(argv)
+
+IMPORT_MS = (time.perf_counter() - _T_IMPORT) * 1000
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.daemon:
+        import refresh_daemon
+        if args.trace:
+            tracing.enable()
+        refresh_daemon.serve(sys.modules[__name__], interval=args.interval, jobs=args.jobs,
+                             deep=args.deep, assets=args.assets, stay=args.stay,
+                             ignore_hours=args.ignore_hours, max_cycles=args.cycles)
+    else:
+        main(force=args.force, jobs=args.jobs, trace=args.trace, deep=args.deep, assets=args.assets,
+             from_cache=args.from_cache, import_time=args.import_time, publish=args.publish)
@@ -6,10 +6,13 @@ Fetches live data → generates index.html → pushes to GitHub → Netlify depl
 
 import json
 import sys
-import subprocess
 from pathlib import Path
 from datetime import datetime
 
+from templates import HtmlWriter
+from snapshot_log import SnapshotLog
+from publisher import Publisher
+
 # Add tracker to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "investment-learning" / "scripts"))
 
@@ -37,7 +40,7 @@ def generate_html(data):
     }
     
     # Portfolio cards HTML
-    cards_html = ""
+    cards = HtmlWriter()
     chart_labels = []
     chart_values = []
     chart_colors = []
@@ -53,7 +56,7 @@ def generate_html(data):
         abs_pct = abs(p['netReturnPct'])
         abs_pnl = abs(p['netPnL'])
         
-        cards_html += f"""
+        cards.write(f"""
         <div class="glass rounded-2xl p-5 shadow-lg border-r-4 {card_border} transition-transform duration-300 hover:-translate-y-1">
             <div class="flex justify-between items-start mb-3">
                 <div>
@@ -80,7 +83,7 @@ def generate_html(data):
                 <span>💸 עמלות: ₪{p['fees']:,.0f}</span>
                 <span>🏛️ מס: ₪{p['tax']:,.0f}</span>
             </div>
-        </div>"""
+        </div>""")
         
         chart_labels.append(p['name'])
         chart_values.append(round(p['totalValue']))
@@ -94,25 +97,15 @@ def generate_html(data):
     total_color = 'text-emerald-400' if is_total_pos else 'text-red-400'
     total_arrow = '▲' if is_total_pos else '▼'
     
-    # Historical data for line chart (from snapshots)
-    snapshots_dir = Path(__file__).parent.parent / "investment-learning" / "daily"
+    # Historical data for line chart (from the snapshot log — last 14 days only)
     history_labels = []
     history_values = []
-    
-    if snapshots_dir.exists():
-        for snap_file in sorted(snapshots_dir.glob("*.txt"))[-14:]:
-            try:
-                content = snap_file.read_text()
-                for line in content.split('\n'):
-                    if 'Total Value:' in line and '₪' in line:
-                        val_str = line.split('₪')[1].replace(',', '').strip()
-                        val = float(val_str)
-                        date_str = snap_file.stem[:10]
-                        history_labels.append(date_str)
-                        history_values.append(round(val))
-                        break
-            except:
-                pass
+    try:
+        for rec in SnapshotLog().last_days(14):
+            history_labels.append(rec["date"])
+            history_values.append(round(rec["total_gross"]))
+    except:
+        pass
     
     if not history_values:
         history_labels = [datetime.now().strftime("%Y-%m-%d")]
@@ -171,7 +164,7 @@ def generate_html(data):
 
     <!-- Portfolio Cards Grid -->
     <div class="grid grid-cols-1 sm:grid-cols-2 gap-4 mb-6">
-        {cards_html}
+        {cards.getvalue()}
     </div>
 
     <!-- Charts Row -->
@@ -281,34 +274,16 @@ def generate_html(data):
     return html
 
 def push_to_github():
-    """git add, commit, push"""
-    dashboard_dir = Path(__file__).parent
-    
-    result = subprocess.run(
-        ["git", "add", "-A"],
-        cwd=dashboard_dir, capture_output=True, text=True
-    )
-    
-    result = subprocess.run(
-        ["git", "commit", "-m", f"Live Update - {datetime.now().strftime('%Y-%m-%d %H:%M')}"],
-        cwd=dashboard_dir, capture_output=True, text=True
-    )
-    
-    if "nothing to commit" in result.stdout:
+    """Commit + push index.html if its content changed (publisher.py)"""
+    publisher = Publisher(Path(__file__).parent, branch="main", debounce=0)
+    if not publisher.submit(["index.html"], f"Live Update - {datetime.now().strftime('%Y-%m-%d %H:%M')}"):
         print("⏭️  Nothing changed, skipping push")
         return True
-    
-    result = subprocess.run(
-        ["git", "push", "-u", "origin", "main"],
-        cwd=dashboard_dir, capture_output=True, text=True
-    )
-    
-    if result.returncode == 0:
-        print("✅ Pushed to GitHub!")
+    if publisher.close():
+        print("✅ Pushed to GitHub!" if publisher.stats["pushes"] else "⏭️  Nothing changed, skipping push")
         return True
-    else:
-        print(f"❌ Push failed: {result.stderr}")
-        return False
+    print("❌ Push failed — the commit is kept and goes out with the next push")
+    return False
 
 def main():
     print(f"\n{'='*60}")
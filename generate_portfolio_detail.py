@@ -12,20 +12,28 @@ import json
 from pathlib import Path
 from datetime import datetime
 
+from templates import HtmlWriter, stream_to_file
+from portfolio_registry import get_registry
+
+META = get_registry()   # slug / emoji / heb / title מתוך data/portfolios-registry.json
+
 def generate_detail_page(portfolio_id, portfolio_data, all_portfolios):
     """Generate a detailed portfolio page"""
+    out = HtmlWriter()
+    render_detail_page(out, portfolio_id, portfolio_data, all_portfolios)
+    return out.getvalue()
+
+def write_detail_page(path, portfolio_id, portfolio_data, all_portfolios):
+    """Stream the page straight to disk — holdings never sit in memory as one string"""
+    return stream_to_file(path, lambda out: render_detail_page(
+        out, portfolio_id, portfolio_data, all_portfolios))
+
+def render_detail_page(out, portfolio_id, portfolio_data, all_portfolios):
+    """Write the detail page into `out` (HtmlWriter) chunk by chunk"""
     
-    meta = {
-        "SOLID": {"slug": "turtle", "emoji": "🐢", "heb": "שמרני", "name": "תיק Solid"},
-        "AGGRESSIVE": {"slug": "lion", "emoji": "🦁", "heb": "אגרסיבי", "name": "תיק Aggressive"},
-        "SUPER-AGGRESSIVE": {"slug": "rocket", "emoji": "🚀", "heb": "סופר-אגרסיבי", "name": "תיק Super-Aggressive"},
-        "SPECULATIVE": {"slug": "target", "emoji": "🎯", "heb": "ספקולטיבי", "name": "תיק Speculative"},
-        "CREATIVE": {"slug": "canvas", "emoji": "🎨", "heb": "קריאטיבי", "name": "תיק Creative"},
-    }
-    
-    portfolio_meta = meta.get(portfolio_id, {})
-    portfolio_name = portfolio_meta.get("name", portfolio_id)
-    emoji = portfolio_meta.get("emoji", "📊")
+    portfolio_meta = META[portfolio_id]
+    portfolio_name = portfolio_meta["title"]
+    emoji = portfolio_meta["emoji"]
     
     # Extract data
     net_value = portfolio_data.get("net_value", 0)
@@ -46,7 +54,7 @@ def generate_detail_page(portfolio_id, portfolio_data, all_portfolios):
     perf_class = "text-green-400" if performance_pct > 0 else "text-red-400"
     perf_arrow = "↗" if performance_pct > 0 else "↘"
     
-    html = f"""<!DOCTYPE html>
+    out.write(f"""<!DOCTYPE html>
 <html lang="he" dir="rtl">
 <head>
     <meta charset="UTF-8">
@@ -153,7 +161,7 @@ def generate_detail_page(portfolio_id, portfolio_data, all_portfolios):
                     </tr>
                 </thead>
                 <tbody>
-"""
+""")
     
     # Add holdings rows
     for holding in sorted_holdings:
@@ -167,7 +175,7 @@ def generate_detail_page(portfolio_id, portfolio_data, all_portfolios):
         return_pct = holding.get("return_pct", 0)
         return_class = "text-green-400" if return_pct > 0 else "text-red-400"
         
-        html += f"""
+        out.write(f"""
                     <tr class="border-b border-slate-800 hover:bg-slate-800/30">
                         <td class="py-3 px-4 font-mono">{symbol}</td>
                         <td class="py-3 px-4">{name}</td>
@@ -178,9 +186,9 @@ def generate_detail_page(portfolio_id, portfolio_data, all_portfolios):
                         <td class="py-3 px-4">{pct_of_portfolio:.1f}%</td>
                         <td class="py-3 px-4 {return_class} font-bold">{return_pct:+.1f}%</td>
                     </tr>
-"""
+""")
     
-    html += """
+    out.write("""
                 </tbody>
             </table>
         </div>
@@ -199,7 +207,7 @@ def generate_detail_page(portfolio_id, portfolio_data, all_portfolios):
     <script>
         // Category Pie Chart
         const categoryData = {
-"""
+""")
     
     # Add category data for chart
     category_labels = []
@@ -208,7 +216,7 @@ def generate_detail_page(portfolio_id, portfolio_data, all_portfolios):
         category_labels.append(cat)
         category_values.append(val)
     
-    html += f"""
+    out.write(f"""
             labels: {json.dumps(category_labels)},
             datasets: [{{
                 data: {json.dumps(category_values)},
@@ -260,11 +268,11 @@ def generate_detail_page(portfolio_id, portfolio_data, all_portfolios):
             const rows = [
                 ['סימול', 'שם החברה', 'תחום', 'כמות', 'מחיר', 'שווי', '% מהתיק', 'תשואה']
             ];
-"""
+""")
     
     # Add holdings data for CSV export
     for holding in sorted_holdings:
-        html += f"""
+        out.write(f"""
             rows.push([
                 '{holding.get("symbol", "")}',
                 '{holding.get("name", "")}',
@@ -275,9 +283,9 @@ def generate_detail_page(portfolio_id, portfolio_data, all_portfolios):
                 {(holding.get("value", 0) / net_value * 100) if net_value > 0 else 0:.1f},
                 {holding.get("return_pct", 0):.1f}
             ]);
-"""
+""")
     
-    html += """
+    out.write("""
             const csvContent = rows.map(row => row.join(',')).join('\\n');
             const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
             const link = document.createElement('a');
@@ -288,9 +296,7 @@ def generate_detail_page(portfolio_id, portfolio_data, all_portfolios):
     </script>
 </body>
 </html>
-"""
-    
-    return html
+""")
 
 
 if __name__ == "__main__":
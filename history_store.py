@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+History Store — local columnar daily closes, memory-mapped
+  • two flat files per symbol: <sym>.d (int32 ordinal dates) and <sym>.c (float64 closes)
+  • append-only: a daily sync downloads only the days after the last stored
+    bar; the current session's bar is rewritten in place until it closes.
+    An interrupted append leaves a torn tail: reads ignore it, the next
+    append truncates it back to whole bars
+  • window(sym, "1M") is a zero-copy memoryview slice of the mmap — pages come
+    from the OS page cache, so thousands of symbols × years stay flat in RSS
+
+usage:
+  python history_store.py sync [SYM ...]     # default: every SYMBOL_MAP value
+  python history_store.py show SYM [7D|1M|3M|YTD|1Y|ALL]
+  python history_store.py stats
+"""
+
+import os
+import mmap
+import sys
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from market_cache import SESSION_OPEN, TRADING_DAYS, in_session
+
+HISTORY_DIR = Path(os.environ.get("BANKOS_HISTORY_DIR", "/tmp/bankos_history"))
+BACKFILL    = "1y"    # היסטוריה ראשונית לסימבול חדש
+MAX_OPEN    = 256     # mmaps פתוחים במקביל (כל אחד מחזיק fd)
+
+WINDOWS = {"7D": 7, "1M": 31, "3M": 92, "1Y": 366}
+# yfinance periods, smallest first — the sync asks for the shortest one covering the gap
+PERIODS = (("5d", 5), ("1mo", 31), ("3mo", 92), ("6mo", 183), ("1y", 366),
+           ("2y", 731), ("5y", 1827), ("max", None))
+
+def _fname(symbol: str) -> str:
+    # ^TA125.TA / BRK-B → safe file names
+    return symbol.replace("/", "_").replace("^", "_")
+
+def _map(path: Path):
+    """Read-only mmap of a whole file, or None when it is missing/empty."""
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return None
+
+def last_session_day(now: datetime = None) -> date:
+    """Most recent trading day whose session has opened — the newest bar that can exist."""
+    now = now or datetime.now()
+    day = now.date()
+    if (now.hour, now.minute) < SESSION_OPEN:
+        day -= timedelta(days=1)
+    while day.weekday() not in TRADING_DAYS:
+        day -= timedelta(days=1)
+    return day
+
+def period_for(gap_days: int) -> str:
+    for name, span in PERIODS:
+        if span is None or gap_days <= span:
+            return name
+    return "max"
+
+
+def _items(m, fmt: str) -> memoryview:
+    """Whole items of a mapped column — a torn tail (bytes short of an item) is left out."""
+    if not m:
+        return memoryview(b"").cast(fmt)
+    size = array(fmt).itemsize
+    return memoryview(m)[:len(m) // size * size].cast(fmt)
+
+
+class Series:
+    """dates / closes of one symbol as zero-copy memoryviews over the mmaps."""
+
+    __slots__ = ("symbol", "dates", "closes", "_maps")
+
+    def __init__(self, symbol, dmap, cmap):
+        self.symbol = symbol
+        self._maps = (dmap, cmap)
+        d, c = _items(dmap, "i"), _items(cmap, "d")
+        n = min(len(d), len(c))   # append נקטע באמצע → החלק השלם בלבד
+        self.dates, self.closes = d[:n], c[:n]
+
+    def __len__(self):
+        return len(self.closes)
+
+    def last_date(self):
+        return date.fromordinal(self.dates[-1]) if len(self) else None
+
+    def since(self, start: date) -> memoryview:
+        return self.closes[bisect_left(self.dates, start.toordinal()):]
+
+    def window(self, span: str = "7D", today: date = None) -> memoryview:
+        """7D / 1M / 3M / YTD / 1Y (calendar days back from today) or ALL."""
+        span = span.upper()
+        if span == "ALL":
+            return self.closes
+        today = today or date.today()
+        if span == "YTD":
+            return self.since(date(today.year, 1, 1))
+        return self.since(today - timedelta(days=WINDOWS[span] - 1))
+
+
+class HistoryStore:
+    def __init__(self, root=HISTORY_DIR, max_open: int = MAX_OPEN):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_open = max_open
+        self._open = OrderedDict()   # LRU: symbol → Series
+
+    def _paths(self, symbol):
+        f = _fname(symbol)
+        return self.root / f"{f}.d", self.root / f"{f}.c"
+
+    def series(self, symbol: str) -> Series:
+        s = self._open.get(symbol)
+        if s is not None:
+            self._open.move_to_end(symbol)
+            return s
+        dp, cp = self._paths(symbol)
+        s = Series(symbol, _map(dp), _map(cp))
+        self._open[symbol] = s
+        while len(self._open) > self.max_open:
+            self._open.popitem(last=False)   # ה-mmap נסגר כשאין יותר views עליו
+        return s
+
+    def window(self, symbol: str, span: str = "7D", today: date = None) -> memoryview:
+        return self.series(symbol).window(span, today)
+
+    def symbols(self):
+        return sorted(p.stem for p in self.root.glob("*.c"))
+
+    # ── writes ──
+    def append(self, symbol: str, rows) -> int:
+        """
+        rows: [(YYYY-MM-DD, close)] oldest first. Days after the last stored bar
+        are appended; a row for the last stored day overwrites its close (the
+        session bar moves until the close); older rows are ignored.
+        Returns the number of new bars.
+        """
+        s = self.series(symbol)
+        last = s.dates[-1] if len(s) else 0
+        n = len(s)
+        del s
+        self._open.pop(symbol, None)   # views ישנים לא רואים את הסוף החדש
+
+        dp, cp = self._paths(symbol)
+        # שארית מכתיבה שנקטעה (חלק מ-item, או עמודה אחת ארוכה מהשנייה) → חזרה ל-n שלמים
+        for path, size in ((cp, 8), (dp, 4)):
+            if path.exists() and path.stat().st_size != n * size:
+                os.truncate(path, n * size)
+        new_d, new_c, rewrite = array("i"), array("d"), None
+        for d, c in rows:
+            o = date.fromisoformat(d).toordinal()
+            if o > last and (not new_d or o > new_d[-1]):
+                new_d.append(o); new_c.append(float(c))
+            elif o == last and n:
+                rewrite = float(c)
+        if rewrite is not None:
+            with open(cp, "r+b") as f:
+                f.seek((n - 1) * 8)
+                f.write(array("d", [rewrite]).tobytes())
+        if new_d:
+            for path, col in ((cp, new_c), (dp, new_d)):
+                with open(path, "ab") as f:
+                    f.write(col.tobytes())
+        return len(new_d)
+
+    def sync(self, symbols, provider=None, now: datetime = None) -> dict:
+        """
+        Bring every symbol up to the latest session with one batched download
+        per gap size. Symbols already holding the newest bar are skipped
+        outside the session (nothing can change), so a rerun is offline.
+        """
+        from market_data import fetch_dated_batch
+        now = now or datetime.now()
+        newest = last_session_day(now)
+        live = in_session(now)
+
+        by_period = {}
+        for sym in sorted(set(s for s in symbols if s)):
+            last = self.series(sym).last_date()
+            if last is None:
+                period = BACKFILL
+            elif last >= newest and not live:
+                continue
+            else:
+                period = period_for((now.date() - last).days + 1)
+            by_period.setdefault(period, []).append(sym)
+
+        stats = {"symbols": len(set(symbols)), "fetched": 0, "bars": 0}
+        for period, syms in by_period.items():
+            rows = fetch_dated_batch(syms, provider=provider, period=period)
+            stats["fetched"] += len(syms)
+            for sym in syms:
+                stats["bars"] += self.append(sym, rows.get(sym, []))
+        return stats
+
+    def stats(self) -> dict:
+        files = list(self.root.glob("*.c"))
+        return {"symbols": len(files),
+                "bars": sum(f.stat().st_size for f in files) // 8,
+                "bytes": sum(f.stat().st_size for f in self.root.iterdir()),
+                "path": str(self.root)}
+
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    store = HistoryStore()
+    if cmd == "sync":
+        syms = sys.argv[2:]
+        if not syms:
+            sys.path.insert(0, str(Path(__file__).parent.parent / "investment-learning" / "scripts"))
+            from tracker_unified import SYMBOL_MAP
+            syms = [v for v in SYMBOL_MAP.values() if v]
+        st = store.sync(syms)
+        print(f"✅ {st['fetched']}/{st['symbols']} symbols fetched · +{st['bars']} bars")
+    elif cmd == "show" and len(sys.argv) > 2:
+        w = store.window(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else "7D")
+        print(f"📈 {sys.argv[2]}: {len(w)} closes  {list(w[-10:])}")
+    else:
+        st = store.stats()
+        print(f"📦 {st['symbols']} symbols · {st['bars']:,} bars · {st['bytes']/1e6:.1f}MB  ({st['path']})")
@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+"""
+InvestOS Store — SQLite data-access layer for data/investos/.schema.sql
+  • ingest: portfolios.json / pnl.json / insights.json / strategies.json → DB
+  • updates: one transaction per change (position, trade, snapshot, insight)
+  • export: regenerates the JSON payloads investos.html load()s, streamed from
+    cursors row by row, and only for payloads an update actually touched —
+    in portfolios.json only the touched portfolios are re-encoded; the rest
+    are copied from their shards
+  • round trip: insights / strategies keep their file order (ord column), and
+    each ingested portfolio is kept verbatim (portfolio_source) and exported
+    as is until something in it changes — then it is recomputed from the DB
+    (gross, sectors, allocation_pct…); pnl.json likewise, until a snapshot
+    changes. ingest → export gives the files back as they came, except NaN,
+    which is written as null
+  • shards: each export also publishes content-hashed shards (one per section,
+    one per portfolio) + manifest.json — see shards.py
+
+usage:
+  python investos_store.py ingest          # JSON → DB (idempotent)
+  python investos_store.py export [--all]  # DB → JSON
+  python investos_store.py check           # ingest → export into a temp dir, diff the payloads
+  python investos_store.py price <portfolio> <ticker> <price>
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from shards import ShardSet
+
+DATA_DIR    = Path(__file__).parent / "data" / "investos"
+SCHEMA_FILE = DATA_DIR / ".schema.sql"
+DB_FILE     = DATA_DIR / "investos.db"
+INSIGHTS_LIMIT = 20   # latest + 19 history, כמו ה-JSON הקיים
+
+PAYLOADS = ("portfolios.json", "pnl.json", "insights.json", "strategies.json")
+
+# ─── Streaming JSON encoder ───────────────────────────────────────────────────
+class RawFile:
+    """A file of encoded JSON (a shard), copied verbatim in chunks into the full file."""
+    CHUNK = 64 * 1024
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def __iter__(self):
+        with open(self.path, encoding="utf-8") as fp:
+            while chunk := fp.read(self.CHUNK):
+                yield chunk
+
+def iter_json(obj):
+    """
+    Like json.JSONEncoder.iterencode, but any iterator/generator inside obj is
+    encoded as a list lazily — rows are pulled from the DB while writing.
+    NaN is emitted as null (the old files had NaN, which JSON.parse rejects).
+    """
+    if isinstance(obj, RawFile):
+        yield from obj
+    elif isinstance(obj, dict):
+        yield "{"
+        for i, (k, v) in enumerate(obj.items()):
+            if i: yield ","
+            yield json.dumps(str(k), ensure_ascii=False)
+            yield ":"
+            yield from iter_json(v)
+        yield "}"
+    elif isinstance(obj, (list, tuple)) or hasattr(obj, "__next__"):
+        yield "["
+        for i, v in enumerate(obj):
+            if i: yield ","
+            yield from iter_json(v)
+        yield "]"
+    elif isinstance(obj, float) and obj != obj:
+        yield "null"
+    else:
+        yield json.dumps(obj, ensure_ascii=False)
+
+def write_json_stream(path, obj):
+    """Stream obj into path via temp file + rename."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as fp:
+            for chunk in iter_json(obj):
+                fp.write(chunk)
+            fp.write("\n")
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+def _num(v):
+    """JSON values arrive as "54.5000" strings or NaN floats."""
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return None if f != f else f
+
+# ─── Store ────────────────────────────────────────────────────────────────────
+class InvestOSStore:
+    def __init__(self, path=DB_FILE, schema=SCHEMA_FILE):
+        self.path = Path(path)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(Path(schema).read_text(encoding="utf-8"))
+        self._migrate()
+        self.dirty = set()
+        self.dirty_portfolios = set()   # None = כל התיקים (ingest / export --all)
+
+    def close(self):
+        self.db.close()
+
+    def _migrate(self):
+        """DBs created before the ord column: add it, in the order export used to give."""
+        with self.db:
+            for table, backfill in (
+                    ("insights", "(SELECT COUNT(*) FROM insights i WHERE (i.created_at, i.id) > "
+                                 "(insights.created_at, insights.id))"),
+                    ("strategies", "id")):
+                cols = {r["name"] for r in self.db.execute(f"PRAGMA table_info({table})")}
+                if "ord" not in cols:
+                    self.db.execute(f"ALTER TABLE {table} ADD COLUMN ord INTEGER")
+                    self.db.execute(f"UPDATE {table} SET ord = {backfill}")
+
+    # ── meta ──
+    def meta(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set_meta(self, key, value):
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES (?,?)",
+                        (key, json.dumps(value, ensure_ascii=False)))
+
+    def _touch(self, *payloads, portfolio=None):
+        """portfolio: the one portfolio the change is confined to (None = any of them)."""
+        self._set_meta("updated_at", datetime.now().isoformat(timespec="seconds"))
+        self.dirty.update(payloads)
+        if "portfolios.json" in payloads:
+            if portfolio is None:
+                self.dirty_portfolios = None
+            elif self.dirty_portfolios is not None:
+                self.dirty_portfolios.add(portfolio)
+
+    def _reorder(self, table, n):
+        """Make room for a file's n rows at ord 0..n-1 — rows the file lacks keep their order, after it."""
+        self.db.execute(f"UPDATE {table} SET ord = ord + ? WHERE ord IS NOT NULL", (n,))
+
+    # ── ingest ──
+    def ingest(self, data_dir=DATA_DIR):
+        """Load the existing JSON payloads into the DB in one transaction."""
+        data_dir = Path(data_dir)
+        def read(name):
+            f = data_dir / name
+            return json.loads(f.read_text(encoding="utf-8")) if f.exists() else None
+
+        port, pnl = read("portfolios.json"), read("pnl.json")
+        ins, strat = read("insights.json"), read("strategies.json")
+        with self.db:
+            if port:
+                for k in ("updated_at", "pilot_day", "target_net_profit",
+                          "total_capital", "net_profit_to_date"):
+                    self._set_meta(k, port.get(k))
+                for p in port["portfolios"]:
+                    self._ingest_portfolio(p)
+            if pnl:
+                for k in ("currency", "usdils"):
+                    self._set_meta(k, pnl.get(k))
+                for s in pnl["portfolios"]:
+                    self.db.execute("""
+                        INSERT INTO daily_snapshots (portfolio_id, date, gross_value, net_value, daily_change_pct)
+                        VALUES (?,?,?,?,?)
+                        ON CONFLICT(portfolio_id, date) DO UPDATE SET
+                            gross_value=excluded.gross_value, net_value=excluded.net_value,
+                            daily_change_pct=excluded.daily_change_pct""",
+                        (s["portfolio_id"], s["date"], s["gross_value"], s["net_value"],
+                         s.get("daily_change_pct", 0)))
+            if ins:
+                self._set_meta("insights_updated_at", ins.get("updated_at"))
+                items = [i for i in [ins.get("latest")] + ins.get("history", []) if i]
+                self._reorder("insights", len(items))
+                for n, i in enumerate(items):
+                    self.db.execute("""
+                        INSERT OR REPLACE INTO insights
+                            (id, agent, level, portfolio_id, text, action_taken, confidence, created_at, ord)
+                        VALUES (?,?,?,?,?,?,?,?,?)""",
+                        (i["id"], i["agent"], i.get("level", "info"), i.get("portfolio_id"),
+                         i["text"], i.get("action_taken"), _num(i.get("confidence")),
+                         i.get("timestamp"), n))
+            if strat:
+                self._set_meta("strategies_updated_at", strat.get("updated_at"))
+                self._set_meta("selected_strategy", strat.get("selected_strategy"))
+                self._set_meta("approval_required", strat.get("approval_required"))
+                candidates = strat.get("candidates", [])
+                self._reorder("strategies", len(candidates))
+                for n, c in enumerate(candidates):
+                    self.db.execute("""
+                        INSERT OR REPLACE INTO strategies
+                            (id, portfolio_id, name, type, status, backtest_return_pct, backtest_sharpe,
+                             backtest_max_drawdown, approved_by, notes, created_at, ord)
+                        VALUES (?,?,?,?,?,?,?,?,?,?,?,?)""",
+                        (c["id"], c["portfolio_id"], c["name"], c.get("type"), c.get("status"),
+                         _num(c.get("backtest_return_pct")), _num(c.get("backtest_sharpe")),
+                         _num(c.get("backtest_max_drawdown")), c.get("approved_by"), c.get("notes"),
+                         c.get("created_at"), n))
+            # אחרי כל הכתיבות — ה-triggers של positions / daily_snapshots מוחקים מקור
+            for p in (port or {}).get("portfolios", []):
+                self.db.execute("INSERT OR REPLACE INTO portfolio_source VALUES (?,?)",
+                                (p["id"], json.dumps(p, ensure_ascii=False)))
+            if pnl:
+                self._set_meta("pnl_source", pnl)
+        self.dirty.update(PAYLOADS)
+        self.dirty_portfolios = None
+
+    def _ingest_portfolio(self, p):
+        self.db.execute("""
+            INSERT INTO portfolios (id, name, emoji, strategy, description, initial_capital, target_30d_pct, benchmark)
+            VALUES (?,?,?,?,?,?,?,?)
+            ON CONFLICT(id) DO UPDATE SET
+                name=excluded.name, emoji=excluded.emoji, strategy=excluded.strategy,
+                description=excluded.description, initial_capital=excluded.initial_capital,
+                target_30d_pct=excluded.target_30d_pct, benchmark=excluded.benchmark""",
+            (p["id"], p["name"], p.get("emoji"), p.get("strategy"), p.get("description"),
+             p.get("initial_capital", 100000), p.get("target_30d_pct"), p.get("benchmark")))
+        for a in p.get("assets", []):
+            self._upsert_position(p["id"], a["ticker"], name=a.get("name"),
+                                  asset_type=a.get("asset_type"), sector=a.get("sector"),
+                                  quantity=_num(a.get("quantity")), avg_cost=_num(a.get("avg_cost")),
+                                  current_price=_num(a.get("current_price")),
+                                  daily_change_pct=_num(a.get("daily_change_pct")) or 0)
+        for h in p.get("performance_history", []):
+            self.db.execute("""
+                INSERT INTO daily_snapshots (portfolio_id, date, gross_value, net_value)
+                VALUES (?,?,?,?)
+                ON CONFLICT(portfolio_id, date) DO UPDATE SET gross_value=excluded.gross_value""",
+                (p["id"], h["date"], h["value"], h["value"]))
+
+    def _upsert_position(self, portfolio_id, ticker, **fields):
+        cols = ["portfolio_id", "ticker"] + list(fields)
+        sets = ", ".join(f"{c}=excluded.{c}" for c in fields)
+        self.db.execute(f"""
+            INSERT INTO positions ({", ".join(cols)}) VALUES ({", ".join("?" * len(cols))})
+            ON CONFLICT(portfolio_id, ticker) DO UPDATE SET {sets}, updated_at=datetime('now')""",
+            [portfolio_id, ticker] + list(fields.values()))
+
+    # ── transactional updates ──
+    def update_position(self, portfolio_id, ticker, **fields):
+        """Upsert one position (price, quantity, ...) in its own transaction."""
+        with self.db:
+            self._upsert_position(portfolio_id, ticker, **fields)
+            self._touch("portfolios.json", portfolio=portfolio_id)
+
+    def record_transaction(self, portfolio_id, ticker, action, quantity, price,
+                           fee=0.0, tax=0.0, notes=None, approved_by=None):
+        """Trade + position change atomically: both land or neither does."""
+        gross = quantity * price
+        sign = -1 if action == "sell" else 1
+        with self.db:
+            self.db.execute("""
+                INSERT INTO transactions (portfolio_id, ticker, action, quantity, price, gross_amount,
+                                          fee, tax, net_amount, notes, approved_by)
+                VALUES (?,?,?,?,?,?,?,?,?,?,?)""",
+                (portfolio_id, ticker, action, quantity, price, gross, fee, tax,
+                 gross - fee - tax, notes, approved_by))
+            if action in ("buy", "sell"):
+                row = self.db.execute(
+                    "SELECT quantity, avg_cost FROM positions WHERE portfolio_id=? AND ticker=?",
+                    (portfolio_id, ticker)).fetchone()
+                q0, c0 = (row["quantity"] or 0, row["avg_cost"] or 0) if row else (0, 0)
+                q1 = q0 + sign * quantity
+                c1 = (q0 * c0 + quantity * price) / q1 if action == "buy" and q1 else c0
+                self._upsert_position(portfolio_id, ticker, quantity=q1, avg_cost=c1)
+            self._touch("portfolios.json", portfolio=portfolio_id)
+
+    def add_snapshot(self, portfolio_id, date, gross_value, net_value, daily_change_pct=0.0):
+        with self.db:
+            self.db.execute("""
+                INSERT INTO daily_snapshots (portfolio_id, date, gross_value, net_value, daily_change_pct)
+                VALUES (?,?,?,?,?)
+                ON CONFLICT(portfolio_id, date) DO UPDATE SET
+                    gross_value=excluded.gross_value, net_value=excluded.net_value,
+                    daily_change_pct=excluded.daily_change_pct""",
+                (portfolio_id, date, gross_value, net_value, daily_change_pct))
+            self._touch("portfolios.json", "pnl.json", portfolio=portfolio_id)
+
+    def add_insight(self, agent, text, level="info", portfolio_id=None,
+                    action_taken=None, confidence=None):
+        with self.db:
+            self.db.execute("""
+                INSERT INTO insights (agent, level, portfolio_id, text, action_taken, confidence, created_at, ord)
+                VALUES (?,?,?,?,?,?,?, (SELECT COALESCE(MIN(ord), 0) - 1 FROM insights))""",
+                (agent, level, portfolio_id, text, action_taken, confidence,
+                 datetime.now().astimezone().isoformat()))
+            self._set_meta("insights_updated_at", datetime.now().isoformat())
+            self._touch("insights.json")
+
+    # ── payload builders (lazy) ──
+    def _portfolio_rows(self):
+        return self.db.execute("SELECT * FROM portfolios ORDER BY rowid").fetchall()
+
+    def _assets(self, pid):
+        return [dict(r) for r in self.db.execute("""
+            SELECT ticker, name, asset_type, sector, quantity, avg_cost, current_price,
+                   daily_change_pct,
+                   quantity * COALESCE(current_price, avg_cost) AS value,
+                   quantity * avg_cost AS cost_basis
+            FROM positions WHERE portfolio_id=? ORDER BY id""", (pid,))]
+
+    def _snapshots(self, pid):
+        return self.db.execute(
+            "SELECT date, gross_value, net_value, daily_change_pct FROM daily_snapshots "
+            "WHERE portfolio_id=? ORDER BY date", (pid,)).fetchall()
+
+    def _source(self, pid):
+        row = self.db.execute("SELECT payload FROM portfolio_source WHERE portfolio_id=?",
+                              (pid,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _portfolio_payload(self, p):
+        """The ingested object while the portfolio is unchanged, else rebuilt from the DB."""
+        pid = p["id"]
+        source = self._source(pid)
+        if source is not None:
+            return source
+        assets = self._assets(pid)
+        gross = round(sum(a["value"] or 0 for a in assets), 2)
+        snaps = self._snapshots(pid)
+        fees = self.db.execute("SELECT total_fees FROM portfolio_summary WHERE portfolio_id=?",
+                               (pid,)).fetchone()[0]
+        sectors = {}
+        for a in assets:
+            sectors[a["sector"]] = sectors.get(a["sector"], 0) + (a["value"] or 0)
+        return {
+            "id": pid, "name": p["name"], "emoji": p["emoji"], "strategy": p["strategy"],
+            "description": p["description"], "target_30d_pct": p["target_30d_pct"],
+            "initial_capital": p["initial_capital"], "gross": gross, "fees": fees,
+            "daily_change_pct": snaps[-1]["daily_change_pct"] if snaps else 0.0,
+            "assets": ({
+                "ticker": a["ticker"], "name": a["name"], "asset_type": a["asset_type"],
+                "sector": a["sector"],
+                "quantity": f"{a['quantity'] or 0:.4f}", "avg_cost": f"{a['avg_cost'] or 0:.4f}",
+                "current_price": str(round(a["current_price"], 4)) if a["current_price"] is not None else None,
+                "value": round(a["value"] or 0, 3), "cost_basis": round(a["cost_basis"] or 0, 3),
+                "daily_change_pct": a["daily_change_pct"] or 0.0,
+                "allocation_pct": round((a["value"] or 0) / gross * 100, 1) if gross else None,
+            } for a in assets),
+            "sectors": {k: round(v / gross * 100, 1) if gross else None for k, v in sectors.items()},
+            "benchmark": p["benchmark"],
+            "performance_history": ({"date": s["date"], "value": s["gross_value"]} for s in snaps),
+        }
+
+    def portfolios_payload(self):
+        rows = self._portfolio_rows()
+        unchanged = self.db.execute("SELECT COUNT(*) FROM portfolio_source").fetchone()[0] == len(rows)
+        if unchanged and self.meta("total_capital") is not None:
+            total_capital, profit = self.meta("total_capital"), self.meta("net_profit_to_date")
+        else:
+            total_capital = sum(p["initial_capital"] for p in rows)
+            total_gross = self.db.execute(
+                "SELECT COALESCE(SUM(quantity * COALESCE(current_price, avg_cost)),0) FROM positions"
+            ).fetchone()[0]
+            profit = round(total_gross - total_capital, 2)
+        return {
+            "updated_at": self.meta("updated_at"),
+            "pilot_day": self.meta("pilot_day", 1),
+            "total_capital": total_capital,
+            "target_net_profit": self.meta("target_net_profit"),
+            "net_profit_to_date": profit,
+            "portfolios": (self._portfolio_payload(p) for p in rows),
+        }
+
+    def pnl_payload(self):
+        source = self.meta("pnl_source")   # נמחק ע"י trigger ברגע ש-snapshot משתנה
+        if source is not None:
+            return source
+        rows, tot_gross, tot_net, tot_prev, tot_init, date = [], 0.0, 0.0, 0.0, 0.0, None
+        for p in self._portfolio_rows():
+            snaps = self._snapshots(p["id"])
+            if not snaps: continue
+            last = snaps[-1]
+            prev = snaps[-2]["gross_value"] if len(snaps) > 1 else last["gross_value"]
+            ath = max(s["gross_value"] for s in snaps)
+            date = max(date or last["date"], last["date"])
+            rows.append({
+                "portfolio_id": p["id"], "date": last["date"],
+                "gross_value": last["gross_value"], "net_value": last["net_value"],
+                "daily_change_ils": round(last["gross_value"] - prev, 2),
+                "daily_change_pct": last["daily_change_pct"],
+                "drawdown_from_ath_pct": round((last["gross_value"] / ath - 1) * 100, 4) if ath else 0.0,
+                "roi_pct": round((last["gross_value"] / p["initial_capital"] - 1) * 100, 4),
+            })
+            tot_gross += last["gross_value"]; tot_net += last["net_value"]
+            tot_prev += prev; tot_init += p["initial_capital"]
+        return {
+            "updated_at": self.meta("updated_at"), "date": date,
+            "currency": self.meta("currency", "ILS"), "usdils": self.meta("usdils"),
+            "total_gross": round(tot_gross, 2), "total_net": round(tot_net, 2),
+            "daily_change_ils": round(tot_gross - tot_prev, 2),
+            "daily_change_pct": round((tot_gross / tot_prev - 1) * 100, 4) if tot_prev else 0.0,
+            "roi_from_initial": round((tot_gross / tot_init - 1) * 100, 4) if tot_init else 0.0,
+            "portfolios": rows,
+        }
+
+    def insights_payload(self):
+        items = [{
+            "id": r["id"], "agent": r["agent"], "level": r["level"],
+            "portfolio_id": r["portfolio_id"], "text": r["text"],
+            "action_taken": r["action_taken"],
+            "confidence": f"{r['confidence']:.2f}" if r["confidence"] is not None else None,
+            "timestamp": r["created_at"],
+        } for r in self.db.execute(
+            # ord NULL (סוכן שכתב ישירות ל-DB) קודם — הוא החדש ביותר
+            "SELECT * FROM insights ORDER BY ord, created_at DESC, id DESC LIMIT ?", (INSIGHTS_LIMIT,))]
+        return {
+            "updated_at": self.meta("insights_updated_at"),
+            "latest": items[0] if items else None,
+            "history": items[1:],
+        }
+
+    def strategies_payload(self):
+        cur = self.db.execute("""
+            SELECT id, portfolio_id, name, type, status, backtest_return_pct, backtest_sharpe,
+                   backtest_max_drawdown, approved_by, notes, created_at
+            FROM strategies ORDER BY ord IS NULL, ord, id""")
+        backtest = ("backtest_return_pct", "backtest_sharpe", "backtest_max_drawdown")
+        return {
+            "updated_at": self.meta("strategies_updated_at"),
+            "candidates": ({k: f"{r[k]:.2f}" if k in backtest and r[k] is not None else r[k]
+                            for k in r.keys()} for r in cur),
+            "selected_strategy": self.meta("selected_strategy"),
+            "approval_required": self.meta("approval_required", True),
+        }
+
+    def _stage_shards(self, shards, section, payload, stale=None):
+        """
+        Stream one payload into its shards; → the payload for the full file, with
+        those parts read back from the shard files instead of encoded twice.
+        stale: portfolio ids to re-encode — the others keep their previous shard
+        (no queries, no encoding); None = all of them.
+        """
+        if section == "portfolios":
+            shards.drop_group("portfolio/")
+            ids, parts = [], []
+            for row in self._portfolio_rows():
+                name = f"portfolio/{row['id']}"
+                path = shards.keep(name) if stale is not None and row["id"] not in stale else None
+                if path is None:
+                    path = shards.put_stream(name, iter_json(self._portfolio_payload(row)))
+                parts.append(RawFile(path))
+                ids.append(row["id"])
+            shards.put(section, "".join(iter_json(dict(payload, portfolios=ids))))
+            return dict(payload, portfolios=parts)
+        return RawFile(shards.put_stream(section, iter_json(payload)))
+
+    def export(self, out_dir=DATA_DIR, only_dirty=True, shards=True):
+        """
+        Rewrite the payloads touched since the last export (or all of them), and
+        publish their shards: portfolios (ids only) + portfolio/<id>, pnl, insights, strategies.
+        """
+        builders = {
+            "portfolios.json": self.portfolios_payload,
+            "pnl.json": self.pnl_payload,
+            "insights.json": self.insights_payload,
+            "strategies.json": self.strategies_payload,
+        }
+        shard_set = ShardSet(out_dir) if shards else None
+        written = []
+        for name, build in builders.items():
+            if only_dirty and name not in self.dirty:
+                continue
+            payload = build()
+            if shard_set is not None:
+                payload = self._stage_shards(shard_set, name[:-len(".json")], payload,
+                                             self.dirty_portfolios if only_dirty else None)
+            write_json_stream(Path(out_dir) / name, payload)
+            written.append(name)
+        if shard_set is not None and written:
+            shard_set.publish()
+        self.dirty.clear()
+        self.dirty_portfolios = set()
+        return written
+
+
+def _nan_null(text):
+    """Parse a payload with NaN read as None — what the exporter writes for it."""
+    return json.loads(text, parse_constant=lambda c: None if c == "NaN" else float(c))
+
+def roundtrip(data_dir=DATA_DIR) -> list:
+    """Ingest data_dir into a fresh DB and export it; → payloads that came back different."""
+    data_dir = Path(data_dir)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = InvestOSStore(Path(tmp) / "check.db")
+        store.ingest(data_dir)
+        store.export(tmp, only_dirty=False, shards=False)
+        store.close()
+        return [name for name in PAYLOADS if (data_dir / name).exists() and
+                _nan_null((data_dir / name).read_text(encoding="utf-8"))
+                != _nan_null((Path(tmp) / name).read_text(encoding="utf-8"))]
+
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "export"
+    if cmd == "check":
+        diff = roundtrip()
+        print(f"✗ ingest → export changed: {', '.join(diff)}" if diff else
+              f"✅ ingest → export: {', '.join(PAYLOADS)} unchanged")
+        sys.exit(1 if diff else 0)
+    store = InvestOSStore()
+    if cmd == "ingest":
+        store.ingest()
+        print(f"✅ ingested JSON → {store.path}")
+    elif cmd == "export":
+        print(f"✅ exported: {', '.join(store.export(only_dirty=False))}")
+    elif cmd == "price" and len(sys.argv) == 5:
+        _, _, pid, ticker, price = sys.argv
+        store.update_position(pid, ticker, current_price=float(price))
+        print(f"✅ {pid}/{ticker} = {price} → {', '.join(store.export())}")
+    else:
+        print(__doc__)
+        sys.exit(1)
+    store.close()
@@ -1,31 +1,63 @@
 #!/usr/bin/env python3
 """
 Lag Monitor — BankOS API Performance Tracker
-מודד זמן תגובה לכל stock symbol, מזהה bottlenecks, שומר לog
+מודד זמן תגובה לכל stock symbol, מזהה bottlenecks, שומר ל-lag store (histograms)
 """
 
-import time
 import json
+import math
+import time
+import argparse
 import statistics
+import threading
 import subprocess
+from functools import partial
+from collections import deque
 from datetime import datetime
-from pathlib import Path
 
-LOG_FILE = Path("/tmp/bankos_lag_log.json")
+import cassette
+from market_cache import get_cache
+from lag_store import LagStore, Histogram, keys_for
+from quote_providers import HedgedQuotes, QuoteProvider
+
 ALERT_THRESHOLD_MS = 3000  # מעל 3 שניות = בעיה
+DEFAULT_WORKERS = 8
+DEFAULT_DEADLINE_S = 10.0  # deadline לכל symbol במצב מקבילי
+
+def fetch_quote(symbol: str):
+    """מחיר אחרון מ-Yahoo (fast_info) — דרך ה-cassette כשיש אחד (record / replay)"""
+    def live():
+        import yfinance as yf
+        return yf.Ticker(symbol).fast_info.last_price  # force fetch
+    return cassette.call("quote", symbol, live)
+
+def fetch_local_quote(base_url: str, symbol: str, timeout: float = DEFAULT_DEADLINE_S):
+    """מחיר משרת ציטוטים מקומי (quote_server) — 429 / 503 נזרקים כ-HTTPError"""
+    import urllib.request
+    with urllib.request.urlopen(f"{base_url}/quote/{symbol}", timeout=timeout) as r:
+        return json.loads(r.read())["price"]
 
-def measure_single(symbol: str) -> dict:
-    """מודד זמן תגובה עבור symbol אחד"""
+def measure_single(symbol: str, use_cache: bool = True, fetch=None) -> dict:
+    """מודד זמן תגובה עבור symbol אחד (cache hit = ללא קריאת רשת); fetch ברירת מחדל = Yahoo"""
     start = time.perf_counter()
+
+    if use_cache:
+        price = get_cache().get(symbol, "quote")
+        if price is not None:
+            return {
+                "symbol": symbol,
+                "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+                "status": "ok",
+                "cached": True,
+                "alert": False
+            }
     
     try:
-        # בדיקה ישירה דרך yfinance (בתוך venv)
-        import yfinance as yf
-        ticker = yf.Ticker(symbol)
-        data = ticker.fast_info
-        _ = data.last_price  # force fetch
-        
+        price = (fetch or fetch_quote)(symbol)
+
         elapsed_ms = (time.perf_counter() - start) * 1000
+        if use_cache and price is not None:
+            get_cache().put(symbol, "quote", float(price))
         return {
             "symbol": symbol,
             "elapsed_ms": round(elapsed_ms, 1),
@@ -42,39 +74,126 @@ def measure_single(symbol: str) -> dict:
             "alert": True
         }
 
-def run_full_profile(symbols: list) -> dict:
-    """מריץ profile מלא על כל הסימבולים"""
-    results = []
-    
-    print(f"\n🔍 BankOS Lag Monitor — {datetime.now().strftime('%H:%M:%S')}")
+def _timeout_result(symbol: str, deadline_s: float) -> dict:
+    return {
+        "symbol": symbol,
+        "elapsed_ms": round(deadline_s * 1000, 1),
+        "status": "error",
+        "error": f"deadline exceeded ({deadline_s:.1f}s)",
+        "alert": True
+    }
+
+def measure_all(symbols: list, workers: int = 1, deadline_s: float = None,
+                measure=measure_single) -> list:
+    """
+    מודד את כל הסימבולים — serial כש-workers=1, אחרת `workers` threads.
+    deadline_s: זמן מקסימלי לכל symbol מרגע שהתחיל להימדד (לא מתחילת הריצה).
+    symbol שלא ענה בזמן נרשם כ-error, וה-thread התקוע מוחלף בחדש כדי שהתור
+    ימשיך להתרוקן. ה-threads הם daemon — קריאת yfinance תקועה לא מונעת יציאה.
+    """
+    if workers <= 1:
+        return [measure(sym) for sym in symbols]
+
+    queue = deque(symbols)
+    started, results = {}, {}     # symbol → perf_counter בתחילת המדידה / תוצאה
+    cond = threading.Condition()
+
+    def worker():
+        while True:
+            with cond:
+                if not queue:
+                    return
+                sym = queue.popleft()
+                started[sym] = time.perf_counter()
+            try:
+                r = measure(sym)
+            except Exception as e:
+                r = {"symbol": sym, "elapsed_ms": round((time.perf_counter() - started[sym]) * 1000, 1),
+                     "status": "error", "error": str(e), "alert": True}
+            with cond:
+                if sym in results:    # נחתך ב-deadline — כבר יש thread שמחליף אותי
+                    return
+                started.pop(sym)
+                results[sym] = r
+                cond.notify_all()
+
+    def spawn():
+        threading.Thread(target=worker, name="lag-measure", daemon=True).start()
+
+    with cond:
+        for _ in range(min(workers, len(symbols))):
+            spawn()
+        while len(results) < len(symbols):
+            timeout = None
+            if deadline_s:
+                now = time.perf_counter()
+                for sym in [s for s, t in started.items() if now - t >= deadline_s]:
+                    del started[sym]
+                    results[sym] = _timeout_result(sym, deadline_s)
+                    spawn()   # ה-thread של sym תקוע — אחר לוקח את המשך התור
+                if started:
+                    timeout = max(0.0, min(started.values()) + deadline_s - now)
+            if len(results) < len(symbols):
+                cond.wait(timeout)
+
+    out = []
+    for sym in symbols:
+        r = results[sym]
+        if deadline_s and r["elapsed_ms"] > deadline_s * 1000:
+            r = _timeout_result(sym, deadline_s)
+        out.append(r)
+    return out
+
+def build_quotes(provider_url: str = None, race: bool = False,
+                 deadline_s: float = DEFAULT_DEADLINE_S, store: LagStore = None) -> HedgedQuotes:
+    """--hedge / --race: Yahoo ראשון, אחריו ה-provider ב-provider_url (API של quote_server)"""
+    providers = [QuoteProvider("yahoo", fetch_quote)]
+    if provider_url:
+        providers.append(QuoteProvider("alt", partial(fetch_local_quote, provider_url, timeout=deadline_s)))
+    # עד שיש מספיק מדידות בריצה — ה-p90 של היום מה-lag store
+    initial = store.query("1d").percentile(90) if store is not None else None
+    return HedgedQuotes(providers, race=race, initial_hedge_ms=initial or 1000.0,
+                        timeout_s=deadline_s or DEFAULT_DEADLINE_S)
+
+def run_full_profile(symbols: list, workers: int = 1,
+                     deadline_s: float = None, use_cache: bool = True,
+                     quotes: HedgedQuotes = None) -> dict:
+    """מריץ profile מלא על כל הסימבולים (quotes = בקשות hedged / raced)"""
+    mode = "serial" if workers <= 1 else f"concurrent x{workers}"
+    if quotes is not None:
+        mode += f", {'raced' if quotes.race else 'hedged'} {'/'.join(p.name for p in quotes.providers)}"
+    print(f"\n🔍 BankOS Lag Monitor — {datetime.now().strftime('%H:%M:%S')} ({mode})")
     print("-" * 50)
     
-    # שלב 1: מדידת כל symbol בנפרד
-    for sym in symbols:
-        result = measure_single(sym)
-        results.append(result)
-        
+    # שלב 1: מדידת כל symbol (serial או מקבילי)
+    wall_start = time.perf_counter()
+    measure = partial(measure_single, use_cache=use_cache, fetch=quotes.fetch if quotes else None)
+    results = measure_all(symbols, workers=workers, deadline_s=deadline_s, measure=measure)
+    wall_ms = (time.perf_counter() - wall_start) * 1000
+
+    for result in results:
         status_icon = "✅" if result["status"] == "ok" else "❌"
         alert_icon = " ⚠️ SLOW" if result.get("alert") else ""
-        print(f"{status_icon} {sym:<12} {result['elapsed_ms']:>8.1f}ms{alert_icon}")
-    
-    # שלב 2: סטטיסטיקות
-    ok_results = [r for r in results if r["status"] == "ok"]
-    times = [r["elapsed_ms"] for r in ok_results]
+        print(f"{status_icon} {result['symbol']:<12} {result['elapsed_ms']:>8.1f}ms{alert_icon}")
+
+    # זמן כולל: wall-clock מול סכום הזמנים לכל symbol
+    sum_ms = sum(r["elapsed_ms"] for r in results)
+    timing = {
+        "mode": "serial" if workers <= 1 else "concurrent",
+        "workers": max(1, workers),
+        "deadline_s": deadline_s,
+        "wall_ms": round(wall_ms, 1),
+        "sum_ms": round(sum_ms, 1),
+        "speedup": round(sum_ms / wall_ms, 2) if wall_ms > 0 else None,
+    }
+    print(f"\n⏱️  wall={timing['wall_ms']}ms | sum={timing['sum_ms']}ms | speedup={timing['speedup']}x")
     
-    stats = {}
-    if times:
-        stats = {
-            "min_ms": round(min(times), 1),
-            "max_ms": round(max(times), 1),
-            "avg_ms": round(statistics.mean(times), 1),
-            "median_ms": round(statistics.median(times), 1),
-            "p95_ms": round(sorted(times)[int(len(times) * 0.95)], 1),
-            "slowest": max(ok_results, key=lambda x: x["elapsed_ms"])["symbol"],
-            "failed": [r["symbol"] for r in results if r["status"] == "error"],
-            "alerts": [r["symbol"] for r in results if r.get("alert")]
-        }
-        
+    # שלב 2: סטטיסטיקות (cache hits לא נכנסים לחישוב latency)
+    cached = [r["symbol"] for r in results if r.get("cached")]
+    if cached:
+        print(f"💾 {len(cached)}/{len(results)} served from cache")
+    stats = summarize(results)
+    if stats:
         print("\n📊 Summary:")
         print(f"   avg={stats['avg_ms']}ms | p95={stats['p95_ms']}ms | max={stats['max_ms']}ms")
         if stats["alerts"]:
@@ -91,28 +210,215 @@ def run_full_profile(symbols: list) -> dict:
         elif stats["p95_ms"] > 3000:
             print("\n⚠️  Outlier symbols slow — consider async fetching")
     
-    # שלב 4: שמירת log
+    # שלב 4: lag store — histogram לכל symbol לכל שעה, append בזמן קבוע
+    store = LagStore(n_keys=keys_for(len(symbols)))
+    store.record(results)
+    store.record_value("@wall", wall_ms)
+    if quotes is not None:
+        quotes.log_to(store)
+        print(f"\n🏁 {quotes.summary()}")
+    rolling = store.report()
+    print_rolling(rolling)
+    if quotes is not None:
+        print_hedging(store)
+
     log_entry = {
         "timestamp": datetime.now().isoformat(),
+        "timing": timing,
         "results": results,
-        "stats": stats
+        "stats": stats,
+        "rolling": rolling,
+        "hedging": quotes.stats if quotes is not None else None,
     }
-    
-    # קריאת log קיים
-    history = []
-    if LOG_FILE.exists():
-        try:
-            history = json.loads(LOG_FILE.read_text())
-        except:
-            history = []
-    
-    history.append(log_entry)
-    history = history[-50:]  # שמור רק 50 ריצות אחרונות
-    LOG_FILE.write_text(json.dumps(history, indent=2, ensure_ascii=False))
-    
-    print(f"\n📁 Log saved: {LOG_FILE}")
+    store.append_run(log_entry)
+    print(f"\n📁 Lag store: {store.path} · run log: {store.runs_path.name}")
+    store.close()
     return log_entry
 
+def summarize(results: list) -> dict:
+    """min/max/avg/median/p95 על מדידות ok שלא הגיעו מה-cache — {} כשאין כאלה"""
+    ok_results = [r for r in results if r["status"] == "ok" and not r.get("cached")]
+    times = [r["elapsed_ms"] for r in ok_results]
+    if not times:
+        return {}
+    run_hist = Histogram()
+    for t in times:
+        run_hist.add(t)
+    return {
+        "min_ms": round(min(times), 1),
+        "max_ms": round(max(times), 1),
+        "avg_ms": round(statistics.mean(times), 1),
+        "median_ms": round(statistics.median(times), 1),
+        "p95_ms": run_hist.percentile(95),
+        "slowest": max(ok_results, key=lambda x: x["elapsed_ms"])["symbol"],
+        "failed": [r["symbol"] for r in results if r["status"] == "error"],
+        "alerts": [r["symbol"] for r in results if r.get("alert")]
+    }
+
+def print_rolling(rolling: dict):
+    """p50/p95/p99 לכל חלון (שעה / יום / שבוע) מתוך ה-lag store"""
+    print("\n📈 Rolling latency (all symbols):")
+    for window, s in rolling.items():
+        if not s["count"]:
+            print(f"   {window:>3}: —  (errors={s['errors']}, cached={s['cached']})")
+            continue
+        print(f"   {window:>3}: p50={s['p50_ms']}ms | p95={s['p95_ms']}ms | p99={s['p99_ms']}ms"
+              f"  (n={s['count']}, errors={s['errors']}, cached={s['cached']})")
+
+def print_hedging(store: LagStore, window: str = "1d"):
+    """hedges / wins / breaker מה-lag store (מפתחות @hedge, @win:*, @trip:*, @open:*)"""
+    rows = []
+    for key in store.keys():
+        if not key.startswith(("@hedge", "@win:", "@trip:", "@open:")):
+            continue
+        s = store.query(window, key).summary()
+        if s["count"]:
+            rows.append((key, s))
+    if not rows:
+        return
+    print(f"\n🏁 Hedging ({window}):")
+    labels = {"@hedge": "hedges sent", "@win": "answered by", "@trip": "breaker trips", "@open": "skipped (open)"}
+    for key, s in rows:
+        kind, _, name = key.partition(":")
+        extra = f"  p50={s['p50_ms']}ms p95={s['p95_ms']}ms" if kind in ("@hedge", "@win") else ""
+        print(f"   {labels[kind]:<15} {name:<8} n={s['count']:<6}{extra}")
+
+def report(window: str = "1d"):
+    """--report: סטטיסטיקות מה-store בלי למדוד כלום"""
+    store = LagStore()
+    print(f"\n🔍 BankOS Lag Report — {datetime.now().strftime('%H:%M:%S')}")
+    print_rolling(store.report())
+    print(f"\n📊 Per symbol ({window}):")
+    for key in store.keys():
+        s = store.query(window, key).summary()
+        if key.startswith("@") or s["count"] + s["errors"] + s["cached"] == 0:
+            continue
+        p95 = f"{s['p95_ms']:>8}ms" if s["p95_ms"] is not None else f"{'—':>10}"
+        print(f"   {key:<12} p95={p95}  n={s['count']:<5} errors={s['errors']} cached={s['cached']}")
+    wall = store.query(window, "@wall").summary()
+    if wall["count"]:
+        print(f"   {'run wall':<12} p50={wall['p50_ms']}ms p95={wall['p95_ms']}ms  runs={wall['count']}")
+    print_hedging(store, window)
+    print_runs(store.runs(last=10))
+    store.close()
+
+def print_runs(runs: list):
+    """ריצות אחרונות מה-run log — serial מול concurrent באותה טבלה"""
+    if not runs:
+        return
+    print("\n🗂️  Recent runs:")
+    for r in runs:
+        t, st = r.get("timing", {}), r.get("stats") or {}
+        print(f"   {r['timestamp'][:16]}  {t.get('mode', '?'):<10} x{t.get('workers', 1):<3}"
+              f" wall={t.get('wall_ms')}ms sum={t.get('sum_ms')}ms speedup={t.get('speedup')}x"
+              f"  p95={st.get('p95_ms', '—')}ms")
+
+def load_test(concurrency=(1, 2, 4, 8, 16, 32), symbol_counts=(20, 100), url: str = None,
+              deadline_s: float = DEFAULT_DEADLINE_S, server_kwargs: dict = None,
+              hedging: str = None, alt_url: str = None) -> list:
+    """
+    --loadtest: sweep workers × symbols against a quote server (a local
+    QuoteServer unless url is given) → one row per cell with throughput,
+    p50/p95/p99, errors and 429s. Nothing is written to the lag store.
+    hedging="hedge" / "race" puts HedgedQuotes in front, with a second
+    provider at alt_url (or a second local server with the same settings).
+    """
+    from quote_server import QuoteServer
+    servers = []
+    if url is None:
+        servers.append(QuoteServer(**(server_kwargs or {})).start())
+        url = servers[0].url
+    target = f"{url} · {servers[0].describe()}" if servers else url
+    quotes = None
+    if hedging:
+        if alt_url is None:
+            kw = dict(server_kwargs or {})
+            if kw.get("seed") is not None:
+                kw["seed"] += 1
+            servers.append(QuoteServer(**kw).start())
+            alt_url = servers[-1].url
+        quotes = HedgedQuotes([QuoteProvider("local", partial(fetch_local_quote, url, timeout=deadline_s)),
+                               QuoteProvider("alt", partial(fetch_local_quote, alt_url, timeout=deadline_s))],
+                              race=hedging == "race", timeout_s=deadline_s)
+        target += f" · {hedging}d with {alt_url}"
+    print(f"\n🧪 BankOS Lag Load Test — {target}")
+    print(f"{'symbols':>7} {'workers':>7} {'ok/s':>8} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8}"
+          f" {'wall ms':>9} {'errors':>7} {'429':>5}" + (f" {'hedged':>7}" if quotes else ""))
+    print("-" * (86 if quotes else 78))
+    rows = []
+    try:
+        for n in symbol_counts:
+            symbols = [f"LT{i:04d}.TA" if i % 2 else f"LT{i:04d}" for i in range(n)]
+            for workers in concurrency:
+                for server in servers:
+                    server.reset()
+                if quotes is not None:
+                    fetch, hedged_before = quotes.fetch, quotes.stats["hedged"]
+                else:
+                    fetch = partial(fetch_local_quote, url, timeout=deadline_s)
+                measure = partial(measure_single, use_cache=False, fetch=fetch)
+                t = time.perf_counter()
+                results = measure_all(symbols, workers=workers, deadline_s=deadline_s, measure=measure)
+                wall_ms = (time.perf_counter() - t) * 1000
+                hist = Histogram()
+                for r in results:
+                    if r["status"] == "ok":
+                        hist.add(r["elapsed_ms"])
+                errors = [r for r in results if r["status"] == "error"]
+                throttled = sum(1 for r in errors if "429" in r.get("error", ""))
+                row = {
+                    "symbols": n, "workers": workers,
+                    "throughput_rps": round(hist.count / (wall_ms / 1000), 1) if wall_ms else None,
+                    "p50_ms": hist.percentile(50), "p95_ms": hist.percentile(95),
+                    "p99_ms": hist.percentile(99), "wall_ms": round(wall_ms, 1),
+                    "errors": len(errors) - throttled, "throttled": throttled,
+                }
+                if quotes is not None:
+                    row["hedged"] = quotes.stats["hedged"] - hedged_before
+                rows.append(row)
+                print(f"{n:>7} {workers:>7} {row['throughput_rps'] or 0:>8.1f} "
+                      + " ".join(f"{row[k] if row[k] is not None else '—':>8}"
+                                 for k in ("p50_ms", "p95_ms", "p99_ms"))
+                      + f" {row['wall_ms']:>9.0f} {row['errors']:>7} {throttled:>5}"
+                      + (f" {row['hedged']:>7}" if quotes else ""))
+    finally:
+        for server in servers:
+            server.stop()
+        if quotes is not None:
+            quotes.close()
+    if quotes is not None:
+        print(f"\n🏁 {quotes.summary()}")
+    print_pool_sizing(rows, rate_limit=(server_kwargs or {}).get("rate_limit") if servers else None)
+    return rows
+
+def print_pool_sizing(rows: list, share: float = .9, rate_limit: float = None):
+    """
+    הכי מעט workers שמגיעים ל-90% מה-throughput המקסימלי, לכל גודל רשימה.
+    תאים שקיבלו 429 לא מומלצים — שם ה-rate limit הוא התקרה, לא ה-pool.
+    עם rate limit: ההמלצה לא עוברת את ה-workers שהתקרה מצדיקה (limit × p50).
+    """
+    print(f"\n📐 Pool sizing (fewest workers reaching {share:.0%} of peak throughput, no 429s"
+          + (f", limit {rate_limit:g}/s" if rate_limit else "") + "):")
+    for n in sorted({r["symbols"] for r in rows}):
+        cells = [r for r in rows if r["symbols"] == n and r["throughput_rps"]]
+        clean = [r for r in cells if not r["throttled"]]
+        if not clean:
+            print(f"   {n:>5} symbols → every cell hit the rate limit — fewer workers or a cache")
+            continue
+        peak = max(r["throughput_rps"] for r in clean)
+        best = min((r for r in clean if r["throughput_rps"] >= share * peak), key=lambda r: r["workers"])
+        limited = min((r["workers"] for r in cells if r["throttled"]), default=None)
+        ceiling = ""
+        if rate_limit and best["p50_ms"]:
+            # Little: workers = rate × latency — מעבר לזה רק עוד 429
+            cap = max(1, math.ceil(rate_limit * best["p50_ms"] / 1000))
+            ceiling = f" · limit {rate_limit:g}/s ≈ {cap} workers at p50"
+            if best["workers"] > cap:
+                best = min(clean, key=lambda r: (abs(r["workers"] - cap), r["workers"]))
+        print(f"   {n:>5} symbols → {best['workers']} workers ({best['throughput_rps']} ok/s,"
+              f" p95={best['p95_ms']}ms; peak {peak} ok/s)"
+              + (f" · 429s from {limited} workers" if limited else "") + ceiling)
+
 def check_venv_issue():
     """בודקת אם הסקריפט רץ בלי venv - הבעיה שמצאנו!"""
     try:
@@ -124,7 +430,61 @@ def check_venv_issue():
             "fix": "cd /projects/investment-dashboard && source .venv-invest/bin/activate"
         }
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="BankOS Lag Monitor")
+    parser.add_argument("--workers", type=int, default=1,
+                        help=f"מספר threads במקביל (1 = serial, מומלץ {DEFAULT_WORKERS})")
+    parser.add_argument("--deadline", type=float, default=DEFAULT_DEADLINE_S,
+                        help="deadline בשניות לכל symbol במצב מקבילי")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="מדידת latency אמיתית — עוקף את ה-market cache")
+    parser.add_argument("--report", nargs="?", const="1d", choices=["1h", "1d", "1w"],
+                        help="הדפסת p50/p95/p99 מה-lag store בלי למדוד (ברירת מחדל: יום)")
+    lt = parser.add_argument_group("load test (local quote server)")
+    lt.add_argument("--loadtest", action="store_true",
+                    help="sweep workers × symbols מול שרת ציטוטים מקומי — throughput + p50/p95/p99")
+    lt.add_argument("--concurrency", type=_int_list, default=[1, 2, 4, 8, 16, 32],
+                    help="workers לבדיקה, מופרדים בפסיק (ברירת מחדל 1,2,4,8,16,32)")
+    lt.add_argument("--symbols", type=_int_list, default=[20, 100],
+                    help="מספרי symbols לבדיקה (ברירת מחדל 20,100)")
+    lt.add_argument("--url", default=None, help="שרת קיים במקום אחד מקומי (python quote_server.py)")
+    lt.add_argument("--out", default=None, help="שמירת העקומות כ-JSON")
+    from quote_server import add_server_args
+    add_server_args(lt)
+    hg = parser.add_argument_group("hedged / raced quotes")
+    hg.add_argument("--hedge", action="store_true",
+                    help="בקשה כפולה כשה-provider הראשון לא ענה תוך ה-p90 הרץ שלו")
+    hg.add_argument("--race", action="store_true",
+                    help="שולח לכל ה-providers במקביל — הראשון שעונה מנצח")
+    hg.add_argument("--provider-url", default=None,
+                    help="provider שני (API של quote_server) — ברירת המחדל ב-loadtest: שרת מקומי שני")
+    args = parser.parse_args(argv)
+    if args.race and not (args.provider_url or args.loadtest):
+        parser.error("--race needs a second provider (--provider-url)")
+    return args
+
+def _int_list(s: str) -> list:
+    return [int(x) for x in s.split(",") if x]
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.report:
+        report(args.report)
+        exit(0)
+    if args.loadtest:
+        rows = load_test(args.concurrency, args.symbols, url=args.url, deadline_s=args.deadline,
+                         server_kwargs={"latency": args.latency, "error_rate": args.error_rate,
+                                        "rate_limit": args.rate_limit, "burst": args.burst,
+                                        "spikes": args.spikes,
+                                        "seed": args.seed},
+                         hedging="race" if args.race else "hedge" if args.hedge else None,
+                         alt_url=args.provider_url)
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(rows, f, indent=1)
+            print(f"\n📁 {args.out}")
+        exit(0)
+
     # בדיקת venv ראשית
     venv_check = check_venv_issue()
     if not venv_check["venv_ok"]:
@@ -146,4 +506,13 @@ if __name__ == "__main__":
         "AZRG.TA", "SAE.TA"
     ]
     
-    run_full_profile(SYMBOLS)
+    quotes = None
+    if args.hedge or args.race:
+        store = LagStore(n_keys=keys_for(len(SYMBOLS)))
+        quotes = build_quotes(args.provider_url, race=args.race, deadline_s=args.deadline, store=store)
+        store.close()
+    run_full_profile(SYMBOLS, workers=args.workers,
+                     deadline_s=args.deadline if args.workers > 1 else None,
+                     use_cache=not args.no_cache, quotes=quotes)
+    if quotes is not None:
+        quotes.close()
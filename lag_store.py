@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Lag Store — fixed-size latency histograms for lag_monitor
+  • HDR-style log-linear buckets: 0.1ms resolution, ~3% relative error, up to ~105s
+  • one histogram per key (symbol) per hour, in a ring of hourly slots (a week)
+  • the whole store is one memory-mapped file of constant size: recording a run
+    touches only the current hour's rows, whatever the history length
+  • p50 / p95 / p99 over the last hour / day / week = merge of ≤168 slots
+
+Windows have hour granularity: the hour a window starts in is included whole.
+Keys starting with "@" (e.g. "@wall") are run-level series, excluded from the
+all-symbols merge. Keys longer than 32 bytes (UTF-8) are truncated on the way in.
+The key table is sized by the caller (keys_for(watchlist)); when it is full, a key
+whose rows have all aged out of the ring is recycled, and only then does a new
+key fold into "~other" — with a warning, once per key.
+
+Next to the histograms, <store>.runs.jsonl keeps one JSON line per lag_monitor
+run (mode / workers / wall / speedup, per-symbol results, stats) — serial and
+concurrent runs side by side, append-only; past RUNS_MAX_BYTES it is rotated to
+<store>.runs.jsonl.1 (one generation kept), and runs(last) reads from the end.
+"""
+
+import os
+import json
+import mmap
+import time
+import struct
+from pathlib import Path
+
+STORE_FILE = Path(os.environ.get("BANKOS_LAG_STORE", "/tmp/bankos_lag.hdr"))
+RUNS_SUFFIX = ".runs.jsonl"    # לוג ריצות (timing / results / stats) ליד ה-store
+RUNS_MAX_BYTES = int(os.environ.get("BANKOS_LAG_RUNS_MAX", 32 << 20))   # מעבר לזה → .1
+
+UNIT_MS   = 0.1                 # רזולוציה: 0.1ms (כמו elapsed_ms המעוגל)
+SUB_BITS  = 4
+SUB       = 1 << SUB_BITS       # 16 sub-buckets לכל אוקטבה → שגיאה יחסית ≤ 1/32
+MAX_UNITS = (1 << 20) - 1       # ~104.8s — מעל זה נחתך לבאקט האחרון
+N_BUCKETS = SUB * (20 - SUB_BITS + 1)   # 272
+N_SLOTS   = 24 * 7              # שעה לכל slot, שבוע אחורה
+N_KEYS    = 64                # מינימום — keys_for() מגדיל לפי ה-watchlist
+RUN_KEYS  = 32                # @wall + @hedge/@win/@trip/@open לכל provider + ~other
+KEY_BYTES = 32
+OVERFLOW  = "~other"            # מפתח אחרון כשהטבלה מלאה
+
+WINDOWS = {"1h": 3600, "1d": 86400, "1w": 7 * 86400}
+
+_MAGIC  = b"BANKLAG1"
+_HEADER = struct.Struct("<8sIIII")
+ROW     = N_BUCKETS + 2         # buckets…, errors, cached  (uint32)
+
+def store_key(key: str) -> str:
+    """The key as stored: at most KEY_BYTES of UTF-8, never a split character."""
+    return key.encode("utf-8")[:KEY_BYTES].decode("utf-8", "ignore")
+
+def keys_for(n_symbols: int) -> int:
+    """Key-table size for a watchlist: symbols + run-level keys, rounded up to a power of two."""
+    return max(N_KEYS, 1 << (n_symbols + RUN_KEYS - 1).bit_length())
+
+# ─── Buckets ──────────────────────────────────────────────────────────────────
+def bucket_of(ms: float) -> int:
+    v = min(max(int(ms / UNIT_MS), 0), MAX_UNITS)
+    if v < SUB:
+        return v
+    shift = v.bit_length() - SUB_BITS - 1
+    return SUB * (shift + 1) + (v >> shift) - SUB
+
+def bucket_ms(idx: int) -> float:
+    """Representative latency (bucket midpoint) in ms."""
+    if idx < SUB:
+        return idx * UNIT_MS
+    shift = idx // SUB - 1
+    lo = (idx % SUB + SUB) << shift
+    return round((lo + ((1 << shift) - 1) / 2) * UNIT_MS, 1)
+
+class Histogram:
+    """Mergeable bucket counts + error / cache-hit counters."""
+
+    __slots__ = ("counts", "errors", "cached")
+
+    def __init__(self, counts=None, errors=0, cached=0):
+        self.counts = list(counts) if counts is not None else [0] * N_BUCKETS
+        self.errors = errors
+        self.cached = cached
+
+    def add(self, ms: float, n: int = 1):
+        self.counts[bucket_of(ms)] += n
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.errors += other.errors
+        self.cached += other.cached
+        return self
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def percentile(self, p: float):
+        """Nearest-rank percentile in ms (None when empty)."""
+        total = self.count
+        if not total:
+            return None
+        rank = max(1, -(-total * p // 100))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return bucket_ms(i)
+        return bucket_ms(N_BUCKETS - 1)
+
+    def summary(self) -> dict:
+        return {"count": self.count, "errors": self.errors, "cached": self.cached,
+                "p50_ms": self.percentile(50), "p95_ms": self.percentile(95),
+                "p99_ms": self.percentile(99)}
+
+# ─── Store ────────────────────────────────────────────────────────────────────
+class LagStore:
+    """
+    Layout: header | key table (N_KEYS × 32B) | N_SLOTS × (hour id int64 + N_KEYS rows).
+    The file is created sparse, so untouched hours cost no disk.
+    """
+
+    def __init__(self, path=STORE_FILE, n_slots: int = N_SLOTS, n_keys: int = N_KEYS):
+        self.path = Path(path)
+        # store קיים עם טבלה גדולה יותר נשאר כמו שהוא — רק הגדלה בונה מחדש
+        n_keys = max(n_keys, self._stored_keys(n_slots))
+        self.n_slots, self.n_keys = n_slots, n_keys
+        self._keys_off = _HEADER.size
+        self._slots_off = self._keys_off + n_keys * KEY_BYTES
+        self._slot_size = 8 + n_keys * ROW * 4
+        size = self._slots_off + n_slots * self._slot_size
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size != size:
+                # פורמט/גודל אחר → מתחילים מחדש (זה מוניטור, לא ספר חשבונות)
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+                os.pwrite(fd, _HEADER.pack(_MAGIC, n_slots, n_keys, N_BUCKETS, 0), 0)
+            self._mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        if self._mm[:8] != _MAGIC:
+            self._mm[:_HEADER.size] = _HEADER.pack(_MAGIC, n_slots, n_keys, N_BUCKETS, 0)
+        self._keys = self._read_keys()
+        self._folded = set()
+        self._full_hour = None   # השעה שבה כבר לא נמצא מפתח למחזור
+
+    def _stored_keys(self, n_slots: int) -> int:
+        """n_keys of an existing store with the same ring / bucket layout (0 if none)."""
+        try:
+            with open(self.path, "rb") as fp:
+                magic, slots, keys, buckets, _ = _HEADER.unpack(fp.read(_HEADER.size))
+        except (OSError, struct.error):
+            return 0
+        return keys if magic == _MAGIC and slots == n_slots and buckets == N_BUCKETS else 0
+
+    def close(self):
+        self._mm.close()
+
+    # ── keys ──
+    def _read_keys(self) -> dict:
+        out = {}
+        for i in range(self.n_keys):
+            off = self._keys_off + i * KEY_BYTES
+            raw = self._mm[off:off + KEY_BYTES].rstrip(b"\0")
+            if raw:
+                out[raw.decode("utf-8")] = i
+        return out
+
+    def _key_index(self, key: str, hour: int) -> int:
+        i = self._keys.get(key)
+        if i is not None:
+            return i
+        if key in self._folded:
+            return self.n_keys - 1
+        self._keys = self._read_keys()   # תהליך אחר אולי הוסיף
+        if key in self._keys:
+            return self._keys[key]
+        used = set(self._keys.values())
+        free = next((j for j in range(self.n_keys - 1) if j not in used), None)
+        if free is None and self._full_hour != hour:
+            free = self._reclaim(hour)
+            if free is None:
+                self._full_hour = hour   # עד השעה הבאה שום מפתח לא יוצא מהטבעת
+        if free is None:
+            print(f"  ⚠️  lag store: key table full ({self.n_keys} keys) — {key} folded into {OVERFLOW}")
+            self._folded.add(key)
+            key, free = OVERFLOW, self.n_keys - 1
+        off = self._keys_off + free * KEY_BYTES
+        self._mm[off:off + KEY_BYTES] = key.encode("utf-8").ljust(KEY_BYTES, b"\0")
+        self._keys[key] = free
+        return free
+
+    def _reclaim(self, hour: int):
+        """
+        Index of a key with no counts in any hour still inside the ring, its stale
+        rows zeroed and its name dropped — None when every key is live.
+        """
+        size, zero = ROW * 4, bytes(ROW * 4)
+        idle = set(self._keys.values()) - {self.n_keys - 1}
+        ring = []
+        for j in range(self.n_slots):
+            off = self._slots_off + j * self._slot_size
+            (stored,) = struct.unpack_from("<q", self._mm, off)
+            ring.append(off + 8)
+            if stored <= hour - self.n_slots:
+                continue   # שעה שיצאה מהטבעת — לא נקראת יותר
+            idle -= {i for i in idle if self._mm[off + 8 + i * size:off + 8 + (i + 1) * size] != zero}
+            if not idle:
+                return None
+        free = min(idle)
+        for off in ring:
+            self._mm[off + free * size:off + (free + 1) * size] = zero
+        self._keys = {k: i for k, i in self._keys.items() if i != free}
+        return free
+
+    # ── slots ──
+    def _slot(self, hour: int, create: bool):
+        """
+        uint32 view of one hour's rows. A slot still holding an older hour is
+        zeroed when create=True; None when the hour isn't there (or is older
+        than the ring — a late write never clobbers newer data).
+        """
+        off = self._slots_off + (hour % self.n_slots) * self._slot_size
+        (stored,) = struct.unpack_from("<q", self._mm, off)
+        if stored != hour:
+            if not create or stored > hour:
+                return None
+            self._mm[off + 8:off + self._slot_size] = bytes(self._slot_size - 8)
+            struct.pack_into("<q", self._mm, off, hour)
+        return memoryview(self._mm)[off + 8:off + self._slot_size].cast("I")
+
+    def _row(self, key: str, ts: float):
+        hour = int(ts // 3600)
+        slot = self._slot(hour, create=True)
+        if slot is None:
+            return None, 0
+        return slot, self._key_index(store_key(key), hour) * ROW
+
+    # ── writes (O(1) per result) ──
+    def _locked(self):
+        """Exclusive lock on the store file — two monitors may record at once."""
+        import fcntl
+        fp = open(self.path, "rb")
+        fcntl.flock(fp, fcntl.LOCK_EX)
+        return fp   # close() משחרר את ה-lock
+
+    def record_value(self, key: str, ms: float, ts: float = None):
+        with self._locked():
+            slot, base = self._row(key, ts or time.time())
+            if slot is not None:
+                slot[base + bucket_of(ms)] += 1
+            del slot
+
+    def record(self, results, ts: float = None):
+        """lag_monitor results → ok latencies into buckets, errors / cache hits counted."""
+        ts = ts or time.time()
+        with self._locked():
+            for r in results:
+                slot, base = self._row(r["symbol"], ts)
+                if slot is None:
+                    break   # שעה ישנה מהטבעת
+                if r.get("cached"):
+                    slot[base + N_BUCKETS + 1] += 1
+                elif r.get("status") != "ok":
+                    slot[base + N_BUCKETS] += 1
+                else:
+                    slot[base + bucket_of(r["elapsed_ms"])] += 1
+                del slot
+            self._mm.flush()
+
+    # ── reads ──
+    def query(self, window="1h", key: str = None, now: float = None) -> Histogram:
+        """Merged histogram over the window ("1h"/"1d"/"1w" or seconds); key=None → all symbols."""
+        secs = WINDOWS[window] if isinstance(window, str) else window
+        now = now or time.time()
+        # רזולוציה של שעה: השעה שבה החלון מתחיל נכללת כולה
+        h1 = int(now // 3600)
+        h0 = max(h1 - self.n_slots + 1, int((now - secs) // 3600))
+        keys = self._read_keys()
+        if key is not None:
+            key = store_key(key)
+            idx = [keys[key]] if key in keys else []
+        else:
+            idx = [i for k, i in keys.items() if not k.startswith("@")]
+        out = Histogram()
+        for hour in range(h0, h1 + 1):
+            slot = self._slot(hour, create=False)
+            if slot is None:
+                continue
+            for i in idx:
+                row = slot[i * ROW:(i + 1) * ROW].tolist()
+                if any(row):
+                    out.merge(Histogram(row[:N_BUCKETS], row[N_BUCKETS], row[N_BUCKETS + 1]))
+            del slot
+        return out
+
+    def keys(self):
+        return sorted(self._read_keys())
+
+    # ── run log ──
+    @property
+    def runs_path(self) -> Path:
+        return self.path.with_name(self.path.name + RUNS_SUFFIX)
+
+    def append_run(self, entry: dict):
+        """One lag_monitor run (timing / results / stats …) → a line in the run log."""
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str) + "\n"
+        with self._locked():
+            try:
+                if self.runs_path.stat().st_size + len(line) > RUNS_MAX_BYTES:
+                    os.replace(self.runs_path, self._rotated)
+            except FileNotFoundError:
+                pass
+            with open(self.runs_path, "a", encoding="utf-8") as fp:
+                fp.write(line)
+
+    @property
+    def _rotated(self) -> Path:
+        return self.runs_path.with_name(self.runs_path.name + ".1")
+
+    def runs(self, last: int = None) -> list:
+        """Run-log entries, oldest first (the last `last` of them, read from the end)."""
+        lines = _tail(self.runs_path, last)
+        if last and len(lines) < last:
+            lines = _tail(self._rotated, last - len(lines)) + lines
+        return [json.loads(l) for l in lines]
+
+    def report(self, windows=("1h", "1d", "1w"), now: float = None) -> dict:
+        return {w: self.query(w, now=now).summary() for w in windows}
+
+def _tail(path: Path, n: int = None, block: int = 1 << 16) -> list:
+    """Last n non-empty lines of a file (all when n is None) — reads blocks from the end."""
+    try:
+        fp = open(path, "rb")
+    except FileNotFoundError:
+        return []
+    with fp:
+        if n is None:
+            data = fp.read()
+        else:
+            end = pos = fp.seek(0, os.SEEK_END)
+            data = b""
+            # n+1 מפרידים: השורה הראשונה בבלוק אולי חתוכה
+            while pos and data.count(b"\n") <= n:
+                pos = max(0, pos - block)
+                fp.seek(pos)
+                data = fp.read(end - pos)
+    lines = [l for l in data.decode("utf-8", "ignore").splitlines() if l.strip()]
+    if n is not None and pos:
+        lines = lines[1:]   # הראשונה אולי נחתכה באמצע
+    return lines[-n:] if n else lines
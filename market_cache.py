@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Market Cache — persistent TTL cache for Yahoo responses
+SQLite on disk, shared by generate_all and lag_monitor so a second run within
+the TTL makes no network calls. (Earnings dates live in earnings_calendar, which
+refreshes by the alert window rather than a flat TTL.)
+
+Key:   (symbol, kind, interval)
+TTL:   per kind — quotes in minutes, daily closes until the next session
+Size:  LRU eviction (by last access) once the stored payload exceeds max_bytes
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+CACHE_FILE = Path(os.environ.get("BANKOS_CACHE", "/tmp/bankos_market_cache.sqlite"))
+MAX_BYTES  = 32 * 1024 * 1024
+
+QUOTE_TTL_S    = 5 * 60          # מחיר אחרון — 5 דקות
+
+# שעות מסחר (כמו ב-README: 10:00-17:30 בימי מסחר)
+SESSION_OPEN   = (10, 0)
+SESSION_CLOSE  = (17, 30)
+TRADING_DAYS   = {0, 1, 2, 3, 4}   # Mon-Fri
+
+_MISS = object()
+
+# ─── TTL policy ───────────────────────────────────────────────────────────────
+def in_session(now: datetime = None) -> bool:
+    now = now or datetime.now()
+    if now.weekday() not in TRADING_DAYS:
+        return False
+    return SESSION_OPEN <= (now.hour, now.minute) < SESSION_CLOSE
+
+def next_session_open(now: datetime = None) -> datetime:
+    now = now or datetime.now()
+    day = now.replace(hour=SESSION_OPEN[0], minute=SESSION_OPEN[1], second=0, microsecond=0)
+    if day <= now:
+        day += timedelta(days=1)
+    while day.weekday() not in TRADING_DAYS:
+        day += timedelta(days=1)
+    return day
+
+def ttl_for(kind: str, now: datetime = None) -> float:
+    """Seconds an entry of this kind stays fresh."""
+    if kind == "quote":
+        return QUOTE_TTL_S
+    if kind == "history":
+        # בזמן מסחר הנר האחרון עוד זז — מתנהג כמו quote
+        if in_session(now):
+            return QUOTE_TTL_S
+        now = now or datetime.now()
+        return (next_session_open(now) - now).total_seconds()
+    return QUOTE_TTL_S
+
+# ─── Cache ────────────────────────────────────────────────────────────────────
+class MarketCache:
+    """Thread-safe SQLite TTL + LRU cache of JSON-encodable values."""
+
+    def __init__(self, path=CACHE_FILE, max_bytes: int = MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False,
+                                   isolation_level=None)
+        self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS entries (
+                symbol      TEXT NOT NULL,
+                kind        TEXT NOT NULL,
+                interval    TEXT NOT NULL DEFAULT '',
+                value       TEXT NOT NULL,
+                expires_at  REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (symbol, kind, interval)
+            );
+            CREATE INDEX IF NOT EXISTS idx_entries_lru ON entries(accessed_at);
+        """)
+
+    def get(self, symbol: str, kind: str, interval: str = "", default=None):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM entries WHERE symbol=? AND kind=? AND interval=?",
+                (symbol, kind, interval)).fetchone()
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return default
+            self._db.execute(
+                "UPDATE entries SET accessed_at=? WHERE symbol=? AND kind=? AND interval=?",
+                (now, symbol, kind, interval))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, symbol: str, kind: str, value, interval: str = "", ttl_s: float = None):
+        now = time.time()
+        ttl_s = ttl_for(kind) if ttl_s is None else ttl_s
+        payload = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?,?,?,?,?,?)",
+                (symbol, kind, interval, payload, now + ttl_s, now))
+            self._evict()
+
+    def get_or_fetch(self, symbol: str, kind: str, fetch, interval: str = ""):
+        """Cached value, or fetch() → store → return. Errors are not cached."""
+        value = self.get(symbol, kind, interval, default=_MISS)
+        if value is not _MISS:
+            return value
+        value = fetch()
+        self.put(symbol, kind, value, interval)
+        return value
+
+    def _evict(self):
+        """Drop expired rows, then least-recently-used rows until under max_bytes."""
+        self._db.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+        size = self._db.execute("SELECT COALESCE(SUM(LENGTH(value)),0) FROM entries").fetchone()[0]
+        if size <= self.max_bytes:
+            return
+        for symbol, kind, interval, n in self._db.execute(
+                "SELECT symbol, kind, interval, LENGTH(value) FROM entries "
+                "ORDER BY accessed_at").fetchall():
+            self._db.execute("DELETE FROM entries WHERE symbol=? AND kind=? AND interval=?",
+                             (symbol, kind, interval))
+            size -= n
+            if size <= self.max_bytes:
+                break
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)),0) FROM entries").fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else None,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_cache() -> MarketCache:
+    """Process-wide cache instance (opened lazily)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = MarketCache()
+    return _shared
+
+
+if __name__ == "__main__":
+    import sys
+    c = get_cache()
+    if sys.argv[1:] == ["clear"]:
+        c.clear()
+        print(f"🧹 cleared {c.path}")
+    else:
+        print(json.dumps(c.stats(), indent=2))
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Market Data — history providers for the BankOS generators
+Batched multi-ticker downloads instead of one round-trip per symbol.
+
+Providers expose one method, called once per chunk of symbols:
+    fetch(symbols, period, interval) -> {yahoo_symbol: [closes]}
+so the live Yahoo path and the offline fixture path are interchangeable.
+
+MarketSnapshot freezes one run's prices + history so every page rendered in
+that run sees exactly the same numbers.
+"""
+
+import json
+import time
+import hashlib
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from types import MappingProxyType
+
+HISTORY_CHUNK = 50   # כמה symbols בבקשת download אחת
+
+# ─── Normalisation ────────────────────────────────────────────────────────────
+def normalize_agorot(batch: dict) -> dict:
+    """TASE quotes arrive in agorot — convert every .TA series in the batch to ₪."""
+    out = {}
+    for sym, p in batch.items():
+        if sym.endswith(".TA") and p and p[0] > 500:
+            p = [round(x / 100, 4) for x in p]
+        out[sym] = p
+    return out
+
+def _closes(frame) -> list:
+    """Close column → rounded floats, skipping the NaN rows a batch aligns in."""
+    if frame is None or frame.empty or "Close" not in frame:
+        return []
+    return [round(float(v), 4) for v in frame["Close"].dropna().tolist()]
+
+def _dated(frame) -> list:
+    """Close column → [(YYYY-MM-DD, close)], same rounding / NaN rules as _closes."""
+    if frame is None or frame.empty or "Close" not in frame:
+        return []
+    col = frame["Close"].dropna()
+    return [(ts.strftime("%Y-%m-%d"), round(float(v), 4)) for ts, v in col.items()]
+
+def _trailing_weekdays(n: int, end: date = None) -> list:
+    """n weekday dates (ISO) ending at `end` — dates for undated fixture series."""
+    day, out = end or date.today(), []
+    while len(out) < n:
+        if day.weekday() < 5:
+            out.append(day.isoformat())
+        day -= timedelta(days=1)
+    return out[::-1]
+
+# ─── Providers ────────────────────────────────────────────────────────────────
+class YahooHistoryProvider:
+    """One yf.download() bulk call for the whole chunk."""
+
+    def fetch(self, symbols, period="7d", interval="1d") -> dict:
+        return self._download(symbols, period, interval, _closes)
+
+    def fetch_dated(self, symbols, period="7d", interval="1d") -> dict:
+        """{yahoo_symbol: [(date, close)]} — for the persistent history store."""
+        return self._download(symbols, period, interval, _dated)
+
+    def _download(self, symbols, period, interval, parse) -> dict:
+        import yfinance as yf
+        symbols = list(symbols)
+        try:
+            df = yf.download(symbols, period=period, interval=interval,
+                             group_by="ticker", auto_adjust=False,
+                             threads=True, progress=False)
+        except Exception:
+            df = None
+        out = {}
+        for sym in symbols:
+            try:
+                if df is None or df.empty:
+                    out[sym] = []
+                elif sym in df.columns.get_level_values(0):
+                    out[sym] = parse(df[sym])
+                else:  # single-ticker frame without a ticker level
+                    out[sym] = parse(df) if len(symbols) == 1 else []
+            except Exception:
+                out[sym] = []
+        return out
+
+
+class FixtureHistoryProvider:
+    """
+    Offline provider backed by a dict or a JSON file of {symbol: [closes]}.
+    Closes are stored raw (agorot for .TA) so normalisation is exercised too.
+    A series may also be [[date, close], ...]; plain closes are dated as the
+    trailing weekdays ending today.
+    latency_s simulates one network round-trip per fetch() call, for benchmarks.
+    """
+
+    def __init__(self, fixture, latency_s: float = 0.0):
+        if isinstance(fixture, (str, Path)):
+            fixture = json.loads(Path(fixture).read_text(encoding="utf-8"))
+        self.fixture = fixture
+        self.latency_s = latency_s
+        self.calls = 0
+
+    def fetch(self, symbols, period="7d", interval="1d") -> dict:
+        self.calls += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return {sym: [r[1] if isinstance(r, (list, tuple)) else r
+                      for r in self.fixture.get(sym, [])] for sym in set(symbols)}
+
+    def fetch_dated(self, symbols, period="7d", interval="1d") -> dict:
+        self.calls += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        out = {}
+        for sym in set(symbols):
+            rows = self.fixture.get(sym, [])
+            if rows and not isinstance(rows[0], (list, tuple)):
+                rows = list(zip(_trailing_weekdays(len(rows)), rows))
+            out[sym] = [(d, c) for d, c in rows]
+        return out
+
+def default_provider():
+    """Yahoo — routed through the record / replay cassette when BANKOS_CASSETTE is set."""
+    import cassette
+    c = cassette.active()
+    return cassette.CassetteProvider(YahooHistoryProvider(), c) if c else YahooHistoryProvider()
+
+# ─── Public API ───────────────────────────────────────────────────────────────
+def fetch_history_batch(symbols, provider=None, period="7d", interval="1d",
+                        chunk_size: int = HISTORY_CHUNK, cache=None) -> dict:
+    """
+    {yahoo_symbol: [closes]} for every symbol, one provider call per chunk.
+    With a MarketCache, fresh symbols are served from it and only the misses
+    are downloaded; empty (failed) series are never cached.
+    """
+    symbols = sorted(s for s in set(symbols) if s)
+    key = f"{period}/{interval}"
+    out = {}
+    if cache is not None:
+        for sym in symbols:
+            p = cache.get(sym, "history", key)
+            if p is not None:
+                out[sym] = p
+    missing = [s for s in symbols if s not in out]
+    if not missing:
+        return out
+
+    provider = provider or default_provider()
+    chunk_size = max(1, chunk_size)
+    raw = {}
+    for i in range(0, len(missing), chunk_size):
+        chunk = missing[i:i + chunk_size]
+        try:
+            raw.update(provider.fetch(chunk, period=period, interval=interval))
+        except Exception:
+            pass  # chunk כושל → רשימות ריקות, כמו קודם לכל symbol
+    fetched = normalize_agorot({sym: raw.get(sym, []) for sym in missing})
+    if cache is not None:
+        for sym, p in fetched.items():
+            if p: cache.put(sym, "history", p, key)
+    out.update(fetched)
+    return out
+
+
+def fetch_dated_batch(symbols, provider=None, period="1y", interval="1d",
+                      chunk_size: int = HISTORY_CHUNK) -> dict:
+    """{yahoo_symbol: [(date, close)]}, chunked like fetch_history_batch, agorot → ₪."""
+    symbols = sorted(s for s in set(symbols) if s)
+    provider = provider or default_provider()
+    chunk_size = max(1, chunk_size)
+    raw = {}
+    for i in range(0, len(symbols), chunk_size):
+        try:
+            raw.update(provider.fetch_dated(symbols[i:i + chunk_size],
+                                            period=period, interval=interval))
+        except Exception:
+            pass
+    out = {}
+    for sym in symbols:
+        rows = raw.get(sym, [])
+        closes = normalize_agorot({sym: [c for _, c in rows]})[sym]
+        out[sym] = [(d, c) for (d, _), c in zip(rows, closes)]
+    return out
+
+
+# ─── Run-scoped snapshot ──────────────────────────────────────────────────────
+@dataclass(frozen=True)
+class Quote:
+    price: float
+    ts: str       # ISO time the price was fetched
+    source: str   # provider name ("cache" for a price served from MarketCache)
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """
+    Immutable market state for one generator run.
+    quotes:  {tracker_symbol: Quote}       (e.g. "TLV:ESLT")
+    history: {yahoo_symbol: (closes, ...)} (e.g. "ESLT.TA")
+    taken_at / source summarize the run (when it was frozen, which providers fed
+    it); the per-symbol time and provider live on each Quote.
+    """
+    quotes: MappingProxyType
+    history: MappingProxyType
+    taken_at: str
+    snapshot_id: str = field(default="")
+    source: str = field(default="")
+
+    def quote(self, symbol: str):
+        return self.quotes.get(symbol)
+
+    def price(self, symbol: str, default=None):
+        q = self.quotes.get(symbol)
+        return q.price if q is not None else default
+
+    def timestamp(self, symbol: str):
+        q = self.quotes.get(symbol)
+        return q.ts if q is not None else None
+
+    def source_of(self, symbol: str):
+        q = self.quotes.get(symbol)
+        return q.source if q is not None else None
+
+    def prices(self) -> dict:
+        return {s: q.price for s, q in self.quotes.items()}
+
+    def closes(self, yahoo_symbol: str) -> tuple:
+        return self.history.get(yahoo_symbol, ())
+
+    def __reduce__(self):
+        # mappingproxy can't be pickled — rebuild from plain dicts (process pools)
+        return (_rebuild_snapshot, (dict(self.quotes), dict(self.history),
+                                    self.taken_at, self.snapshot_id, self.source))
+
+    def to_json(self) -> dict:
+        return {
+            "snapshot_id": self.snapshot_id,
+            "taken_at": self.taken_at,
+            "source": self.source,
+            "quotes": {s: [q.price, q.ts, q.source] for s, q in self.quotes.items()},
+            "history": {s: list(h) for s, h in self.history.items()},
+        }
+
+def _rebuild_snapshot(quotes, history, taken_at, snapshot_id, source=""):
+    return MarketSnapshot(MappingProxyType(quotes), MappingProxyType(history),
+                          taken_at, snapshot_id, source)
+
+def snapshot_from_json(d: dict) -> MarketSnapshot:
+    """Inverse of MarketSnapshot.to_json — same snapshot_id, no re-hashing."""
+    source = d.get("source", "")
+    # LAST_BUILD שנכתב בלי Quote: price בלבד → הזמן והמקור של ה-snapshot
+    quotes = {s: Quote(float(q[0]), q[1], q[2]) if isinstance(q, list)
+              else Quote(float(q), d["taken_at"], source) for s, q in d["quotes"].items()}
+    return _rebuild_snapshot(quotes, {s: tuple(h) for s, h in d["history"].items()},
+                             d["taken_at"], d["snapshot_id"], source)
+
+def make_snapshot(prices: dict, history: dict, source: str = "yahoo",
+                  taken_at: str = None) -> MarketSnapshot:
+    """
+    Freeze {symbol: price or Quote} + {yahoo_symbol: [closes]} into a MarketSnapshot.
+    A plain price is stamped taken_at / source; a Quote keeps its own (a partly
+    cached or mixed-provider fetch). snapshot.source lists every provider seen.
+    """
+    taken_at = taken_at or datetime.now().isoformat(timespec="seconds")
+    quotes = {s: p if isinstance(p, Quote) else Quote(float(p), taken_at, source)
+              for s, p in prices.items() if p is not None}
+    hist = {s: tuple(h) for s, h in history.items()}
+    blob = json.dumps([sorted((s, q.price) for s, q in quotes.items()),
+                       sorted(hist.items())], separators=(",", ":"))
+    return MarketSnapshot(
+        quotes=MappingProxyType(quotes),
+        history=MappingProxyType(hist),
+        taken_at=taken_at,
+        snapshot_id=hashlib.sha256(blob.encode()).hexdigest()[:12],
+        source="+".join(sorted({q.source for q in quotes.values()})) or source,
+    )
+
+if __name__ == "__main__":
+    # benchmark offline: python market_data.py fixture.json [latency_s]
+    import sys
+    if len(sys.argv) < 2:
+        print("usage: market_data.py <fixture.json> [latency_s]")
+        sys.exit(1)
+    prov = FixtureHistoryProvider(sys.argv[1], float(sys.argv[2]) if len(sys.argv) > 2 else 0.0)
+    t = time.perf_counter()
+    hist = fetch_history_batch(prov.fixture.keys(), provider=prov)
+    ms = (time.perf_counter() - t) * 1000
+    print(f"{len(hist)} symbols · {prov.calls} round-trip(s) · {ms:.1f}ms")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Portfolio Registry — slug / emoji / Hebrew label / page title per portfolio, from data
+  data/portfolios-registry.json   {"portfolios": [{"name", "slug", "emoji", "heb", "title"}]}
+  InvestOS portfolios.json        same list with id / strategy instead of slug / heb
+  InvestOS DB (*.sqlite, *.db)    portfolios table (id, name, emoji, strategy)
+BANKOS_REGISTRY points at any of those. A name missing from the registry still
+resolves to an entry (slug derived from the name, 📊), so a new portfolio in the
+tracker gets its card and deep page without a code change — lookups never
+register it, only add() does.
+"""
+
+import os
+import re
+import json
+import sqlite3
+from pathlib import Path
+
+REGISTRY_FILE = Path(os.environ.get(
+    "BANKOS_REGISTRY", Path(__file__).parent / "data" / "portfolios-registry.json"))
+
+DEFAULT_EMOJI = "📊"
+RESERVED = {"index", "investos", "experiment_2"}   # עמודים קיימים — slug לא ידרוס אותם
+
+def slugify(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "portfolio"
+
+class Registry:
+    """{name: {"slug", "emoji", "heb", "title"}} — unknown names resolve to a derived entry."""
+
+    def __init__(self, entries=()):
+        self._by_name = {}
+        self._by_slug = {}
+        self._derived = {}   # memo של שמות לא רשומים — לא חלק מה-registry
+        for e in entries:
+            self.add(**e)
+
+    def _free_slug(self, slug, name):
+        taken = {**self._by_slug, **{e["slug"]: n for n, e in self._derived.items()}}
+        base, n = slug, 2
+        while (slug in taken and taken[slug] != name) or slug in RESERVED:
+            slug, n = f"{base}-{n}", n + 1
+        return slug
+
+    @staticmethod
+    def _entry(name, slug, emoji=None, heb=None, title=None):
+        return {"slug": slug, "emoji": emoji or DEFAULT_EMOJI, "heb": heb or name,
+                "title": title or f"תיק {name.title()}"}
+
+    def add(self, name, slug=None, emoji=None, heb=None, title=None, **_):
+        self._derived.pop(name, None)
+        old = self._by_name.get(name)
+        if old:
+            self._by_slug.pop(old["slug"], None)
+        entry = self._entry(name, self._free_slug(slug or slugify(name), name), emoji, heb, title)
+        self._by_name[name] = entry
+        self._by_slug[entry["slug"]] = name
+        return entry
+
+    def __getitem__(self, name) -> dict:
+        entry = self._by_name.get(name) or self._derived.get(name)
+        if entry is None:
+            entry = self._derived[name] = self._entry(name, self._free_slug(slugify(name), name))
+        return entry
+
+    def get(self, name, default=None):
+        """Registered entry only — `default` for a name the registry doesn't know."""
+        return self._by_name.get(name, default)
+
+    def __contains__(self, name) -> bool:
+        return name in self._by_name
+
+    def __iter__(self):
+        return iter(self._by_name)
+
+    def __len__(self):
+        return len(self._by_name)
+
+    def by_slug(self, slug: str):
+        """Portfolio name for a page slug (None if unknown)."""
+        name = self._by_slug.get(slug)
+        if name is None:
+            name = next((n for n, e in self._derived.items() if e["slug"] == slug), None)
+        return name
+
+    # ── loaders ──
+    @classmethod
+    def from_json(cls, path):
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        rows = data["portfolios"] if isinstance(data, dict) else data
+        return cls({"name": r["name"], "slug": r.get("slug") or r.get("id"),
+                    "emoji": r.get("emoji"), "heb": r.get("heb") or r.get("strategy"),
+                    "title": r.get("title")} for r in rows)
+
+    @classmethod
+    def from_investos(cls, db_path):
+        db = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            rows = db.execute("SELECT id, name, emoji, strategy FROM portfolios ORDER BY rowid").fetchall()
+        finally:
+            db.close()
+        return cls({"name": n, "slug": i, "emoji": e, "heb": s} for i, n, e, s in rows)
+
+    @classmethod
+    def load(cls, path=REGISTRY_FILE):
+        path = Path(path)
+        try:
+            if path.suffix in (".sqlite", ".db"):
+                return cls.from_investos(path)
+            return cls.from_json(path)
+        except Exception as e:
+            print(f"  ⚠️  registry {path}: {e} — deriving every entry")
+            return cls()
+
+_registry = None
+
+def get_registry() -> Registry:
+    """Process-wide registry (loaded once)."""
+    global _registry
+    if _registry is None:
+        _registry = Registry.load()
+    return _registry
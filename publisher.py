@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Publisher — commit + push only what a build changed, off the render path
+  submit(paths, msg)   hashes the artifacts against the last committed set; nothing
+                       changed → no git at all. Otherwise queues them and returns.
+  worker thread        waits `debounce` seconds of quiet (a burst of builds → one
+                       commit), stages exactly those paths, commits, then pushes with
+                       exponential backoff + jitter. A push that still fails is kept
+                       and retried with the next batch (or on flush()).
+  flush() / close()    wait for the queue to drain — a one-shot run calls close() last.
+The committed hashes — and whether a local commit still waits for its push — live in
+.git/bankos-publish.json (BANKOS_PUBLISH_STATE), so the state file itself never shows
+up as a change and a commit left unpushed by one run is pushed by the next.
+
+    pub = Publisher(OUT_DIR)
+    pub.submit(artifacts, "v4 2026-04-02 18:00")   # returns at once
+    pub.close()
+"""
+
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+import subprocess
+from pathlib import Path
+
+from tracing import span
+
+DEBOUNCE_S   = 2.0    # שקט לפני commit — builds צמודים מתאחדים ל-commit אחד
+RETRIES      = 4      # ניסיונות push נוספים אחרי הראשון
+BACKOFF_S    = 1.0    # 1, 2, 4, 8… שניות (× jitter 0.5-1)
+MAX_BACKOFF_S = 60.0
+
+def _sha(path: Path):
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+class Publisher:
+    def __init__(self, repo, remote: str = "origin", branch: str = None, state=None,
+                 debounce: float = DEBOUNCE_S, retries: int = RETRIES,
+                 backoff: float = BACKOFF_S, max_backoff: float = MAX_BACKOFF_S):
+        self.repo = Path(repo).resolve()
+        self.remote, self.branch = remote, branch
+        self.debounce, self.retries = debounce, retries
+        self.backoff, self.max_backoff = backoff, max_backoff
+        git_dir = self.repo / ".git"
+        default = git_dir / "bankos-publish.json" if git_dir.is_dir() else "/tmp/bankos_publish.json"
+        self.state_path = Path(state or os.environ.get("BANKOS_PUBLISH_STATE", default))
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except Exception:
+            state = {}
+        if "committed" not in state:   # פורמט ישן: {rel: sha} בלבד
+            state = {"committed": state}
+        self.committed = state["committed"]
+        self.stats = {"builds": 0, "unchanged": 0, "commits": 0, "pushes": 0,
+                      "push_retries": 0, "push_failures": 0, "last_push_ms": None}
+        self._pending = {}       # rel → sha (None = deleted)
+        self._inflight = {}      # ה-batch שה-worker מבצע commit עליו עכשיו
+        self._messages = []
+        self._unpushed = bool(state.get("unpushed"))   # commit מקומי שעוד לא הגיע ל-remote
+        self._push_due = False   # לנסות push בסבב הבא של ה-worker
+        self._busy = False
+        self._flush = False
+        self._closed = False
+        self._last_submit = 0.0
+        self._cond = threading.Condition()
+        self._thread = None
+
+    # ── build side ──
+    def changes(self, paths) -> dict:
+        """{rel: sha or None} — paths whose content differs from the last commit (or the queue)."""
+        known = {**self.committed, **self._inflight, **self._pending}
+        out = {}
+        for path in map(Path, paths):
+            path = path if path.is_absolute() else self.repo / path
+            try:
+                rel = path.relative_to(self.repo).as_posix()
+            except ValueError:   # נתיב דרך symlink / '..' — realpath רק כשצריך
+                rel = path.resolve().relative_to(self.repo).as_posix()
+            sha = _sha(path)
+            if sha != known.get(rel) and not (sha is None and rel not in known):
+                out[rel] = sha
+        for rel, sha in known.items():       # קבצים שנמחקו (shards ישנים)
+            if sha is not None and rel not in out and not (self.repo / rel).exists():
+                out[rel] = None
+        return out
+
+    def submit(self, paths, message: str) -> int:
+        """Queue whatever changed; → number of changed files (0 = nothing to publish)."""
+        with self._cond:
+            changed = self.changes(paths)
+            self.stats["builds"] += 1
+            if not changed:
+                self.stats["unchanged"] += 1
+                if not self._unpushed:
+                    return 0
+            self._push_due = True
+            self._pending.update(changed)
+            if changed:
+                self._messages.append(message)
+            self._last_submit = time.monotonic()
+            self._start()
+            self._cond.notify_all()
+            return len(changed)
+
+    def flush(self, timeout: float = None) -> bool:
+        """Publish the queue now (skip the debounce) and wait; → True if nothing is left unpushed."""
+        with self._cond:
+            self._flush = True
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: not (self._pending or self._push_due or self._busy), timeout)
+            self._flush = False
+            return not (self._pending or self._unpushed)
+
+    def close(self, timeout: float = None) -> bool:
+        ok = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return ok
+
+    # ── worker ──
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="publisher", daemon=True)
+            self._thread.start()
+
+    def _ready(self) -> bool:
+        if not (self._pending or self._push_due):
+            return False
+        return self._flush or time.monotonic() - self._last_submit >= self.debounce
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._ready():
+                    if self._closed or not (self._pending or self._push_due):
+                        self._thread = None
+                        self._cond.notify_all()
+                        return
+                    self._cond.wait(max(0.01, self.debounce - (time.monotonic() - self._last_submit)))
+                batch, self._pending = self._pending, {}
+                self._inflight = batch
+                messages, self._messages = self._messages, []
+                self._push_due = False
+                self._busy = True
+            try:
+                if batch:
+                    self._commit(batch, messages)
+                if self._unpushed:
+                    self._push()
+            finally:
+                with self._cond:
+                    self._inflight = {}
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _git(self, *args):
+        return subprocess.run(["git", "-C", str(self.repo), *args], capture_output=True, text=True)
+
+    def _commit(self, batch: dict, messages: list):
+        msg = messages[-1] if messages else "publish"
+        if len(messages) > 1:
+            msg += f" (+{len(messages) - 1} coalesced)"
+        paths = sorted(batch)
+        with span("git commit", files=len(batch)):
+            steps = []
+            present = [r for r in paths if batch[r] is not None]
+            gone = [r for r in paths if batch[r] is None]
+            if present:
+                steps.append(("add", "--", *present))
+            if gone:
+                steps.append(("rm", "-q", "--cached", "--ignore-unmatch", "--", *gone))
+            for args in steps:
+                r = self._git(*args)
+                if r.returncode != 0:
+                    print(f"  ✗ git {args[0]}: {r.stderr.strip()[:120]}")
+                    return self._unstage(paths)
+            # רק הנתיבים של ה-batch שבאמת השתנו — לא מה שמישהו אחר השאיר ב-index
+            staged = self._git("diff", "--cached", "--name-only", "-z", "--", *paths).stdout.split("\0")
+            staged = [f for f in staged if f]
+            if staged:
+                r = self._git("commit", "-q", "-m", msg, "--", *staged)
+                if r.returncode != 0:
+                    print(f"  ✗ git commit: {(r.stderr or r.stdout).strip()[:120]}")
+                    return self._unstage(paths)
+                self.stats["commits"] += 1
+                self._unpushed = True
+        # גם בלי diff ב-git (למשל state שנמחק מ-/tmp) — ה-hashes כבר תואמים את ה-HEAD
+        with self._cond:
+            for rel, sha in batch.items():
+                if sha is None:
+                    self.committed.pop(rel, None)
+                else:
+                    self.committed[rel] = sha
+        self._save()
+
+    def _unstage(self, paths):
+        """A failed batch leaves the index as it found it — the next submit sees the files as changed again."""
+        r = self._git("reset", "-q", "--", *paths)
+        if r.returncode != 0:
+            print(f"  ⚠️  git reset: {r.stderr.strip()[:120]}")
+
+    def _push(self):
+        target = self.branch or "HEAD"
+        for attempt in range(self.retries + 1):
+            t = time.perf_counter()
+            with span("git push", attempt=attempt):
+                r = self._git("push", "-q", self.remote, target)
+            if r.returncode == 0:
+                self.stats["pushes"] += 1
+                self.stats["last_push_ms"] = round((time.perf_counter() - t) * 1000, 1)
+                self._unpushed = False
+                self._save()
+                print(f"  ✓ pushed ({self.stats['last_push_ms']:.0f}ms"
+                      f"{f', retry {attempt}' if attempt else ''})")
+                return True
+            if attempt == self.retries:
+                break
+            self.stats["push_retries"] += 1
+            time.sleep(min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(.5, 1))
+        self.stats["push_failures"] += 1
+        print(f"  ✗ push failed ({' '.join(r.stderr.split())[:100]}) — kept for the next publish")
+        return False
+
+    def _save(self):
+        try:
+            state = {"committed": self.committed, "unpushed": self._unpushed}
+            self.state_path.write_text(json.dumps(state, indent=1, sort_keys=True) + "\n",
+                                       encoding="utf-8")
+        except OSError as e:
+            print(f"  ⚠️  publish state {self.state_path}: {e}")
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"publish {s['builds']} builds → {s['commits']} commits / {s['pushes']} pushes"
+                f" · {s['unchanged']} unchanged · {s['push_retries']} retries")
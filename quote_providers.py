@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Quote Providers — hedged / raced quote requests with a circuit breaker per provider
+  hedge  the primary gets the request; no answer within its running p90 → a duplicate
+         goes to the next provider (the same one again when it's the only one).
+         A primary that fails fast is hedged at once (failover).
+  race   every available provider at once
+The first successful answer wins; a failed provider just leaves it to the others.
+
+Breaker: `failures` consecutive errors → open (skipped) for `reset_s`, then a single
+trial request (half-open): success closes it, failure opens it again.
+
+Events for the lag log (LagStore run-level "@" keys, drained by log_to):
+  @hedge           one sample per hedge sent (value = delay it waited)
+  @win:<provider>  one sample per answer (value = latency the caller saw)
+  @trip:<provider> breaker opened (value = latency of the call that tripped it)
+  @open:<provider> request skipped because the breaker was open
+
+    quotes = HedgedQuotes([QuoteProvider("yahoo", fetch_quote),
+                           QuoteProvider("alt", partial(fetch_local_quote, url))])
+    price = quotes.fetch("ESLT.TA")
+"""
+
+import time
+import threading
+from collections import Counter, deque
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+
+HEDGE_MIN_SAMPLES = 20     # עד שיש מספיק מדידות — initial_hedge_ms
+HEDGE_FLOOR_MS    = 20.0   # לא שולחים hedge מהר מזה גם כש-p90 קטן
+BREAKER_FAILURES  = 5
+BREAKER_RESET_S   = 30.0
+
+def _spawn(fn, *args) -> Future:
+    """
+    fn(*args) on its own daemon thread → Future — a stuck upstream call never blocks
+    exit (ThreadPoolExecutor joins its threads at interpreter shutdown).
+    """
+    f = Future()
+    f.set_running_or_notify_cancel()
+    def run():
+        try:
+            f.set_result(fn(*args))
+        except BaseException as e:
+            f.set_exception(e)
+    threading.Thread(target=run, name="quote", daemon=True).start()
+    return f
+
+class CircuitOpen(RuntimeError):
+    """Every provider's breaker is open."""
+
+class CircuitBreaker:
+    def __init__(self, failures: int = BREAKER_FAILURES, reset_s: float = BREAKER_RESET_S,
+                 clock=time.monotonic):
+        self.failures, self.reset_s, self._clock = failures, reset_s, clock
+        self.state = "closed"
+        self.consecutive = 0
+        self.trips = 0
+        self.opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """May a request go out now? (half-open lets exactly one through)"""
+        with self._lock:
+            if self.state == "open" and self._clock() - self.opened_at >= self.reset_s:
+                self.state, self._trial = "half-open", False
+            if self.state == "closed":
+                return True
+            if self.state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self.consecutive, self.state, self._trial = 0, "closed", False
+
+    def failure(self) -> bool:
+        """→ True when this failure opened the breaker."""
+        with self._lock:
+            self.consecutive += 1
+            if self.state == "half-open" or (self.state == "closed" and self.consecutive >= self.failures):
+                self.state, self.opened_at, self._trial = "open", self._clock(), False
+                self.trips += 1
+                return True
+            return False
+
+class QuoteProvider:
+    """fetch(symbol) → price, plus its breaker and a window of recent latencies."""
+
+    def __init__(self, name: str, fetch, breaker: CircuitBreaker = None, window: int = 256):
+        self.name, self._fetch = name, fetch
+        self.breaker = breaker or CircuitBreaker()
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def fetch(self, symbol: str):
+        return self._fetch(symbol)
+
+    def observe(self, ms: float):
+        with self._lock:
+            self._latencies.append(ms)
+
+    def p90(self, min_samples: int = HEDGE_MIN_SAMPLES):
+        """Running p90 of successful answers (None until min_samples)."""
+        with self._lock:
+            lat = sorted(self._latencies)
+        if len(lat) < min_samples:
+            return None
+        return lat[min(len(lat) - 1, int(len(lat) * .9))]
+
+class HedgedQuotes:
+    def __init__(self, providers, race: bool = False, initial_hedge_ms: float = 1000.0,
+                 floor_ms: float = HEDGE_FLOOR_MS, timeout_s: float = 10.0):
+        if not providers:
+            raise ValueError("HedgedQuotes needs at least one provider")
+        self.providers = list(providers)
+        self.race = race
+        self.initial_hedge_ms, self.floor_ms, self.timeout_s = initial_hedge_ms, floor_ms, timeout_s
+        self.stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "failed": 0,
+                      "short_circuits": 0, "wins": Counter()}
+        self.events = []
+        self._lock = threading.Lock()
+
+    # ── bookkeeping ──
+    def _event(self, key: str, ms: float):
+        with self._lock:
+            self.events.append((key, ms))
+
+    def _count(self, key: str, n: int = 1):
+        with self._lock:
+            self.stats[key] += n
+
+    def hedge_delay_ms(self, provider: QuoteProvider) -> float:
+        p90 = provider.p90()
+        return max(self.floor_ms, p90 if p90 is not None else self.initial_hedge_ms)
+
+    def _available(self, candidates, first: bool = False):
+        """Providers whose breaker lets a request through (skips logged as @open)."""
+        out = []
+        for p in candidates:
+            if p.breaker.allow():
+                out.append(p)
+                if first:   # לא צורכים ניסיון half-open של provider שלא נשתמש בו
+                    break
+            else:
+                self._count("short_circuits")
+                self._event(f"@open:{p.name}", 0.0)
+        return out
+
+    def _hedge_target(self, primary: QuoteProvider):
+        others = self._available([p for p in self.providers if p is not primary], first=True)
+        if others:
+            return others[0]
+        return primary if primary.breaker.allow() else None   # duplicate לאותו provider
+
+    def _call(self, provider: QuoteProvider, symbol: str):
+        t = time.perf_counter()
+        try:
+            price = provider.fetch(symbol)
+            if price is None:
+                raise ValueError(f"{provider.name}: no price for {symbol}")
+        except Exception:
+            if provider.breaker.failure():
+                self._event(f"@trip:{provider.name}", (time.perf_counter() - t) * 1000)
+            raise
+        ms = (time.perf_counter() - t) * 1000
+        provider.observe(ms)
+        provider.breaker.success()
+        return price
+
+    # ── the request ──
+    def fetch(self, symbol: str):
+        """First successful price across the providers; raises the last error when all fail."""
+        self._count("requests")
+        t0 = time.perf_counter()
+        deadline = t0 + self.timeout_s
+        # race → כולם; אחרת הראשון שה-breaker שלו סגור הוא ה-primary
+        launched = self._available(self.providers, first=not self.race)
+        if not launched:
+            self._count("failed")
+            raise CircuitOpen("all quote providers are open: "
+                              + ", ".join(p.name for p in self.providers))
+        primary = launched[0]
+        # thread daemon לכל בקשה — ה-fetch עצמו רץ כבר בתוך thread של measure_all
+        futures = {_spawn(self._call, p, symbol): (p, False) for p in launched}
+        pending = set(futures)
+        hedge_at = None if self.race else t0 + self.hedge_delay_ms(primary) / 1000
+        error = None
+        while True:
+            now = time.perf_counter()
+            if hedge_at is not None and (now >= hedge_at or not pending):
+                hedge_at = None
+                target = self._hedge_target(primary)
+                if target is not None:
+                    f = _spawn(self._call, target, symbol)
+                    futures[f] = (target, True)
+                    pending.add(f)
+                    self._count("hedged")
+                    self._event("@hedge", (now - t0) * 1000)
+            if not pending:
+                break
+            until = min(hedge_at if hedge_at is not None else deadline, deadline)
+            done, pending = wait(pending, timeout=max(0.0, until - time.perf_counter()),
+                                 return_when=FIRST_COMPLETED)
+            for f in done:
+                try:
+                    price = f.result()
+                except Exception as e:
+                    error = e
+                    continue
+                provider, hedged = futures[f]
+                ms = (time.perf_counter() - t0) * 1000
+                with self._lock:
+                    self.stats["wins"][provider.name] += 1
+                    self.stats["hedge_wins"] += hedged
+                    self.events.append((f"@win:{provider.name}", ms))
+                return price
+            if pending and time.perf_counter() >= deadline:
+                error = TimeoutError(f"{symbol}: no provider answered within {self.timeout_s:.1f}s")
+                break
+        self._count("failed")
+        raise error
+
+    # ── reporting ──
+    def log_to(self, store):
+        """Drain the events into a LagStore (one record_value per event)."""
+        with self._lock:
+            events, self.events = self.events, []
+        for key, ms in events:
+            store.record_value(key, ms)
+        return len(events)
+
+    def summary(self) -> str:
+        s = self.stats
+        wins = " ".join(f"{name} {n}" for name, n in s["wins"].most_common())
+        breakers = " ".join(f"{p.name} {p.breaker.state}"
+                            + (f" ({p.breaker.trips} trips)" if p.breaker.trips else "")
+                            for p in self.providers)
+        return (f"{s['requests']} requests · hedged {s['hedged']} (won {s['hedge_wins']})"
+                f" · wins {wins or '—'} · failed {s['failed']} · breakers {breakers}")
+
+    def close(self):
+        """Nothing to wait for — requests still in flight run on daemon threads."""
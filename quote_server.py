@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Quote Server — local stand-in for the quote API, with injected latency / errors / rate limits
+  GET /quote/<symbol>   → {"symbol", "price", "ts"}   (503 on an injected error,
+                          429 + Retry-After when over the rate limit)
+  GET /stats            → request / error / throttled counters
+Latency specs:  fixed:MS · uniform:LO:HI · lognormal:MEDIAN:SIGMA · exp:MEAN
+  spikes=(p, ms)  adds a rare stall on top (p of requests wait an extra ms) — the p99 tail
+Prices are stable per symbol (crc32 seeded), with a small jitter per request.
+
+    with QuoteServer("lognormal:80:0.6", error_rate=.02, rate_limit=50) as srv:
+        urllib.request.urlopen(f"{srv.url}/quote/ESLT.TA")
+
+  python quote_server.py --port 8765 --latency lognormal:80:0.6 --error-rate 0.02 --rate-limit 50 --burst 5
+"""
+
+import json
+import time
+import zlib
+import random
+import argparse
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ─── latency ──────────────────────────────────────────────────────────────────
+def latency_sampler(spec: str, rng: random.Random):
+    """'lognormal:80:0.6' → fn() returning ms. Raises ValueError on a bad spec."""
+    kind, *params = spec.split(":")
+    try:
+        p = [float(x) for x in params]
+    except ValueError:
+        raise ValueError(f"latency spec {spec!r}: numbers expected") from None
+    if kind == "fixed" and len(p) == 1:
+        return lambda: p[0]
+    if kind == "uniform" and len(p) == 2:
+        return lambda: rng.uniform(p[0], p[1])
+    if kind == "lognormal" and len(p) == 2:   # median, sigma (של ln)
+        import math
+        mu = math.log(max(p[0], 1e-3))
+        return lambda: rng.lognormvariate(mu, p[1])
+    if kind == "exp" and len(p) == 1:
+        return lambda: rng.expovariate(1 / p[0]) if p[0] > 0 else 0.0
+    raise ValueError(f"latency spec {spec!r} — fixed:MS | uniform:LO:HI | lognormal:MEDIAN:SIGMA | exp:MEAN")
+
+class TokenBucket:
+    """rate tokens/s, up to `burst` banked (default rate/10, at least 1); take() → False when empty."""
+
+    def __init__(self, rate: float, burst: float = None):
+        # burst קטן — אחרת תא קצר ב-load test נגמר לפני שה-limit נוגע בו
+        self.rate, self.burst = rate, burst or max(1.0, rate / 10)
+        self.tokens = self.burst
+        self.t = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.t) * self.rate)
+            self.t = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+# ─── server ───────────────────────────────────────────────────────────────────
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256   # ברירת המחדל (5) מפילה חיבורים כבר ב-32 workers
+
+class QuoteServer:
+    def __init__(self, latency: str = "lognormal:80:0.6", error_rate: float = 0.0,
+                 rate_limit: float = None, burst: float = None, spikes=None,
+                 host: str = "127.0.0.1", port: int = 0, seed: int = None):
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._sample = latency_sampler(latency, self._rng)
+        self.latency, self.error_rate, self.rate_limit = latency, error_rate, rate_limit
+        self.burst = burst
+        self.spikes = spikes
+        self.bucket = TokenBucket(rate_limit, burst) if rate_limit else None
+        self.stats = {"requests": 0, "ok": 0, "errors": 0, "throttled": 0}
+        self._stats_lock = threading.Lock()
+        self.httpd = _Server((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset(self):
+        """Full token bucket + zeroed counters — each load-test cell starts alike."""
+        if self.bucket:
+            self.bucket = TokenBucket(self.bucket.rate, self.bucket.burst)
+        with self._stats_lock:
+            self.stats = dict.fromkeys(self.stats, 0)
+
+    def describe(self) -> str:
+        parts = [self.latency]
+        if self.spikes:
+            parts.append(f"spikes {self.spikes[0]:.1%}×{self.spikes[1]:.0f}ms")
+        if self.error_rate:
+            parts.append(f"errors {self.error_rate:.1%}")
+        if self.rate_limit:
+            parts.append(f"limit {self.rate_limit:g}/s burst {self.bucket.burst:g}")
+        return " · ".join(parts)
+
+    def _draw(self):
+        """(delay_ms, fail) for one request — one lock, so a seeded run is reproducible per order."""
+        with self._rng_lock:
+            ms = self._sample()
+            if self.spikes and self._rng.random() < self.spikes[0]:
+                ms += self.spikes[1]
+            return ms, self._rng.random() < self.error_rate
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats["requests"] += 1
+            self.stats[key] += 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.0"
+
+            def log_message(self, *args):   # שקט — אלפי בקשות בכל sweep
+                pass
+
+            def _send(self, code, body: dict, headers=()):
+                data = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in headers:
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/stats":
+                    return self._send(200, dict(server.stats))
+                if not self.path.startswith("/quote/"):
+                    return self._send(404, {"error": "not found"})
+                symbol = self.path[len("/quote/"):]
+                if server.bucket and not server.bucket.take():
+                    server._count("throttled")
+                    return self._send(429, {"error": "rate limited"}, [("Retry-After", "1")])
+                ms, fail = server._draw()
+                time.sleep(ms / 1000)
+                if fail:
+                    server._count("errors")
+                    return self._send(503, {"error": "injected failure"})
+                server._count("ok")
+                base = random.Random(zlib.crc32(symbol.encode())).uniform(10, 500)
+                with server._rng_lock:
+                    price = base * (1 + server._rng.uniform(-.002, .002))
+                self._send(200, {"symbol": symbol, "price": round(price, 2),
+                                 "ts": datetime.now().isoformat(timespec="milliseconds")})
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="quote-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def parse_spikes(s: str):
+    """'0.01:2000' → (0.01, 2000.0)"""
+    if not s:
+        return None
+    p, ms = s.split(":")
+    return float(p), float(ms)
+
+def add_server_args(parser):
+    parser.add_argument("--latency", default="lognormal:80:0.6",
+                        help="fixed:MS | uniform:LO:HI | lognormal:MEDIAN:SIGMA | exp:MEAN")
+    parser.add_argument("--spikes", type=parse_spikes, default=None, metavar="P:MS",
+                        help="rare stalls: fraction P of requests wait MS more (e.g. 0.01:2000)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 503 answers")
+    parser.add_argument("--rate-limit", type=float, default=None, help="requests/s before 429")
+    parser.add_argument("--burst", type=float, default=None,
+                        help="requests banked above the rate (default rate/10, at least 1)")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="local quote server with injected latency / errors")
+    ap.add_argument("--port", type=int, default=8765)
+    add_server_args(ap)
+    args = ap.parse_args()
+    srv = QuoteServer(args.latency, args.error_rate, args.rate_limit, args.burst, spikes=args.spikes,
+                      port=args.port, seed=args.seed)
+    print(f"🛰️  quote server {srv.url} · {srv.describe()}  (Ctrl+C to stop)")
+    try:
+        srv.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.httpd.server_close()
+        print(f"🛑 {srv.stats}")
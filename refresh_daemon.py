@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Refresh daemon — one warm process for the trading day instead of a cold run per hour
+  python generate_all.py --daemon [--interval 3600] [--stay]
+What stays warm between cycles: imported modules (yfinance / pandas and their HTTP
+sessions), the market cache connection, the open history store, the parsed
+portfolios-5way.json (re-read only when its mtime moves) and one Publisher, so
+cycles that land close together go out as one commit.
+
+Schedule: a cycle at start, then every --interval; the last cycle of the day is
+pinned to the session close (17:30) so the closing prices make it out. Outside
+market hours the daemon exits cleanly (cron / systemd start it again at 10:00),
+or with --stay sleeps until the next session. SIGINT / SIGTERM stop it between
+cycles; the publisher is flushed before exit.
+
+Status (last cycle's stage timings, next run) → BANKOS_DAEMON_STATUS
+(/tmp/bankos_daemon.json), rewritten after every cycle.
+"""
+
+import os
+import json
+import time
+import signal
+import asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from market_cache import in_session, next_session_open, SESSION_CLOSE
+from templates import atomic_write_text
+
+STATUS_FILE = Path(os.environ.get("BANKOS_DAEMON_STATUS", "/tmp/bankos_daemon.json"))
+INTERVAL_S  = 3600
+
+def session_close(now: datetime) -> datetime:
+    return now.replace(hour=SESSION_CLOSE[0], minute=SESSION_CLOSE[1], second=0, microsecond=0)
+
+class RefreshDaemon:
+    def __init__(self, ga, interval: float = INTERVAL_S, jobs: int = 1, deep="auto", assets=True,
+                 stay: bool = False, ignore_hours: bool = False, max_cycles: int = None,
+                 status_file=STATUS_FILE):
+        self.interval = interval
+        self.cycle_args = {"jobs": jobs, "deep": deep, "assets": assets}
+        self.stay, self.ignore_hours, self.max_cycles = stay, ignore_hours, max_cycles
+        self.status_file = Path(status_file)
+        self.cycles = 0
+        self.failures = 0
+        self.last = None
+        self.next_run = None
+        self.started = datetime.now()
+        self._stop = None
+        self._ga = ga             # generate_all — כבר נטען, עם ה-imports הכבדים
+        self.publisher = None
+
+    # ── lifecycle ──
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+
+    async def _sleep(self, seconds: float) -> bool:
+        """Wait `seconds` or until stop(); → True if stopped."""
+        try:
+            await asyncio.wait_for(self._stop.wait(), timeout=max(0.0, seconds))
+        except asyncio.TimeoutError:
+            pass
+        return self._stop.is_set()
+
+    async def run(self):
+        self._stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass
+        from publisher import Publisher
+        self.publisher = Publisher(self._ga.OUT_DIR)
+        print(f"🛰️  daemon up · every {self.interval:.0f}s"
+              f"{' · ignoring market hours' if self.ignore_hours else ''} · status → {self.status_file}")
+        try:
+            await self._loop()
+        finally:
+            self.next_run = None
+            await asyncio.to_thread(self.publisher.close, 120)
+            self._write_status("stopped")
+            print(f"🛑 daemon down · {self.cycles} cycles · {self.publisher.summary()}")
+
+    async def _loop(self):
+        final = False
+        while not self._stop.is_set():
+            now = datetime.now()
+            if not (final or self.ignore_hours or in_session(now)):
+                if not self.stay:
+                    print("🔚 outside market hours — exiting")
+                    return
+                nxt = next_session_open(now)
+                self.next_run = nxt
+                self._write_status("sleeping")
+                print(f"💤 outside market hours — next session {nxt:%a %d/%m %H:%M}")
+                if await self._sleep((nxt - now).total_seconds()):
+                    return
+                continue
+
+            await self._cycle()
+            if self.max_cycles and self.cycles >= self.max_cycles:
+                return
+            if final:   # הסבב של הסגירה רץ — הבא כבר מחוץ לשעות
+                final = False
+                continue
+
+            wake = datetime.now() + timedelta(seconds=self.interval)
+            close = session_close(now)
+            if not self.ignore_hours and now < close <= wake:
+                wake, final = close, True
+            self.next_run = wake
+            self._write_status("waiting")
+            if await self._sleep((wake - datetime.now()).total_seconds()):
+                return
+
+    async def _cycle(self):
+        self.cycles += 1
+        started = datetime.now()
+        t = time.perf_counter()
+        print(f"\n⟳ cycle {self.cycles} · {started:%H:%M:%S}")
+        try:
+            result = await asyncio.to_thread(
+                self._ga.run_cycle, self.publisher,
+                previous=self.last and self.last.get("snapshot"), **self.cycle_args)
+        except Exception as e:   # סבב שנכשל לא מפיל את ה-daemon — הבא ינסה שוב
+            self.failures += 1
+            result = {"error": f"{type(e).__name__}: {e}"}
+            print(f"  ✗ cycle failed: {result['error']}")
+        result["started"] = started.isoformat(timespec="seconds")
+        result["total_ms"] = round((time.perf_counter() - t) * 1000, 1)
+        self.last = result
+        stages = " · ".join(f"{k} {v:.0f}" for k, v in result.get("stages", {}).items())
+        print(f"  ⏱  {result['total_ms']:.0f}ms  ({stages})")
+
+    def _write_status(self, state: str):
+        status = {
+            "state": state, "pid": os.getpid(),
+            "started": self.started.isoformat(timespec="seconds"),
+            "cycles": self.cycles, "failures": self.failures,
+            "next_run": self.next_run.isoformat(timespec="seconds") if self.next_run else None,
+            "last": self.last,
+            "publish": self.publisher.stats if self.publisher else None,
+        }
+        try:
+            atomic_write_text(self.status_file, json.dumps(status, indent=1) + "\n")
+        except OSError as e:
+            print(f"  ⚠️  status {self.status_file}: {e}")
+
+def status(path=STATUS_FILE) -> dict:
+    """Last status a running (or stopped) daemon wrote."""
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+def serve(ga, **kwargs):
+    """generate_all --daemon: serve(sys.modules[__name__], interval=…)."""
+    asyncio.run(RefreshDaemon(ga, **kwargs).run())
+
+
+if __name__ == "__main__":
+    # python refresh_daemon.py status
+    try:
+        print(json.dumps(status(), indent=1, ensure_ascii=False))
+    except FileNotFoundError:
+        print(f"no daemon status at {STATUS_FILE}")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Shards — content-hashed JSON files plus one small manifest, for long-lived caching
+  <root>/shards/<name>.<hash12>.json   immutable: new content → new file name
+  <root>/manifest.json                 {"shards": {name: "shards/…json"}} — the only
+                                       file a client has to revalidate
+A publish writes only shards whose content is new and rewrites the manifest
+only when a pointer moved. Shards referenced by neither the new nor the
+previous manifest are deleted (a page that loaded the previous manifest a
+moment ago still finds its files).
+
+    s = ShardSet(OUT_DIR / "data")
+    s.put("pnl", text)                       # one section
+    s.put_group("portfolio/", {id: text})    # one shard per portfolio; stale ids dropped
+    s.put_stream("pnl", chunks)              # large payloads: streamed to disk, hashed on the way
+    s.publish()
+"""
+
+import os
+import re
+import json
+import hashlib
+from pathlib import Path
+
+from templates import atomic_write_text
+
+MANIFEST_NAME = "manifest.json"
+SHARD_DIR     = "shards"
+HASH_LEN      = 12
+COMPRESSED    = (".gz", ".br")   # העותקים ש-assets.py מכין (assets.SIBLINGS)
+_SHARD_NAME   = re.compile(rf"[A-Za-z0-9_-]+\.[0-9a-f]{{{HASH_LEN}}}\.json")
+
+def _stem(name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_-]+', '-', name)
+
+def shard_file(name: str, text: str) -> str:
+    """'portfolio/solid' + content → 'portfolio-solid.<hash>.json'"""
+    h = hashlib.sha256(text.encode("utf-8")).hexdigest()[:HASH_LEN]
+    return f"{_stem(name)}.{h}.json"
+
+def is_shard(path) -> bool:
+    """A content-named shard file — its bytes must stay the ones its name was hashed from."""
+    path = Path(path)
+    return path.parent.name == SHARD_DIR and _SHARD_NAME.fullmatch(path.name) is not None
+
+class ShardSet:
+    def __init__(self, root, manifest: str = MANIFEST_NAME):
+        self.root = Path(root)
+        self.manifest_path = self.root / manifest
+        self.dir = self.root / SHARD_DIR
+        try:
+            self.previous = json.loads(self.manifest_path.read_text(encoding="utf-8"))["shards"]
+        except Exception:
+            self.previous = {}
+        self.shards = dict(self.previous)
+        self._pending = {}   # rel path → text
+
+    def put(self, name: str, text: str) -> str:
+        """Stage one shard (serialized JSON text); → its path relative to the root."""
+        rel = f"{SHARD_DIR}/{shard_file(name, text)}"
+        self.shards[name] = rel
+        if not (self.root / rel).exists():
+            self._pending[rel] = text
+        return rel
+
+    def put_stream(self, name: str, chunks) -> Path:
+        """
+        Stage one shard from an iterable of str chunks — written to a temp file and
+        hashed while writing, then renamed to its content name; → the shard file.
+        Unlike put() it lands before publish(); nothing points at it until the manifest does.
+        """
+        self.dir.mkdir(parents=True, exist_ok=True)
+        h = hashlib.sha256()
+        tmp = self.dir / f".{_stem(name)}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as fp:
+                for chunk in chunks:
+                    b = chunk.encode("utf-8")
+                    h.update(b)
+                    fp.write(b)
+            path = self.dir / f"{_stem(name)}.{h.hexdigest()[:HASH_LEN]}.json"
+            if path.exists():   # אותו תוכן כבר קיים — shard לא משתנה
+                tmp.unlink()
+            else:
+                os.replace(tmp, path)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        self.shards[name] = f"{SHARD_DIR}/{path.name}"
+        return path
+
+    def keep(self, name: str):
+        """Point `name` at its shard from the previous manifest again; → the file, or None if there is none."""
+        rel = self.previous.get(name)
+        if rel is None or not (self.root / rel).exists():
+            return None
+        self.shards[name] = rel
+        return self.root / rel
+
+    def drop_group(self, prefix: str):
+        for name in [n for n in self.shards if n.startswith(prefix)]:
+            del self.shards[name]
+
+    def put_group(self, prefix: str, texts: dict):
+        """Replace every shard under `prefix` with {key: text} — keys gone from the dict are dropped."""
+        self.drop_group(prefix)
+        for key, text in texts.items():
+            self.put(prefix + str(key), text)
+
+    def publish(self) -> list:
+        """Write new shards, then the manifest (if it changed), then prune. → names that changed."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        for rel, text in self._pending.items():
+            atomic_write_text(self.root / rel, text)
+        self._pending.clear()
+        changed = sorted(n for n in self.shards.keys() | self.previous.keys()
+                         if self.shards.get(n) != self.previous.get(n))
+        if changed or not self.manifest_path.exists():
+            atomic_write_text(self.manifest_path, json.dumps(
+                {"shards": dict(sorted(self.shards.items()))},
+                ensure_ascii=False, indent=1) + "\n")
+            self._prune(set(self.shards.values()) | set(self.previous.values()))
+            self.previous = dict(self.shards)
+        return changed
+
+    def _prune(self, keep: set):
+        """Delete stale shards with their precompressed copies (assets.py writes .gz / .br)."""
+        for f in self.dir.glob("*.json"):
+            if f"{SHARD_DIR}/{f.name}" not in keep:
+                for ext in COMPRESSED:
+                    f.with_name(f.name + ext).unlink(missing_ok=True)
+                f.unlink(missing_ok=True)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Snapshot Log — append-only daily portfolio snapshots with a date index
+  snapshots.jsonl  one JSON record per run (date, totals, per-portfolio values)
+  snapshots.idx    fixed 12-byte entries (date ordinal, byte offset) — one per record
+
+Reading the last N days or a date range seeks through the index and reads
+only the rows returned, no matter how many days the log holds (the old
+chart globbed and parsed every *-snapshot.txt in the directory).
+
+usage:
+  python snapshot_log.py import [daily_dir]   # existing *-snapshot.txt → log
+  python snapshot_log.py tail [N]
+  python snapshot_log.py range 2026-02-01 2026-02-28
+"""
+
+import os
+import re
+import sys
+import json
+import struct
+from bisect import bisect_left
+from datetime import date
+from pathlib import Path
+
+DAILY_DIR = Path(__file__).parent.parent / "investment-learning" / "daily"
+LOG_NAME  = "snapshots.jsonl"
+IDX_NAME  = "snapshots.idx"
+
+_ENTRY = struct.Struct("<iq")   # date ordinal, offset in the .jsonl
+
+def _ordinal(d) -> int:
+    return (date.fromisoformat(d) if isinstance(d, str) else d).toordinal()
+
+class _Index:
+    """Random access to the .idx entries — a sequence bisect can search."""
+
+    def __init__(self, fp, n):
+        self.fp, self.n = fp, n
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        self.fp.seek(i * _ENTRY.size)
+        return _ENTRY.unpack(self.fp.read(_ENTRY.size))[0]
+
+    def entries(self, lo, hi):
+        self.fp.seek(lo * _ENTRY.size)
+        return list(_ENTRY.iter_unpack(self.fp.read((hi - lo) * _ENTRY.size)))
+
+
+class SnapshotLog:
+    def __init__(self, directory=DAILY_DIR):
+        self.dir = Path(directory)
+        self.log_path = self.dir / LOG_NAME
+        self.idx_path = self.dir / IDX_NAME
+
+    def __len__(self):
+        return self._count()
+
+    def _count(self) -> int:
+        try:
+            return self.idx_path.stat().st_size // _ENTRY.size
+        except FileNotFoundError:
+            return 0
+
+    # ── writes ──
+    def append(self, record: dict):
+        """Append one record ({"date": "YYYY-MM-DD", ...}); dates must not go backwards."""
+        o = _ordinal(record["date"])
+        self.dir.mkdir(parents=True, exist_ok=True)
+        n = self._count()
+        if n:
+            with open(self.idx_path, "rb") as f:
+                last = _Index(f, n)[n - 1]
+            if o < last:
+                raise ValueError(f"snapshot {record['date']} is older than the log's last day")
+        line = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        # הלוג קודם, האינדקס אחרון: רשומה בלי כניסה באינדקס פשוט לא נראית
+        with open(self.log_path, "ab") as f:
+            offset = f.tell()
+            f.write(line)
+        with open(self.idx_path, "ab") as f:
+            f.truncate(n * _ENTRY.size)   # שארית של כתיבה שנקטעה
+            f.write(_ENTRY.pack(o, offset))
+
+    # ── reads ──
+    def _read(self, entries):
+        if not entries:
+            return []
+        out = []
+        with open(self.log_path, "rb") as f:
+            f.seek(entries[0][1])
+            for _, offset in entries:
+                if f.tell() != offset:   # שורה בלי כניסה באינדקס (append שנקטע) — מדלגים
+                    f.seek(offset)
+                out.append(json.loads(f.readline()))
+        return out
+
+    def range(self, start=None, end=None, latest_per_day: bool = True) -> list:
+        """Records with start <= date <= end (ISO strings or dates), oldest first."""
+        n = self._count()
+        if not n:
+            return []
+        with open(self.idx_path, "rb") as f:
+            idx = _Index(f, n)
+            lo = bisect_left(idx, _ordinal(start)) if start else 0
+            hi = bisect_left(idx, _ordinal(end) + 1) if end else n
+            entries = idx.entries(lo, hi) if lo < hi else []
+        rows = self._read(entries)
+        return _latest_per_day(rows) if latest_per_day else rows
+
+    def last_days(self, n_days: int) -> list:
+        """The latest record of each of the last n_days logged days, oldest first."""
+        n = self._count()
+        if not n or n_days <= 0:
+            return []
+        with open(self.idx_path, "rb") as f:
+            idx = _Index(f, n)
+            # אחורה מהסוף עד שנאספו n_days תאריכים שונים
+            lo, days, prev = n, 0, None
+            while lo > 0:
+                o = idx[lo - 1]
+                if o != prev:
+                    if days == n_days:
+                        break
+                    days, prev = days + 1, o
+                lo -= 1
+            entries = idx.entries(lo, n)
+        return _latest_per_day(self._read(entries))
+
+    # ── maintenance ──
+    def rewrite(self, records):
+        """Replace the log with `records` (sorted by date), rebuilding the index."""
+        records = sorted(records, key=lambda r: (r["date"], r.get("ts", "")))
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp_log = self.log_path.with_suffix(".jsonl.tmp")
+        tmp_idx = self.idx_path.with_suffix(".idx.tmp")
+        with open(tmp_log, "wb") as lf, open(tmp_idx, "wb") as xf:
+            for r in records:
+                xf.write(_ENTRY.pack(_ordinal(r["date"]), lf.tell()))
+                lf.write((json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8"))
+        os.replace(tmp_log, self.log_path)
+        os.replace(tmp_idx, self.idx_path)
+
+    def all(self) -> list:
+        return self.range(latest_per_day=False)
+
+
+def _latest_per_day(rows):
+    out = {}
+    for r in rows:
+        out[r["date"]] = r   # רשומות של אותו יום ממוינות לפי זמן — האחרונה גוברת
+    return list(out.values())
+
+# ─── txt → log ────────────────────────────────────────────────────────────────
+_MONEY = r"₪\s*([-\d,]+(?:\.\d+)?)"
+_PORTFOLIO = re.compile(r"^\s+(\S[\w\- ]*?)\s+gross " + _MONEY + r"\s+net " + _MONEY + r"\s+([-+\d.]+)%")
+_STAMP = re.compile(r"^BankOS (\d{4}-\d{2}-\d{2} \d{2}:\d{2})(?:\s+\(snapshot (\w+))?")
+
+def _money(s: str) -> float:
+    return float(s.replace(",", ""))
+
+def parse_txt(path) -> dict:
+    """One *-snapshot.txt → log record (None if it has no total)."""
+    path = Path(path)
+    rec = {"date": path.stem[:10], "portfolios": {}}
+    for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
+        m = _STAMP.match(line)
+        if m:
+            rec["ts"] = m.group(1).replace(" ", "T")
+            if m.group(2): rec["snapshot"] = m.group(2)
+            continue
+        if ("Total Value:" in line or "Total gross:" in line) and "₪" in line:
+            rec["total_gross"] = _money(re.search(_MONEY, line).group(1))
+        elif "Total net:" in line and "₪" in line:
+            rec["total_net"] = _money(re.search(_MONEY, line).group(1))
+        else:
+            m = _PORTFOLIO.match(line)
+            if m:
+                rec["portfolios"][m.group(1).strip()] = {
+                    "gross": _money(m.group(2)), "net": _money(m.group(3)),
+                    "return_pct": float(m.group(4))}
+    return rec if "total_gross" in rec else None
+
+def import_txt(log: SnapshotLog, directory=None) -> int:
+    """Merge every *.txt snapshot in directory into the log (days already logged win)."""
+    directory = Path(directory or log.dir)
+    have = {r["date"] for r in log.all()}
+    new = []
+    for f in sorted(directory.glob("*.txt")):
+        try:
+            rec = parse_txt(f)
+        except Exception:
+            continue
+        if rec and rec["date"] not in have:
+            try:
+                date.fromisoformat(rec["date"])
+            except ValueError:
+                continue
+            new.append(rec)
+    if new:
+        log.rewrite(log.all() + new)
+    return len(new)
+
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "tail"
+    if cmd == "import":
+        d = Path(sys.argv[2]) if len(sys.argv) > 2 else DAILY_DIR
+        log = SnapshotLog(d)
+        print(f"✅ imported {import_txt(log, d)} txt snapshots → {log.log_path} ({len(log)} records)")
+    elif cmd == "range" and len(sys.argv) == 4:
+        for r in SnapshotLog().range(sys.argv[2], sys.argv[3]):
+            print(f"  {r['date']}  ₪{r['total_gross']:>12,.2f}")
+    else:
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 14
+        for r in SnapshotLog().last_days(n):
+            print(f"  {r['date']}  ₪{r['total_gross']:>12,.2f}")
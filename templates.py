@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Templates — tiny rendering layer for the HTML generators
+  • HtmlWriter: list-join buffer (linear, not `html += ...` quadratic) that can
+    also stream straight into an open file so a page with 50k holdings never
+    sits in memory as one string
+  • compile_once: memoise pure fragment builders (svg icons, <head> chrome)
+"""
+
+import os
+from functools import lru_cache
+from pathlib import Path
+
+FLUSH_BYTES = 256 * 1024   # streaming: flush to disk every ~256KB of text
+
+compile_once = lru_cache(maxsize=None)
+
+class HtmlWriter:
+    """Append-only page buffer. With fp=None, getvalue() returns the page."""
+
+    def __init__(self, fp=None, flush_bytes: int = FLUSH_BYTES):
+        self.fp = fp
+        self.flush_bytes = flush_bytes
+        self._parts = []
+        self._size = 0
+
+    def write(self, s: str):
+        self._parts.append(s)
+        self._size += len(s)
+        if self.fp is not None and self._size >= self.flush_bytes:
+            self.flush()
+
+    def writelines(self, parts):
+        for s in parts:
+            self.write(s)
+
+    def flush(self):
+        if self.fp is not None and self._parts:
+            self.fp.write("".join(self._parts))
+            self._parts.clear()
+            self._size = 0
+
+    def getvalue(self) -> str:
+        if self.fp is not None:
+            raise ValueError("streaming writer has no in-memory value")
+        return "".join(self._parts)
+
+def atomic_write_text(path, text: str, encoding: str = "utf-8"):
+    """Write via temp file + rename — a reader sees the old page or the new one, never half."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w", encoding=encoding, newline="") as fp:
+            fp.write(text)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return path
+
+def stream_to_file(path, render, encoding: str = "utf-8"):
+    """
+    render(writer) writes the page chunk by chunk into `path`,
+    through the same temp file + rename as atomic_write_text.
+    """
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w", encoding=encoding, newline="") as fp:
+            w = HtmlWriter(fp)
+            render(w)
+            w.flush()
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return path
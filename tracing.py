@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tracing — nested spans for the generators, exported as Chrome/Perfetto JSON
+  with span("history"): ...           # context manager
+  @traced("build_deep")               # decorator
+Each span records wall time, CPU time (process) and the change in allocated
+blocks. Open the trace in chrome://tracing or ui.perfetto.dev.
+Spans are for stages, not inner loops: getallocatedblocks() walks the
+allocator arenas, so an enabled span costs microseconds.
+
+Disabled (the default) span() returns one shared no-op object before touching
+its args; that object's __enter__/__exit__ are C builtins, not Python methods,
+so a disabled `with span(...)` costs the call and no Python frame inside. Enable with BANKOS_TRACE=1 or tracing.enable(); process-pool
+workers inherit the env flag, start with an empty buffer and hand their
+events back via drain()/merge().
+"""
+
+import os
+import sys
+import json
+import time
+import itertools
+import threading
+from functools import wraps
+from pathlib import Path
+
+TRACE_DIR = Path(os.environ.get("BANKOS_TRACE_DIR", "/tmp/bankos_traces"))
+
+_enabled = os.environ.get("BANKOS_TRACE", "") not in ("", "0")
+_events = []
+_lock = threading.Lock()
+_local = threading.local()
+
+def enabled() -> bool:
+    return _enabled
+
+def enable(on: bool = True):
+    """Turn tracing on for this process and any worker it spawns."""
+    global _enabled
+    _enabled = on
+    os.environ["BANKOS_TRACE"] = "1" if on else "0"
+
+class _NoSpan:
+    __slots__ = ()
+    # builtins לא נקשרים ל-self ולא פותחים frame: "".format(type, exc, tb) → "" (falsy,
+    # החריגה ממשיכה); __enter__ מוגדר אחרי שיש מופע — repeat(_NOOP).__next__ → _NOOP
+    __exit__ = "".format
+    def set(self, **args): pass
+
+_NOOP = _NoSpan()
+_NoSpan.__enter__ = itertools.repeat(_NOOP).__next__
+
+class _Span:
+    __slots__ = ("name", "args", "t0", "c0", "a0", "depth")
+
+    def __init__(self, name, args):
+        self.name, self.args = name, args
+
+    def set(self, **args):
+        """Attach extra args (counts, sizes) to the span while it is open."""
+        self.args.update(args)
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.depth = len(stack)
+        stack.append(self)
+        self.a0 = sys.getallocatedblocks()
+        self.c0 = time.process_time_ns()
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        t1 = time.perf_counter_ns()
+        c1 = time.process_time_ns()
+        a1 = sys.getallocatedblocks()
+        _local.stack.pop()
+        args = dict(self.args, cpu_ms=round((c1 - self.c0) / 1e6, 3),
+                    alloc_blocks=a1 - self.a0, depth=self.depth)
+        if exc_type is not None:
+            args["error"] = exc_type.__name__
+        ev = {"name": self.name, "ph": "X", "ts": self.t0 // 1000,
+              "dur": (t1 - self.t0) // 1000, "pid": os.getpid(),
+              "tid": threading.get_ident(), "args": args}
+        with _lock:
+            _events.append(ev)
+        return False
+
+def span(name: str, **args):
+    if not _enabled:
+        return _NOOP   # לפני כל עבודה — בלי _Span, בלי העתקת args
+    return _Span(name, args)
+
+def traced(name: str = None):
+    """Decorator form of span(); the name defaults to the function name."""
+    def deco(fn):
+        label = name or fn.__name__
+        @wraps(fn)
+        def wrapper(*a, **kw):
+            if not _enabled:
+                return fn(*a, **kw)
+            with _Span(label, {}):
+                return fn(*a, **kw)
+        return wrapper
+    return deco
+
+# ─── Collection / export ──────────────────────────────────────────────────────
+def drain() -> list:
+    """Take this process's events (workers return them to the parent)."""
+    with _lock:
+        out = _events[:]
+        _events.clear()
+    return out
+
+def _after_fork():
+    # worker שנוצר ב-fork יורש את ה-events ואת ה-stack הפתוח של ההורה
+    global _lock
+    _lock = threading.Lock()
+    _events.clear()
+    _local.stack = []
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+def merge(events):
+    if events:
+        with _lock:
+            _events.extend(events)
+
+def events() -> list:
+    with _lock:
+        return list(_events)
+
+def summary(evts=None) -> str:
+    """One line: top-level stages of the main process, in order, with wall / CPU ms."""
+    evts = evts if evts is not None else events()
+    pid = os.getpid()
+    top = sorted((e for e in evts if e["pid"] == pid and e["args"].get("depth") == 0),
+                 key=lambda e: e["ts"])
+    if not top:
+        return "trace: (no spans)"
+    parts = [f"{e['name']} {e['dur']/1000:.0f}ms" + (f"/{e['args']['cpu_ms']:.0f}cpu" if e["args"]["cpu_ms"] >= 1 else "")
+             for e in top]
+    total = (top[-1]["ts"] + top[-1]["dur"] - top[0]["ts"]) / 1000
+    return f"trace: {' · '.join(parts)}  (total {total:.0f}ms)"
+
+def write(path=None, name: str = "trace") -> Path:
+    """Chrome trace-event JSON; default path TRACE_DIR/<name>-<timestamp>.json."""
+    if path is None:
+        TRACE_DIR.mkdir(parents=True, exist_ok=True)
+        path = TRACE_DIR / f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    path = Path(path)
+    evts = events()
+    meta = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": label}}
+            for pid, label in {e["pid"]: ("main" if e["pid"] == os.getpid() else f"worker {e['pid']}")
+                               for e in evts}.items()]
+    path.write_text(json.dumps({"traceEvents": meta + evts, "displayTimeUnit": "ms"},
+                               separators=(",", ":")), encoding="utf-8")
+    return path
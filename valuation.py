@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Valuation — the per-holding math of generate_all, in one place
+  • value_series: portfolio value per day (sparkline) — a positions × days price
+    matrix × shares vector in numpy for long series (≥ NP_MIN_DAYS), one scalar
+    loop for short ones, where building the matrix costs more than it saves
+  • valuate: value, gross / net P&L after 0.1% fee + 25% CGT on gains, weekly
+    change — one scalar pass per holding (a few float ops each; array setup
+    would cost more than the ops themselves)
+
+numpy is imported lazily; without it the series comes from the loop, so
+generate_all still runs in a bare env. Both series paths do the same float
+operations in the same order — accumulated holding by holding, not with a
+reduction whose order numpy may choose — so they give the same floats, not
+just the same rounded numbers.
+"""
+
+from dataclasses import dataclass
+from itertools import chain
+
+FEE_RATE = 0.001   # עמלת מכירה
+CGT_RATE = 0.25    # מס רווחי הון — רק על רווח
+NP_MIN_DAYS = 150  # סדרה קצרה מזה (sparkline של 7 ימים) — הלולאה מהירה מבניית המטריצה
+
+def net_withdrawal(gross: float, cost_basis: float) -> float:
+    """After 0.1% sell fee + 25% CGT on gains only. Scalar: one call per portfolio total, not per holding."""
+    return gross - gross * FEE_RATE - max(0.0, gross - cost_basis) * CGT_RATE
+
+def _np():
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        return None
+
+@dataclass(frozen=True)
+class Valuation:
+    """Per-holding arrays, aligned with .positions (the raw dicts that survived SKIP/zero filters)."""
+    positions: tuple
+    shares:    list
+    buy:       list
+    price:     list   # current price (snapshot, fallback buyPrice)
+    value:     list   # shares × price
+    gain:      list   # (price − buy) × shares
+    net:       list   # gain − fee − CGT
+    net_pct:   list   # net / cost basis × 100
+    week_pct:  list   # last/first close of history, rounded to 2 — None if <2 closes
+    series:    list   # portfolio value per day (no cash), oldest first
+
+def holdings(positions, skip=()):
+    """Positions worth valuing: not a SKIP prefix, non-zero shares."""
+    return tuple(p for p in positions
+                 if not p["symbol"].startswith(skip) and p.get("shares", 0))
+
+def value_series(positions, closes=None, days=7, skip=()):
+    """
+    Portfolio value per day (no cash), oldest first — history padded left with its
+    first close, flat at buyPrice when a symbol has none. The matrix kernel only
+    for long series: below NP_MIN_DAYS building it costs more than the loop saves.
+    """
+    pos = holdings(positions, skip)
+    np  = _np() if days >= NP_MIN_DAYS and pos else None
+    if np is None:
+        return _series_py(pos, closes, days)
+    hs = [closes(p["symbol"]) if closes else None for p in pos]
+    hs = [() if h is None else h for h in hs]
+    sh = [float(p.get("shares", 0)) for p in pos]
+    bp = [float(p.get("buyPrice", 0)) for p in pos]
+    return _series_np(np, sh, bp, hs, days)
+
+def valuate(positions, price=None, closes=None, days=7, skip=()):
+    """
+    positions  raw portfolio positions (symbol / shares / buyPrice)
+    price      price(symbol, default) → current price; None → buyPrice
+    closes     closes(symbol) → sequence of daily closes, oldest first; None → no history
+    days       length of .series (see value_series); 0 skips it
+    """
+    pos = holdings(positions, skip)
+    sh, bp, cp = [], [], []
+    val, g, nv, npct, week = [], [], [], [], []
+    # מעבר אחד על הנכסים: כמה פעולות סקלריות לנכס — בניית מערכים עולה יותר מהן
+    for p in pos:
+        sym = p["symbol"]
+        s = float(p.get("shares", 0))
+        b = float(p.get("buyPrice", 0))
+        c = float(price(sym, b)) if price else b
+        h = closes(sym) if closes else None
+        v = s * c
+        x = (c - b) * s
+        n = x - v * FEE_RATE - max(0, x) * CGT_RATE
+        sh.append(s); bp.append(b); cp.append(c)
+        val.append(v); g.append(x); nv.append(n)
+        npct.append(n / (b * s) * 100 if b * s > 0 else 0.0)
+        week.append(round((h[-1] / h[0] - 1) * 100, 2)
+                    if h is not None and len(h) >= 2 and h[0] > 0 else None)
+    series = value_series(pos, closes, days) if days else []
+    return Valuation(pos, sh, bp, cp, val, g, nv, npct, week, series)
+
+def _flatten(np, parts, total):
+    """Concatenate history tails — array / mmap slices as-is, python lists via one fromiter."""
+    if not total:
+        return np.empty(0)
+    if any(isinstance(x, (np.ndarray, memoryview)) for x in parts):
+        return np.concatenate([np.asarray(x, dtype=float) for x in parts])
+    return np.fromiter(chain.from_iterable(parts), dtype=float, count=total)
+
+def _series_np(np, sh, bp, hs, days):
+    n = len(sh)
+    shares = np.asarray(sh)
+
+    # positions × days — שורה לכל נכס, ריפוד שמאלי במחיר הראשון.
+    # כל הזנבות נכנסים במערך אחד ומפוזרים במסכה (row-major = סדר השרשור)
+    k    = np.fromiter((min(len(h), days) for h in hs), dtype=np.intp, count=n)
+    tail = _flatten(np, [h[len(h) - m:] for h, m in zip(hs, k.tolist())], int(k.sum()))
+    pad  = np.fromiter((h[0] if len(h) else b for h, b in zip(hs, bp)), dtype=float, count=n)
+    mask = np.arange(days) >= (days - k)[:, None]
+    mat  = np.repeat(pad[:, None], days, axis=1)
+    mat[mask] = tail
+    # accumulate הוא סדרתי בהגדרה (שורה אחרי שורה) — sum(axis=0) רשאי לסדר אחרת
+    # (pairwise / SIMD לפי build) ולזוז ב-ULP. +0.0 כמו ה-0.0 שהלולאה מתחילה ממנו
+    w = mat * shares[:, None]
+    return (np.add.accumulate(w, axis=0, out=w)[-1] + 0.0).tolist()
+
+def _series_py(pos, closes, days):
+    series = [0.0] * days
+    for p in pos:
+        s = float(p.get("shares", 0))
+        h = closes(p["symbol"]) if closes else None
+        if h is None or not len(h):
+            v = float(p.get("buyPrice", 0)) * s
+            for d in range(days): series[d] += v
+            continue
+        hh = h[len(h) - days:] if len(h) >= days else [h[0]] * (days - len(h)) + list(h)
+        for d, c in enumerate(hh): series[d] += c * s
+    return series